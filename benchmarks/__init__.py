@@ -0,0 +1 @@
+# Benchmarks de la aplicación. Se ejecutan desde la raíz del repositorio con `python -m benchmarks.<modulo>`.
@@ -0,0 +1,75 @@
+"""
+Ejecuta la suite de benchmarks y reúne sus resultados en un único JSON comparable entre commits.
+
+Cada benchmark se ejecuta en su propio proceso, porque los motores de la base de datos se crean
+una vez por proceso sobre la base temporal. Con `--rapido` se usan tamaños pequeños para comprobar la suite en
+pocos minutos; sin él, los de referencia (hasta 1M usuarios).
+
+Uso:
+    python -m benchmarks --salida resultados.json
+    python -m benchmarks.comparar resultados_base.json resultados.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+from benchmarks._comun import emitir, entorno
+
+# Módulo de cada benchmark de la suite.
+SUITE: Dict[str, str] = {
+    "manejadores": "benchmarks.bench_manejadores",
+    "concurrencia": "benchmarks.bench_concurrencia",
+    "busqueda": "benchmarks.bench_busqueda",
+    "carga_websocket": "benchmarks.carga_websocket",
+    "arranque": "benchmarks.bench_arranque",
+    "escrituras": "benchmarks.bench_escrituras",
+}
+# Argumentos de la suite rápida; la completa usa los valores por defecto de cada benchmark.
+ARGUMENTOS_RAPIDO: Dict[str, List[str]] = {
+    "manejadores": ["--tamanos", "1000", "10000", "--repeticiones", "50", "--registros", "10"],
+    "concurrencia": ["--clientes", "1", "10", "--peticiones", "5", "--pausa", "0.1"],
+    "busqueda": ["--filas", "10000", "--repeticiones", "2"],
+    "carga_websocket": ["--clientes", "5", "20", "--peticiones", "5", "--pausa", "0.2"],
+    "arranque": ["--repeticiones", "2"],
+    "escrituras": ["--procesos", "1", "2", "--operaciones", "200", "--workers", "1", "2",
+                   "--clientes", "8", "--registros", "3"],
+}
+
+
+def _ejecutar(nombre: str, rapido: bool) -> dict:
+    with tempfile.NamedTemporaryFile(suffix=".json") as salida:
+        argumentos = ARGUMENTOS_RAPIDO[nombre] if rapido else []
+        comando = [sys.executable, "-m", SUITE[nombre], *argumentos, "--salida", salida.name]
+        print(f"[benchmarks] {' '.join(comando[1:])}", file=sys.stderr)
+        proceso = subprocess.run(comando, stdout=subprocess.DEVNULL)
+        if proceso.returncode != 0:
+            return {"error": f"terminó con código {proceso.returncode}"}
+        with open(salida.name, encoding="utf-8") as f:
+            resultado = json.load(f)
+    resultado.pop("entorno", None)
+    return resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--solo", nargs="+", choices=sorted(SUITE), help="Benchmarks a ejecutar (por defecto, todos).")
+    parser.add_argument("--rapido", action="store_true", help="Tamaños pequeños para una comprobación rápida.")
+    parser.add_argument("--salida", help="Archivo JSON de salida (por defecto, stdout).")
+    args = parser.parse_args()
+
+    resultado = {
+        "suite": "rapida" if args.rapido else "completa",
+        "entorno": entorno(),
+        "resultados": {nombre: _ejecutar(nombre, args.rapido) for nombre in (args.solo or SUITE)},
+    }
+    emitir(resultado, args.salida)
+    if any("error" in r for r in resultado["resultados"].values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
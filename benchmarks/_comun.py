@@ -0,0 +1,116 @@
+"""
+Utilidades comunes de los benchmarks: base de datos temporal, siembra de usuarios, percentiles
+y salida JSON con los datos del entorno para comparar resultados entre commits.
+"""
+
+import contextlib
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional
+
+# Filas por sentencia al sembrar: cada lote es un único executemany.
+LOTE_SIEMBRA = 50_000
+
+
+@contextlib.contextmanager
+def base_temporal() -> Iterator[str]:
+    """
+    Crea un directorio temporal con una base SQLite migrada, apunta DATABASE_PATH a ella y borra
+    el directorio al terminar. Debe usarse desde `main()` y antes de abrir cualquier sesión (los
+    motores leen la ruta al crearse), nunca al importar: los procesos del pool de hashing se
+    arrancan con "spawn", vuelven a importar el módulo principal y crearían cada uno otra base.
+
+    Si el benchmark falla, el directorio se conserva, con los registros de los backends
+    arrancados, y se indica su ruta en stderr.
+
+    Yields:
+        str: Ruta del archivo de base de datos.
+    """
+    from nueva_app_reflex.db import database, migraciones
+
+    directorio = tempfile.mkdtemp(prefix="bench_db_")
+    ruta = os.path.join(directorio, "app.db")
+    os.environ["DATABASE_PATH"] = ruta
+    try:
+        migraciones.aplicar()
+        yield ruta
+    except BaseException:
+        print(f"[benchmarks] se conserva {directorio} para revisar el fallo", file=sys.stderr)
+        raise
+    database.cerrar_motores()
+    shutil.rmtree(directorio, ignore_errors=True)
+
+
+def sembrar_usuarios(motor, hasta: int, desde: int = 0) -> None:
+    """
+    Inserta los usuarios con índice en [desde, hasta) directamente con el driver, sin pasar por
+    el ORM ni calcular hashes, para poder sembrar millones de filas en poco tiempo.
+    """
+    with motor.begin() as conexion:
+        for inicio in range(desde, hasta, LOTE_SIEMBRA):
+            conexion.exec_driver_sql(
+                "INSERT INTO usuarios (nombre, email, password_hash, es_admin) VALUES (?, ?, ?, ?)",
+                [
+                    (f"usuario{i}", f"usuario{i}@ejemplo.com", "x", i % 50 == 0)
+                    for i in range(inicio, min(hasta, inicio + LOTE_SIEMBRA))
+                ],
+            )
+
+
+def entorno() -> Dict[str, Any]:
+    """
+    Describe dónde y sobre qué versión del código se obtuvo un resultado.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "fecha": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def percentiles(muestras: List[float]) -> Dict[str, float]:
+    """
+    Resume una lista de latencias en segundos como p50/p95/p99 en milisegundos.
+    """
+    if not muestras:
+        return {"n": 0, "media_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    ordenadas = sorted(muestras)
+
+    def _p(q: float) -> float:
+        return ordenadas[min(len(ordenadas) - 1, int(q * len(ordenadas)))] * 1000
+
+    return {
+        "n": len(ordenadas),
+        "media_ms": round(statistics.fmean(ordenadas) * 1000, 3),
+        "p50_ms": round(_p(0.50), 3),
+        "p95_ms": round(_p(0.95), 3),
+        "p99_ms": round(_p(0.99), 3),
+    }
+
+
+def emitir(resultado: dict, salida: Optional[str] = None) -> None:
+    """
+    Escribe el resultado como JSON en el archivo indicado o en la salida estándar.
+    """
+    resultado = {**resultado, "entorno": resultado.get("entorno") or entorno()}
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if salida:
+        with open(salida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    else:
+        sys.stdout.write(texto + "\n")
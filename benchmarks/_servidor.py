@@ -0,0 +1,212 @@
+"""
+Utilidades de los benchmarks que hablan con un backend Reflex real: arranque del backend en
+modo producción sobre una base dada, servidor Redis simulado para probar varios workers y
+cliente Socket.IO que envía eventos como el navegador.
+
+Requiere el cliente asíncrono de Socket.IO y fakeredis: pip install -r benchmarks/requirements.txt
+"""
+
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import httpx
+import reflex as rx
+import socketio
+from reflex import constants
+from reflex.config import get_config
+
+from nueva_app_reflex.state import State
+
+RAIZ_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ESPERA_ARRANQUE = 120.0
+ESPERA_RESPUESTA = 30.0
+RUTA = "/consultar-usuarios"
+# Nombres completos de los eventos, como los envía el frontend compilado.
+EVENTO_HIDRATAR = f"{rx.State.get_full_name()}.{constants.CompileVars.HYDRATE}"
+EVENTO_CONSULTAR = f"{State.get_full_name()}.consultar_usuarios"
+EVENTO_REGISTRAR = f"{State.get_full_name()}.registrar_usuario"
+
+
+class ErrorCarga(Exception):
+    """
+    Fallo de un cliente simulado o del backend (conexión rechazada, respuesta que no llega a
+    tiempo o backend que no arranca).
+    """
+
+
+def puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def esperar_backend(url: str, proceso: Optional[subprocess.Popen]) -> None:
+    """
+    Espera a que el backend responda a /ping, o a que su proceso termine.
+    """
+    limite = time.monotonic() + ESPERA_ARRANQUE
+    while time.monotonic() < limite:
+        if proceso is not None and proceso.poll() is not None:
+            raise ErrorCarga(f"El backend terminó al arrancar (código {proceso.returncode}).")
+        try:
+            if httpx.get(url + "/" + constants.Endpoint.PING.value, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    raise ErrorCarga(f"El backend no respondió en {ESPERA_ARRANQUE:.0f} s.")
+
+
+@contextmanager
+def arrancar_backend(
+    ruta_db: str, registro: str, variables: Optional[Dict[str, str]] = None, entrypoint: bool = False
+) -> Iterator[str]:
+    """
+    Arranca el backend en producción sobre la base indicada y lo detiene al salir.
+
+    Args:
+        ruta_db: Archivo SQLite del backend.
+        registro: Archivo donde se guarda la salida del backend.
+        variables: Variables de entorno adicionales para el backend.
+        entrypoint: Arrancar con docker-entrypoint.sh, como el contenedor, en lugar de con
+            `reflex run --env prod --backend-only`.
+
+    Yields:
+        str: URL base del backend, cuando ya responde a /ping.
+    """
+    entorno = {
+        **os.environ,
+        "DATABASE_PATH": ruta_db,
+        # Gunicorn recicla el worker cada 120 peticiones por defecto, lo que cortaría las
+        # conexiones de la prueba a mitad de una ronda.
+        "GUNICORN_MAX_REQUESTS": "1000000",
+        **(variables or {}),
+    }
+    puerto = puerto_libre()
+    if entrypoint:
+        comando = ["sh", "docker-entrypoint.sh"]
+        entorno.update(BACKEND_HOST="127.0.0.1", BACKEND_PORT=str(puerto))
+    else:
+        comando = [sys.executable, "-m", "reflex", "run", "--env", "prod", "--backend-only",
+                   "--backend-port", str(puerto), "--loglevel", "warning"]
+    with open(registro, "w", encoding="utf-8") as salida:
+        proceso = subprocess.Popen(
+            comando,
+            cwd=RAIZ_PROYECTO,
+            env=entorno,
+            stdout=salida,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+        try:
+            url = f"http://127.0.0.1:{puerto}"
+            esperar_backend(url, proceso)
+            yield url
+        finally:
+            os.killpg(proceso.pid, signal.SIGTERM)
+            try:
+                proceso.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                os.killpg(proceso.pid, signal.SIGKILL)
+                proceso.wait()
+
+
+@contextmanager
+def arrancar_redis() -> Iterator[str]:
+    """
+    Arranca un servidor Redis simulado (fakeredis) en un proceso aparte y lo detiene al salir.
+    Sirve de gestor de estado compartido para probar varios workers sin instalar Redis.
+
+    No emite notificaciones de keyspace: si un evento llega mientras el anterior del mismo cliente
+    aún tiene el bloqueo de su estado, espera a que el bloqueo caduque (REDIS_LOCK_EXPIRATION).
+    Los clientes de prueba deben esperar a que se libere el bloqueo antes de enviar otro evento.
+
+    Yields:
+        str: URL redis:// del servidor.
+    """
+    puerto = puerto_libre()
+    codigo = (
+        "import sys; from fakeredis import TcpFakeServer; "
+        "TcpFakeServer(('127.0.0.1', int(sys.argv[1])), server_type='redis').serve_forever()"
+    )
+    proceso = subprocess.Popen(
+        [sys.executable, "-c", codigo, str(puerto)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        limite = time.monotonic() + ESPERA_ARRANQUE
+        while True:
+            if proceso.poll() is not None:
+                raise ErrorCarga(f"fakeredis terminó al arrancar (código {proceso.returncode}).")
+            try:
+                socket.create_connection(("127.0.0.1", puerto), timeout=1.0).close()
+                break
+            except OSError:
+                if time.monotonic() > limite:
+                    raise ErrorCarga(f"fakeredis no respondió en {ESPERA_ARRANQUE:.0f} s.")
+                time.sleep(0.05)
+        yield f"redis://127.0.0.1:{puerto}"
+    finally:
+        proceso.terminate()
+        proceso.wait()
+
+
+class Cliente:
+    """
+    Cliente Socket.IO que envía eventos de uno en uno y espera su actualización final.
+    """
+
+    def __init__(self, url: str, ruta: str = RUTA):
+        self.url = url
+        self.ruta = ruta
+        self.token = str(uuid.uuid4())
+        self.espacio = get_config().get_event_namespace()
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self._pendiente: Optional[asyncio.Future] = None
+        self.sio.on(str(constants.SocketEvent.EVENT), self._al_recibir, namespace=self.espacio)
+
+    async def _al_recibir(self, actualizacion: dict) -> None:
+        if actualizacion.get("final") and self._pendiente is not None and not self._pendiente.done():
+            self._pendiente.set_result(actualizacion)
+
+    async def conectar(self) -> None:
+        try:
+            await self.sio.connect(
+                self.url,
+                socketio_path=constants.Endpoint.EVENT.value,
+                transports=["websocket"],
+                namespaces=[self.espacio],
+            )
+        except socketio.exceptions.ConnectionError as e:
+            raise ErrorCarga(f"Conexión rechazada: {e}") from e
+
+    async def enviar(self, evento: str, payload: Optional[dict] = None) -> dict:
+        """
+        Envía un evento al backend y espera la actualización marcada como final.
+        """
+        self._pendiente = asyncio.get_running_loop().create_future()
+        await self.sio.emit(
+            str(constants.SocketEvent.EVENT),
+            {
+                "name": evento,
+                "payload": payload or {},
+                "handler": None,
+                "token": self.token,
+                "router_data": {"pathname": self.ruta, "query": {}, "asPath": self.ruta},
+            },
+            namespace=self.espacio,
+        )
+        try:
+            return await asyncio.wait_for(self._pendiente, ESPERA_RESPUESTA)
+        except asyncio.TimeoutError as e:
+            raise ErrorCarga(f"Sin respuesta a {evento} en {ESPERA_RESPUESTA:.0f} s") from e
+
+    async def cerrar(self) -> None:
+        await self.sio.disconnect()
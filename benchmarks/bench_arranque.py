@@ -0,0 +1,119 @@
+"""
+Benchmark del arranque en frío del backend en modo producción.
+
+Mide por separado, cada uno en procesos nuevos y `--repeticiones` veces:
+- importar_app: importar el módulo de la aplicación (lo que hacen `reflex export` y cada worker).
+  Comprueba además que importar no crea la base de datos.
+- migraciones: `python -m nueva_app_reflex.db.migraciones` sobre una base nueva y sobre una base
+  ya al día, el paso que ejecuta docker-entrypoint.sh antes del backend.
+- backend: desde que se lanza el backend hasta que responde a /ping (hasta_ping) y, después,
+  hasta que un cliente conectado por websocket recibe la respuesta a la hidratación y a
+  `State.consultar_usuarios` (primer_evento). Se mide con docker-entrypoint.sh, el arranque del
+  contenedor (migraciones y gunicorn), y con `reflex run --env prod --backend-only` con las
+  variables por defecto, como referencia.
+
+El frontend no se mide: en producción se compila al construir la imagen y Caddy sirve los
+archivos estáticos, así que no forma parte del arranque.
+
+Uso:
+    python -m benchmarks.bench_arranque --repeticiones 5 --salida arranque.json
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from typing import List
+
+from benchmarks._comun import base_temporal, emitir, percentiles, sembrar_usuarios
+from benchmarks._servidor import EVENTO_CONSULTAR, EVENTO_HIDRATAR, RAIZ_PROYECTO, Cliente, arrancar_backend
+from nueva_app_reflex.db import database
+
+
+def _cronometrar(comando: List[str], ruta_db: str) -> float:
+    """
+    Ejecuta el comando en un proceso nuevo con la base indicada y devuelve su duración en segundos.
+    """
+    inicio = time.perf_counter()
+    subprocess.run(
+        comando,
+        cwd=RAIZ_PROYECTO,
+        env={**os.environ, "DATABASE_PATH": ruta_db},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=True,
+    )
+    return time.perf_counter() - inicio
+
+
+def _medir_importacion(ruta_db: str, repeticiones: int) -> dict:
+    ruta = os.path.join(os.path.dirname(ruta_db), "importar", "app.db")
+    comando = [sys.executable, "-c", "import nueva_app_reflex.nueva_app_reflex"]
+    muestras = [_cronometrar(comando, ruta) for _ in range(repeticiones)]
+    return {**percentiles(muestras), "crea_base": os.path.exists(ruta)}
+
+
+def _medir_migraciones(ruta_db: str, repeticiones: int) -> dict:
+    comando = [sys.executable, "-m", "nueva_app_reflex.db.migraciones"]
+    nuevas, al_dia = [], []
+    for i in range(repeticiones):
+        ruta = os.path.join(os.path.dirname(ruta_db), f"migraciones{i}.db")
+        nuevas.append(_cronometrar(comando, ruta))
+        al_dia.append(_cronometrar(comando, ruta))
+    return {"base_nueva": percentiles(nuevas), "base_al_dia": percentiles(al_dia)}
+
+
+async def _primer_evento(url: str) -> float:
+    cliente = Cliente(url)
+    inicio = time.perf_counter()
+    try:
+        await cliente.conectar()
+        await cliente.enviar(EVENTO_HIDRATAR)
+        await cliente.enviar(EVENTO_CONSULTAR)
+    finally:
+        if cliente.sio.connected:
+            await cliente.cerrar()
+    return time.perf_counter() - inicio
+
+
+def _medir_backend(ruta_db: str, repeticiones: int, entrypoint: bool) -> dict:
+    hasta_ping, primer_evento = [], []
+    for i in range(repeticiones):
+        registro = os.path.join(os.path.dirname(ruta_db), f"backend_{'entrypoint' if entrypoint else 'reflex'}{i}.log")
+        inicio = time.perf_counter()
+        # Como en el contenedor: el backend sólo comprueba las migraciones; con el entrypoint se
+        # aplican (ya al día) antes de arrancar gunicorn.
+        with arrancar_backend(ruta_db, registro, {"DATABASE_AUTO_MIGRATE": "0"}, entrypoint=entrypoint) as url:
+            hasta_ping.append(time.perf_counter() - inicio)
+            primer_evento.append(asyncio.run(_primer_evento(url)))
+    return {"hasta_ping": percentiles(hasta_ping), "primer_evento": percentiles(primer_evento)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--usuarios", type=int, default=1000, help="Usuarios sembrados en la base del backend.")
+    parser.add_argument("--salida", help="Archivo JSON de salida (por defecto, stdout).")
+    args = parser.parse_args()
+
+    with base_temporal() as ruta_db:
+        sembrar_usuarios(database.engine, args.usuarios)
+        database.cerrar_motores()
+        resultado = {
+            "benchmark": "arranque",
+            "usuarios": args.usuarios,
+            "repeticiones": args.repeticiones,
+            "importar_app": _medir_importacion(ruta_db, args.repeticiones),
+            "migraciones": _medir_migraciones(ruta_db, args.repeticiones),
+            "backend": {
+                "entrypoint": _medir_backend(ruta_db, args.repeticiones, entrypoint=True),
+                "reflex_run": _medir_backend(ruta_db, args.repeticiones, entrypoint=False),
+            },
+        }
+    emitir(resultado, args.salida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark de la búsqueda FTS5 de usuarios y tareas.
+
+Siembra una base SQLite temporal con N usuarios y N tareas (1M por defecto), inserta las filas
+con los triggers de sincronización activos y mide la latencia de búsquedas por prefijo de
+distintas longitudes. Las descripciones usan un vocabulario de unas 5.000 palabras con
+frecuencias de Zipf (unas pocas palabras muy frecuentes y una cola larga), como el texto real.
+El objetivo es mantener el p99 por debajo de 10 ms.
+
+Uso:
+    python -m benchmarks.bench_busqueda --filas 1000000 --salida busqueda.json
+"""
+
+import argparse
+import itertools
+import random
+import time
+from typing import List
+
+from benchmarks._comun import LOTE_SIEMBRA, base_temporal, emitir, percentiles
+from nueva_app_reflex.db import database
+from nueva_app_reflex.db.busqueda import buscar_tareas, buscar_usuarios
+from nueva_app_reflex.db.database import SessionLectura
+
+OBJETIVO_MS = 10.0
+NOMBRES = [
+    "ana", "luis", "marta", "jorge", "lucia", "pablo", "sofia", "diego", "carmen", "javier",
+    "elena", "raul", "irene", "sergio", "laura", "andres", "noelia", "victor", "paula", "hugo",
+]
+APELLIDOS = [
+    "garcia", "martinez", "lopez", "sanchez", "perez", "gomez", "martin", "jimenez", "ruiz",
+    "hernandez", "diaz", "moreno", "alvarez", "romero", "navarro", "torres", "dominguez", "vazquez",
+    "ramos", "gil", "serrano", "molina", "blanco", "suarez", "castro", "ortega", "delgado", "rubio",
+]
+DOMINIOS = ["gmail.com", "hotmail.com", "yahoo.es", "outlook.com", "empresa.es"]
+PALABRAS = [
+    "comprar", "llamar", "revisar", "enviar", "preparar", "informe", "factura", "reunion",
+    "cliente", "proveedor", "pedido", "presupuesto", "correo", "documento", "entrega",
+    "mercado", "banco", "medico", "proyecto", "contrato", "pago", "viaje", "hotel", "cena",
+]
+SILABAS = ["ca", "de", "li", "mo", "ra", "te", "su", "pa", "no", "ve", "ri", "so", "gu", "ta", "fe"]
+
+
+def _vocabulario(rng: random.Random, tamano: int = 5000) -> List[str]:
+    """
+    Las palabras de PALABRAS son las más frecuentes; el resto se forma combinando sílabas.
+    """
+    vocabulario = list(PALABRAS)
+    vistas = set(vocabulario)
+    while len(vocabulario) < tamano:
+        palabra = "".join(rng.choice(SILABAS) for _ in range(rng.randint(2, 5)))
+        if palabra not in vistas:
+            vistas.add(palabra)
+            vocabulario.append(palabra)
+    return vocabulario
+
+
+def _usuario(i: int, rng: random.Random) -> tuple:
+    nombre, apellido = rng.choice(NOMBRES), rng.choice(APELLIDOS)
+    return (f"{nombre}_{apellido}{i}", f"{nombre}.{apellido}{i}@{rng.choice(DOMINIOS)}", "x", i % 50 == 0)
+
+
+def _sembrar(filas: int, vocabulario: List[str], rng: random.Random) -> float:
+    pesos = list(itertools.accumulate(1 / rango for rango in range(1, len(vocabulario) + 1)))
+    inicio = time.perf_counter()
+    with database.engine.begin() as conexion:
+        for desde in range(0, filas, LOTE_SIEMBRA):
+            hasta = min(filas, desde + LOTE_SIEMBRA)
+            conexion.exec_driver_sql(
+                "INSERT INTO usuarios (nombre, email, password_hash, es_admin) VALUES (?, ?, ?, ?)",
+                [
+                    _usuario(i, rng)
+                    for i in range(desde, hasta)
+                ],
+            )
+            palabras = rng.choices(vocabulario, cum_weights=pesos, k=5 * (hasta - desde))
+            conexion.exec_driver_sql(
+                "INSERT INTO tareas (descripcion, completada, usuario_id) VALUES (?, ?, ?)",
+                [
+                    (" ".join(palabras[5 * j:5 * j + 5]), i % 3 == 0, rng.randint(1, hasta))
+                    for j, i in enumerate(range(desde, hasta))
+                ],
+            )
+    return time.perf_counter() - inicio
+
+
+def _medir(funcion, consultas, repeticiones: int) -> dict:
+    db = SessionLectura()
+    try:
+        # Una pasada previa para que las páginas del índice estén en caché, como en producción.
+        for consulta in consultas:
+            funcion(db, consulta)
+        tiempos = []
+        for _ in range(repeticiones):
+            for consulta in consultas:
+                inicio = time.perf_counter()
+                funcion(db, consulta)
+                tiempos.append(time.perf_counter() - inicio)
+    finally:
+        db.close()
+    resumen = percentiles(tiempos)
+    resumen["cumple_objetivo"] = resumen["p99_ms"] < OBJETIVO_MS
+    return resumen
+
+
+def _ejecutar(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.semilla)
+    vocabulario = _vocabulario(rng)
+    segundos_siembra = _sembrar(args.filas, vocabulario, rng)
+
+    # Prefijos de cada longitud, como los que envía el buscador mientras se escribe.
+    consultas_usuarios = [n[:k] for n in NOMBRES + APELLIDOS for k in range(2, len(n) + 1)]
+    consultas_usuarios += [d.split(".")[0] for d in DOMINIOS]
+    consultas_usuarios += [f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)[:3]}" for _ in range(20)]
+    consultas_tareas = [p[:k] for p in PALABRAS for k in range(2, len(p) + 1)]
+    consultas_tareas += [p[:k] for p in rng.sample(vocabulario[len(PALABRAS):], 40) for k in (2, 4, len(p))]
+    consultas_tareas += [" ".join(rng.sample(PALABRAS, 2)) for _ in range(20)]
+
+    return {
+        "benchmark": "busqueda",
+        "filas": args.filas,
+        "objetivo_p99_ms": OBJETIVO_MS,
+        "siembra_s": round(segundos_siembra, 2),
+        "usuarios": _medir(buscar_usuarios, consultas_usuarios, args.repeticiones),
+        "tareas": _medir(buscar_tareas, consultas_tareas, args.repeticiones),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=1_000_000, help="Usuarios y tareas a sembrar.")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument("--salida", help="Archivo JSON de salida (por defecto, stdout).")
+    args = parser.parse_args()
+
+    with base_temporal():
+        resultado = _ejecutar(args)
+    emitir(resultado, args.salida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark de latencia de los manejadores frente al número de clientes concurrentes.
+
+Simula N clientes que consultan páginas de usuarios mientras otro cliente ejecuta una
+escritura lenta (un commit que espera el bloqueo de SQLite, emulado con una pausa dentro de
+la sesión). Compara el acceso bloqueante en el bucle de eventos con la capa asíncrona de
+`nueva_app_reflex.db.asincrono`, con y sin la caché compartida de páginas de usuarios. La latencia se mide desde el instante en que el cliente
+quería enviar la petición, de modo que incluye el tiempo que el bucle estuvo bloqueado.
+
+Uso:
+    python -m benchmarks.bench_concurrencia --clientes 1 10 50 100 --salida resultado.json
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Callable, List
+
+from benchmarks._comun import base_temporal, emitir, percentiles, sembrar_usuarios
+from nueva_app_reflex.db import asincrono, database
+from nueva_app_reflex.db.database import SessionLocal
+from nueva_app_reflex.db.models import Usuario
+from nueva_app_reflex.db.usuarios import cache_usuarios, consultar_usuarios_pagina, listar_usuarios_pagina
+
+PAUSA_OPERACION_LENTA = 0.05
+
+
+def _operacion_lenta(db) -> None:
+    db.query(Usuario.id).limit(1).all()
+    time.sleep(PAUSA_OPERACION_LENTA)
+
+
+def _sesion_bloqueante(funcion: Callable, *args, **kwargs):
+    db = SessionLocal()
+    try:
+        return funcion(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+async def _bloqueante(funcion: Callable, *args, **kwargs):
+    return _sesion_bloqueante(funcion, *args, **kwargs)
+
+
+async def _cliente(llamar, consulta: Callable, peticiones: int, pausa: float, latencias: List[float]) -> None:
+    # Los clientes no llegan todos a la vez: se reparte el primer envío dentro de una pausa.
+    await asyncio.sleep(random.uniform(0, pausa))
+    previsto = time.perf_counter()
+    for _ in range(peticiones):
+        await llamar(consulta, despues_de_id=None)
+        fin = time.perf_counter()
+        latencias.append(fin - previsto)
+        previsto = fin + pausa
+        await asyncio.sleep(pausa)
+
+
+async def _cliente_lento(llamar, detener: asyncio.Event) -> None:
+    while not detener.is_set():
+        await llamar(_operacion_lenta)
+        await asyncio.sleep(PAUSA_OPERACION_LENTA)
+
+
+async def _ronda(leer, escribir, consulta: Callable, clientes: int, peticiones: int, pausa: float) -> dict:
+    latencias: List[float] = []
+    detener = asyncio.Event()
+    lento = asyncio.create_task(_cliente_lento(escribir, detener))
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_cliente(leer, consulta, peticiones, pausa, latencias) for _ in range(clientes)))
+    duracion = time.perf_counter() - inicio
+    detener.set()
+    await lento
+    resultado = percentiles(latencias)
+    resultado["clientes"] = clientes
+    resultado["peticiones_por_segundo"] = round(len(latencias) / duracion, 1)
+    return resultado
+
+
+async def _main(args: argparse.Namespace) -> dict:
+    sembrar_usuarios(database.engine, args.usuarios)
+    resultado = {
+        "benchmark": "concurrencia",
+        "perfil": database.DB_PROFILE,
+        "usuarios": args.usuarios,
+        "pausa_s": args.pausa,
+        "modos": {},
+    }
+    modos = (
+        ("bloqueante", _bloqueante, _bloqueante, listar_usuarios_pagina),
+        ("asincrono", asincrono.leer, asincrono.ejecutar, listar_usuarios_pagina),
+        ("asincrono_cache", asincrono.leer, asincrono.ejecutar, consultar_usuarios_pagina),
+    )
+    for nombre, leer, escribir, consulta in modos:
+        resultado["modos"][nombre] = [
+            await _ronda(leer, escribir, consulta, clientes, args.peticiones, args.pausa) for clientes in args.clientes
+        ]
+    resultado["cache"] = cache_usuarios.metricas()
+    return resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clientes", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--peticiones", type=int, default=20, help="Peticiones por cliente.")
+    parser.add_argument("--pausa", type=float, default=0.5, help="Segundos entre peticiones de un cliente.")
+    parser.add_argument("--usuarios", type=int, default=1000, help="Usuarios sembrados en la base temporal.")
+    parser.add_argument("--salida", help="Archivo JSON de salida (por defecto, stdout).")
+    args = parser.parse_args()
+    with base_temporal():
+        resultado = asyncio.run(_main(args))
+    emitir(resultado, args.salida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Benchmark de escrituras concurrentes sobre el mismo archivo SQLite, según el número de procesos.
+
+Mide dos niveles:
+- escritor: `--procesos` procesos escriben a la vez en la misma base, cada uno con
+  `--concurrencia` inserciones en vuelo a través de `asincrono.ejecutar(crear_usuario)` (sin
+  hash de contraseña). Se mide con el escritor agrupado (ESCRITURA_MAX_LOTE por defecto) y con
+  un commit por operación (ESCRITURA_MAX_LOTE=1): escrituras por segundo, latencia, operaciones
+  por commit y errores, en particular "database is locked".
+- backend: el backend completo (docker-entrypoint.sh) con `--workers` workers de gunicorn y Redis
+  como gestor de estado, y `--clientes` clientes websocket en la página de registro que sólo
+  envían `registrar_usuario` (validación, hash e inserción). Sin `--redis-url` se arranca un
+  servidor fakeredis local. Mide registros por segundo, latencia y errores, y comprueba que todos
+  los registros confirmados están en la base.
+
+fakeredis no avisa al backend cuando se libera el bloqueo del estado de un cliente (ver
+`_servidor.arrancar_redis`): con él, cada cliente espera a que el bloqueo desaparezca antes de
+enviar el siguiente evento, lo que con Redis real haría el propio backend. El escalado con el
+número de workers depende de los núcleos libres: con una sola CPU no puede haberlo.
+
+Requiere las dependencias de benchmarks/requirements.txt.
+
+Uso:
+    python -m benchmarks.bench_escrituras --procesos 1 2 4 --workers 1 2 4 --salida escrituras.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+from typing import List
+
+from benchmarks._comun import base_temporal, emitir, percentiles
+
+# Variables de entorno de los procesos hijos en cada modo del escritor.
+MODOS = {"agrupado": {}, "sin_agrupar": {"ESCRITURA_MAX_LOTE": "1"}}
+RUTA_REGISTRO = "/registro-usuario"
+
+
+def _contar_usuarios(ruta_db: str) -> int:
+    with sqlite3.connect(ruta_db) as conexion:
+        return conexion.execute("SELECT count(*) FROM usuarios").fetchone()[0]
+
+
+async def _escribir(operaciones: int, concurrencia: int, prefijo: str) -> dict:
+    """
+    Cuerpo de un proceso hijo: inserta `operaciones` usuarios con `concurrencia` en vuelo.
+    """
+    from nueva_app_reflex.db import asincrono
+    from nueva_app_reflex.db.usuarios import crear_usuario
+    from nueva_app_reflex.instrumentacion import metricas
+
+    latencias: List[float] = []
+    errores: List[str] = []
+    pendientes = iter(range(operaciones))
+
+    async def _trabajador() -> None:
+        for i in pendientes:
+            nombre = f"{prefijo}_{i}"
+            inicio = time.perf_counter()
+            try:
+                await asincrono.ejecutar(crear_usuario, nombre, f"{nombre}@ejemplo.com", "x")
+                latencias.append(time.perf_counter() - inicio)
+            except Exception as e:
+                errores.append(str(e).splitlines()[0])
+
+    inicio = time.time()
+    await asyncio.gather(*(_trabajador() for _ in range(concurrencia)))
+    fin = time.time()
+    contadores = {c["nombre"]: c["valor"] for c in metricas.instantanea()["contadores"]}
+    return {
+        "inicio": inicio,
+        "fin": fin,
+        "latencias": latencias,
+        "errores": errores,
+        "lotes": contadores.get("escritura_lotes", 0),
+    }
+
+
+def _hijo(args: argparse.Namespace) -> None:
+    # Con varios procesos, las consultas que esperan el bloqueo se registrarían como lentas.
+    logging.getLogger("nueva_app_reflex").setLevel(logging.ERROR)
+    # Todos los procesos empiezan a la vez: el padre los arranca y después les da la salida.
+    sys.stdout.write("listo\n")
+    sys.stdout.flush()
+    sys.stdin.readline()
+    resultado = asyncio.run(_escribir(args.operaciones, args.concurrencia, args.prefijo))
+    sys.stdout.write(json.dumps(resultado) + "\n")
+
+
+def _medir_escritor(ruta_db: str, modo: str, procesos: int, args: argparse.Namespace) -> dict:
+    entorno = {**os.environ, "DATABASE_PATH": ruta_db, **MODOS[modo]}
+    if modo == "agrupado":
+        entorno.pop("ESCRITURA_MAX_LOTE", None)
+    hijos = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.bench_escrituras", "--hijo",
+             "--operaciones", str(args.operaciones), "--concurrencia", str(args.concurrencia),
+             "--prefijo", f"{modo}{procesos}_{k}"],
+            env=entorno,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for k in range(procesos)
+    ]
+    for hijo in hijos:
+        hijo.stdout.readline()
+    for hijo in hijos:
+        hijo.stdin.write("\n")
+        hijo.stdin.flush()
+    resultados = []
+    for hijo in hijos:
+        salida, _ = hijo.communicate()
+        resultados.append(json.loads(salida.splitlines()[-1]))
+
+    latencias = [x for r in resultados for x in r["latencias"]]
+    errores = [e for r in resultados for e in r["errores"]]
+    lotes = sum(r["lotes"] for r in resultados)
+    duracion = max(r["fin"] for r in resultados) - min(r["inicio"] for r in resultados)
+    return {
+        "procesos": procesos,
+        **percentiles(latencias),
+        "escrituras_por_segundo": round(len(latencias) / duracion, 1),
+        "operaciones_por_commit": round((len(latencias) + len(errores)) / lotes, 1) if lotes else 0.0,
+        "errores": len(errores),
+        "errores_bloqueo": sum("database is locked" in e for e in errores),
+        "ejemplos_errores": sorted(set(errores))[:5],
+    }
+
+
+async def _esperar_bloqueo(redis, token: str) -> None:
+    """
+    Espera a que el backend libere el bloqueo del estado del cliente (la clave `<token>_lock`).
+    """
+    while await redis.exists(f"{token}_lock"):
+        await asyncio.sleep(0.005)
+
+
+async def _registrar(url: str, numero: int, ronda: dict, redis, args: argparse.Namespace) -> None:
+    from benchmarks._servidor import EVENTO_HIDRATAR, EVENTO_REGISTRAR, Cliente, ErrorCarga
+
+    cliente = Cliente(url, RUTA_REGISTRO)
+    await asyncio.sleep(random.uniform(0, args.pausa))
+    try:
+        await cliente.conectar()
+        await cliente.enviar(EVENTO_HIDRATAR)
+        if redis is not None:
+            await _esperar_bloqueo(redis, cliente.token)
+        await asyncio.sleep(args.pausa)
+        for i in range(args.registros):
+            nombre = f"w{ronda['workers']}_{numero}_{i}_{cliente.token[:8]}"
+            payload = {"nombre": nombre, "email": f"{nombre}@ejemplo.com", "password": "secreto123"}
+            inicio = time.perf_counter()
+            actualizacion = await cliente.enviar(EVENTO_REGISTRAR, payload)
+            if "creado con éxito" in json.dumps(actualizacion, ensure_ascii=False):
+                ronda["latencias"].append(time.perf_counter() - inicio)
+            else:
+                ronda["errores"].append(f"registro rechazado: {nombre}")
+            if redis is not None:
+                await _esperar_bloqueo(redis, cliente.token)
+            await asyncio.sleep(args.pausa)
+    except ErrorCarga as e:
+        ronda["errores"].append(str(e))
+    finally:
+        if cliente.sio.connected:
+            await cliente.cerrar()
+
+
+def _medir_backend(
+    ruta_db: str, workers: int, redis_url: str, simulado: bool, args: argparse.Namespace
+) -> dict:
+    import redis.asyncio
+
+    from benchmarks._servidor import arrancar_backend
+
+    registro = os.path.join(os.path.dirname(ruta_db), f"backend_workers{workers}.log")
+    variables = {"BACKEND_WORKERS": str(workers), "REDIS_URL": redis_url}
+    if simulado:
+        # fakeredis no admite CONFIG SET, con el que Reflex activa las notificaciones de keyspace.
+        variables["REFLEX_IGNORE_REDIS_CONFIG_ERROR"] = "true"
+    antes = _contar_usuarios(ruta_db)
+    ronda = {"workers": workers, "latencias": [], "errores": []}
+    with arrancar_backend(ruta_db, registro, variables, entrypoint=True) as url:
+
+        async def _clientes() -> None:
+            cliente_redis = redis.asyncio.Redis.from_url(redis_url) if simulado else None
+            try:
+                await asyncio.gather(*(_registrar(url, n, ronda, cliente_redis, args) for n in range(args.clientes)))
+            finally:
+                if cliente_redis is not None:
+                    await cliente_redis.aclose()
+
+        inicio = time.perf_counter()
+        asyncio.run(_clientes())
+        duracion = time.perf_counter() - inicio
+    return {
+        "workers": workers,
+        "clientes": args.clientes,
+        **percentiles(ronda["latencias"]),
+        "registros_por_segundo": round(len(ronda["latencias"]) / duracion, 1),
+        "errores": len(ronda["errores"]),
+        "ejemplos_errores": sorted(set(ronda["errores"]))[:5],
+        # Cada registro confirmado al cliente debe estar en la base.
+        "usuarios_en_base": _contar_usuarios(ruta_db) - antes,
+    }
+
+
+def _niveles_backend(ruta_db: str, args: argparse.Namespace) -> List[dict]:
+    from benchmarks._servidor import arrancar_redis
+
+    if args.redis_url:
+        return [_medir_backend(ruta_db, w, args.redis_url, False, args) for w in args.workers]
+    with arrancar_redis() as url:
+        return [_medir_backend(ruta_db, w, url, True, args) for w in args.workers]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--procesos", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrencia", type=int, default=32, help="Escrituras en vuelo por proceso.")
+    parser.add_argument("--operaciones", type=int, default=2000, help="Escrituras por proceso.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clientes", type=int, default=32, help="Clientes websocket por ronda.")
+    parser.add_argument("--registros", type=int, default=10, help="Registros por cliente.")
+    parser.add_argument("--pausa", type=float, default=0.0, help="Segundos entre eventos de un cliente.")
+    parser.add_argument("--redis-url", help="Redis ya arrancado (por defecto, fakeredis local).")
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument("--salida", help="Archivo JSON de salida (por defecto, stdout).")
+    parser.add_argument("--hijo", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--prefijo", default="", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.hijo:
+        _hijo(args)
+        return
+    random.seed(args.semilla)
+
+    with base_temporal() as ruta_db:
+        resultado = {
+            "benchmark": "escrituras",
+            "concurrencia": args.concurrencia,
+            "operaciones": args.operaciones,
+            "escritor": {
+                modo: [_medir_escritor(ruta_db, modo, p, args) for p in args.procesos] for modo in MODOS
+            },
+            "backend": _niveles_backend(ruta_db, args),
+        }
+    emitir(resultado, args.salida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Calibración del coste de la KDF de contraseñas.
+
+Mide cuánto tarda un hash en un núcleo para varios parámetros de scrypt y PBKDF2, y recomienda
+los parámetros más costosos que todavía permiten el objetivo de registros por segundo y núcleo.
+El resultado incluye las variables de entorno a configurar en `nueva_app_reflex.hashing`.
+
+Uso:
+    python -m benchmarks.bench_hashing --objetivo 20 --salida hashing.json
+"""
+
+import argparse
+import secrets
+import time
+from typing import Dict, List
+
+from benchmarks._comun import emitir, percentiles
+from nueva_app_reflex.hashing import HASHERS
+
+CANDIDATOS = {
+    "scrypt": [{"n": 2 ** k, "r": 8, "p": 1} for k in range(12, 18)],
+    "pbkdf2_sha256": [{"i": i} for i in (100_000, 200_000, 400_000, 600_000, 1_000_000)],
+}
+
+VARIABLES_ENTORNO = {
+    "scrypt": {"n": "SCRYPT_N", "r": "SCRYPT_R", "p": "SCRYPT_P"},
+    "pbkdf2_sha256": {"i": "PBKDF2_ITERATIONS"},
+}
+
+
+def _medir(algoritmo: str, parametros: Dict[str, int], repeticiones: int) -> List[float]:
+    hasher = HASHERS[algoritmo]
+    tiempos = []
+    for _ in range(repeticiones):
+        sal = secrets.token_bytes(16)
+        inicio = time.perf_counter()
+        hasher.derivar("contraseña de prueba", sal, parametros)
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objetivo", type=float, default=20.0, help="Registros por segundo y núcleo.")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--algoritmos", nargs="+", default=list(CANDIDATOS), choices=list(CANDIDATOS))
+    parser.add_argument("--salida", help="Archivo JSON de salida (por defecto, stdout).")
+    args = parser.parse_args()
+
+    resultado = {"benchmark": "hashing", "objetivo_por_nucleo": args.objetivo, "algoritmos": {}}
+    for algoritmo in args.algoritmos:
+        mediciones = []
+        recomendado = None
+        for parametros in CANDIDATOS[algoritmo]:
+            resumen = percentiles(_medir(algoritmo, parametros, args.repeticiones))
+            resumen["parametros"] = parametros
+            resumen["hashes_por_segundo_nucleo"] = round(1000 / resumen["p50_ms"], 1)
+            mediciones.append(resumen)
+            # Los candidatos van de menor a mayor coste: se queda el último que cumple el objetivo.
+            if resumen["hashes_por_segundo_nucleo"] >= args.objetivo:
+                recomendado = parametros
+        resultado["algoritmos"][algoritmo] = {
+            "mediciones": mediciones,
+            "recomendado": recomendado,
+            "entorno": {
+                VARIABLES_ENTORNO[algoritmo][k]: v for k, v in (recomendado or {}).items()
+            },
+        }
+    emitir(resultado, args.salida)
+
+
+if __name__ == "__main__":
+    main()
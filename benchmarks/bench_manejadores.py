@@ -0,0 +1,107 @@
+"""
+Microbenchmark de los manejadores de eventos `State.registrar_usuario` y `State.consultar_usuarios`.
+
+Llama a los manejadores directamente (sin websocket) sobre una base SQLite temporal que va
+creciendo hasta cada tamaño pedido (1k, 100k y 1M usuarios por defecto). Para cada tamaño mide:
+
+- `consultar_usuarios` con la caché de usuarios invalidada antes de cada llamada (coste real de
+  la consulta) y con la caché caliente (lo que ven los clientes que refrescan la misma página).
+- `registrar_usuario`, que incluye el hash de la contraseña en el pool de procesos y el INSERT
+  en el hilo escritor.
+
+Uso:
+    python -m benchmarks.bench_manejadores --tamanos 1000 100000 1000000 --salida manejadores.json
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable, List
+
+import reflex as rx
+
+from benchmarks._comun import base_temporal, emitir, percentiles, sembrar_usuarios
+from nueva_app_reflex import hashing
+from nueva_app_reflex.db import asincrono, database
+from nueva_app_reflex.db.usuarios import cache_usuarios
+from nueva_app_reflex.state import State
+
+
+def _nuevo_estado() -> State:
+    """
+    Crea un State fuera de una app en ejecución, como el que Reflex asocia a cada cliente.
+    """
+    raiz = rx.State(_reflex_internal_init=True)
+    return raiz.get_substate(State.get_full_name().split(".")[1:])
+
+
+async def _medir(operacion: Callable[[int], Awaitable], repeticiones: int, antes=None) -> dict:
+    tiempos: List[float] = []
+    inicio_total = time.perf_counter()
+    for i in range(repeticiones):
+        if antes is not None:
+            antes()
+        inicio = time.perf_counter()
+        await operacion(i)
+        tiempos.append(time.perf_counter() - inicio)
+    resultado = percentiles(tiempos)
+    resultado["operaciones_por_segundo"] = round(repeticiones / (time.perf_counter() - inicio_total), 1)
+    return resultado
+
+
+async def _medir_tamano(estado: State, tamano: int, repeticiones: int, registros: int) -> dict:
+    async def consultar(_: int) -> None:
+        await estado.consultar_usuarios()
+
+    async def registrar(i: int) -> None:
+        await estado.registrar_usuario(f"bench{tamano}_{i}", f"bench{tamano}_{i}@ejemplo.com", "secreto123")
+
+    # Primera llamada fuera de la medición: importa módulos perezosos y arranca el pool de hashing.
+    await consultar(0)
+    return {
+        "usuarios": tamano,
+        "consultar_usuarios_sin_cache": await _medir(consultar, repeticiones, antes=cache_usuarios.invalidar),
+        "consultar_usuarios_con_cache": await _medir(consultar, repeticiones),
+        "registrar_usuario": await _medir(registrar, registros),
+    }
+
+
+async def _main(args: argparse.Namespace) -> dict:
+    estado = _nuevo_estado()
+    await hashing.generar_hash_async("calentamiento")
+    resultado = {
+        "benchmark": "manejadores",
+        "perfil": database.DB_PROFILE,
+        "algoritmo_hash": hashing.ALGORITMO,
+        "tamanos": [],
+    }
+    sembrados = 0
+    try:
+        for tamano in sorted(args.tamanos):
+            inicio = time.perf_counter()
+            sembrar_usuarios(database.engine, tamano, desde=sembrados)
+            sembrados = tamano
+            medicion = await _medir_tamano(estado, tamano, args.repeticiones, args.registros)
+            medicion["siembra_s"] = round(time.perf_counter() - inicio, 2)
+            resultado["tamanos"].append(medicion)
+    finally:
+        asincrono.cerrar()
+        hashing.cerrar()
+    resultado["cache"] = cache_usuarios.metricas()
+    return resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--repeticiones", type=int, default=200, help="Consultas medidas por tamaño.")
+    parser.add_argument("--registros", type=int, default=50, help="Registros medidos por tamaño.")
+    parser.add_argument("--salida", help="Archivo JSON de salida (por defecto, stdout).")
+    args = parser.parse_args()
+    with base_temporal():
+        resultado = asyncio.run(_main(args))
+    emitir(resultado, args.salida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Generador de carga: N clientes Socket.IO concurrentes contra un backend Reflex local.
+
+Arranca el backend en modo producción (`reflex run --env prod --backend-only`) sobre una base
+SQLite temporal sembrada con `--usuarios` usuarios, o usa uno ya arrancado con `--url`. Cada
+cliente se conecta por websocket como lo haría el navegador, envía el evento de hidratación y
+después `State.consultar_usuarios` (y, con `--escrituras`, una fracción de `registrar_usuario`)
+con una pausa entre peticiones. La latencia va desde que el cliente quería enviar el evento
+hasta que recibe la última actualización de estado de ese evento.
+
+Requiere el cliente asíncrono de Socket.IO: pip install -r benchmarks/requirements.txt
+
+Uso:
+    python -m benchmarks.carga_websocket --clientes 10 50 100 --salida carga.json
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from benchmarks._comun import base_temporal, emitir, percentiles, sembrar_usuarios
+from benchmarks._servidor import (
+    EVENTO_CONSULTAR,
+    EVENTO_HIDRATAR,
+    EVENTO_REGISTRAR,
+    Cliente,
+    ErrorCarga,
+    arrancar_backend,
+)
+from nueva_app_reflex.db import database
+
+
+@contextmanager
+def _backend(usuarios: int) -> Iterator[str]:
+    """
+    Crea y siembra la base temporal y arranca el backend en producción sobre ella.
+
+    Yields:
+        str: URL base del backend.
+    """
+    with base_temporal() as ruta_db:
+        sembrar_usuarios(database.engine, usuarios)
+        database.cerrar_motores()
+        with arrancar_backend(ruta_db, os.path.join(os.path.dirname(ruta_db), "backend.log")) as url:
+            yield url
+
+
+async def _simular_cliente(url: str, numero: int, args: argparse.Namespace, ronda: dict) -> None:
+    cliente = Cliente(url)
+    # Los clientes no llegan todos a la vez: se reparte la conexión dentro de una pausa.
+    await asyncio.sleep(random.uniform(0, args.pausa))
+    try:
+        inicio = time.perf_counter()
+        await cliente.conectar()
+        await cliente.enviar(EVENTO_HIDRATAR)
+        ronda["conexiones"].append(time.perf_counter() - inicio)
+        previsto = time.perf_counter()
+        for i in range(args.peticiones):
+            if random.random() < args.escrituras:
+                nombre = f"carga{ronda['clientes']}_{numero}_{i}_{cliente.token[:8]}"
+                payload = {"nombre": nombre, "email": f"{nombre}@ejemplo.com", "password": "secreto123"}
+                await cliente.enviar(EVENTO_REGISTRAR, payload)
+            else:
+                await cliente.enviar(EVENTO_CONSULTAR)
+            fin = time.perf_counter()
+            ronda["latencias"].append(fin - previsto)
+            previsto = fin + args.pausa
+            await asyncio.sleep(args.pausa)
+    except ErrorCarga as e:
+        ronda["errores"].append(str(e))
+    finally:
+        if cliente.sio.connected:
+            await cliente.cerrar()
+
+
+async def _ronda(url: str, clientes: int, args: argparse.Namespace) -> dict:
+    ronda = {"clientes": clientes, "latencias": [], "conexiones": [], "errores": []}
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_simular_cliente(url, n, args, ronda) for n in range(clientes)))
+    duracion = time.perf_counter() - inicio
+    resultado = {"clientes": clientes, **percentiles(ronda["latencias"])}
+    resultado["eventos_por_segundo"] = round(len(ronda["latencias"]) / duracion, 1)
+    resultado["conexion"] = percentiles(ronda["conexiones"])
+    resultado["errores"] = len(ronda["errores"])
+    # Unos pocos mensajes de ejemplo bastan para diagnosticar sin inflar el JSON.
+    resultado["ejemplos_errores"] = sorted(set(ronda["errores"]))[:5]
+    return resultado
+
+
+async def _rondas(url: str, args: argparse.Namespace) -> List[dict]:
+    return [await _ronda(url, clientes, args) for clientes in args.clientes]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clientes", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--peticiones", type=int, default=20, help="Eventos por cliente.")
+    parser.add_argument("--pausa", type=float, default=0.5, help="Segundos entre eventos de un cliente.")
+    parser.add_argument("--escrituras", type=float, default=0.0, help="Fracción de eventos que registran un usuario.")
+    parser.add_argument("--usuarios", type=int, default=1000, help="Usuarios sembrados en la base temporal.")
+    parser.add_argument("--url", help="Backend ya arrancado (por defecto se arranca uno local).")
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument("--salida", help="Archivo JSON de salida (por defecto, stdout).")
+    args = parser.parse_args()
+    random.seed(args.semilla)
+
+    resultado = {
+        "benchmark": "carga_websocket",
+        "usuarios": args.usuarios,
+        "pausa_s": args.pausa,
+        "escrituras": args.escrituras,
+    }
+    if args.url:
+        resultado["rondas"] = asyncio.run(_rondas(args.url, args))
+    else:
+        with _backend(args.usuarios) as url:
+            resultado["rondas"] = asyncio.run(_rondas(url, args))
+    emitir(resultado, args.salida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Compara dos resultados JSON de los benchmarks (por ejemplo, de dos commits) métrica a métrica.
+
+Las métricas de latencia (`*_ms`) empeoran al subir y las de rendimiento (`*_por_segundo`) al
+bajar. Un cambio peor que la tolerancia relativa se marca como regresión y el proceso termina
+con código 1, de modo que se puede usar en CI.
+
+Uso:
+    python -m benchmarks.comparar base.json nuevo.json --tolerancia 0.10
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+# Claves que identifican un elemento de una lista de resultados (una ronda, un tamaño...).
+CLAVES_ELEMENTO = ("clientes", "usuarios", "tamano", "algoritmo", "procesos", "workers")
+
+
+def _etiqueta(elemento: Any, indice: int) -> str:
+    if isinstance(elemento, dict):
+        for clave in CLAVES_ELEMENTO:
+            if clave in elemento:
+                return f"{clave}={elemento[clave]}"
+    return str(indice)
+
+
+def aplanar(datos: Any, prefijo: str = "") -> Dict[str, float]:
+    """
+    Convierte un resultado anidado en {ruta: valor} con sólo las métricas comparables.
+    """
+    metricas: Dict[str, float] = {}
+    if isinstance(datos, dict):
+        for clave, valor in datos.items():
+            if clave == "entorno":
+                continue
+            ruta = f"{prefijo}.{clave}" if prefijo else clave
+            if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+                if clave.endswith("_ms") or clave.endswith("_por_segundo"):
+                    metricas[ruta] = float(valor)
+            else:
+                metricas.update(aplanar(valor, ruta))
+    elif isinstance(datos, list):
+        for indice, elemento in enumerate(datos):
+            metricas.update(aplanar(elemento, f"{prefijo}[{_etiqueta(elemento, indice)}]"))
+    return metricas
+
+
+def comparar(
+    base: dict, nuevo: dict, tolerancia: float
+) -> List[Tuple[str, float, float, Optional[float], bool]]:
+    """
+    Devuelve (métrica, base, nuevo, cambio relativo, es_regresión) para las métricas comunes.
+    """
+    metricas_base, metricas_nuevo = aplanar(base), aplanar(nuevo)
+    filas = []
+    for ruta in sorted(metricas_base.keys() & metricas_nuevo.keys()):
+        antes, despues = metricas_base[ruta], metricas_nuevo[ruta]
+        cambio = (despues - antes) / antes if antes else None
+        peor = cambio is not None and (cambio > tolerancia if ruta.endswith("_ms") else cambio < -tolerancia)
+        filas.append((ruta, antes, despues, cambio, peor))
+    return filas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base", help="Resultado de referencia.")
+    parser.add_argument("nuevo", help="Resultado a comparar.")
+    parser.add_argument("--tolerancia", type=float, default=0.10, help="Cambio relativo tolerado (0.10 = 10%%).")
+    parser.add_argument("--solo-regresiones", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.nuevo, encoding="utf-8") as f:
+        nuevo = json.load(f)
+
+    print(f"base:  {base.get('entorno', {}).get('commit')}  nuevo: {nuevo.get('entorno', {}).get('commit')}")
+    filas = comparar(base, nuevo, args.tolerancia)
+    for ruta, antes, despues, cambio, peor in filas:
+        if args.solo_regresiones and not peor:
+            continue
+        texto_cambio = f"{cambio:+.1%}" if cambio is not None else "n/a"
+        print(f"{'REGRESIÓN' if peor else '':9}  {ruta:70} {antes:12.3f} {despues:12.3f} {texto_cambio:>8}")
+    regresiones = sum(1 for fila in filas if fila[4])
+    print(f"{len(filas)} métricas comparadas, {regresiones} regresiones (tolerancia {args.tolerancia:.0%}).")
+    sys.exit(1 if regresiones else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/bin/sh
+# Arranque del backend en producción (imagen `backend` del Dockerfile).
+#
+# 1. Aplica las migraciones pendientes: el backend no crea el esquema al importar.
+# 2. Arranca gunicorn con el mismo comando que `reflex run --env prod --backend-only`, pero sin
+#    pasar por la CLI de Reflex, que importa la aplicación una vez más antes de lanzar gunicorn
+#    y consulta PyPI. El frontend ya se compiló al construir la imagen.
+#
+# Variables: BACKEND_HOST (0.0.0.0), BACKEND_PORT (8000), GUNICORN_LOG_LEVEL (warning),
+# BACKEND_WORKERS (1) y HASH_WORKERS (núcleos / BACKEND_WORKERS). Con más de un worker hace falta
+# REDIS_URL: el estado de las sesiones debe ser compartido, y las escrituras de cada worker pasan
+# por su escritor agrupado a la misma base.
+set -e
+
+WORKERS="${BACKEND_WORKERS:-1}"
+if [ "$WORKERS" -gt 1 ] && [ -z "$REDIS_URL" ]; then
+    echo "BACKEND_WORKERS=$WORKERS requiere REDIS_URL (gestor de estado compartido entre workers)." >&2
+    exit 1
+fi
+
+# Cada worker de gunicorn tiene su propio pool de hashing. Sin HASH_WORKERS, cada pool tendría
+# tantos procesos como núcleos: se reparten los núcleos entre los workers.
+if [ -z "$HASH_WORKERS" ]; then
+    HASH_WORKERS=$(( $(nproc) / WORKERS ))
+    [ "$HASH_WORKERS" -ge 1 ] || HASH_WORKERS=1
+    export HASH_WORKERS
+fi
+
+cd "$(dirname "$0")"
+
+python -m nueva_app_reflex.db.migraciones
+
+# Las mismas variables que fija `reflex run --env prod --backend-only` para gunicorn
+# (__REFLEX_SKIP_COMPILE es interna de Reflex; la versión está fijada en requirements.txt).
+export REFLEX_ENV_MODE=prod
+export __REFLEX_SKIP_COMPILE=true
+# Reflex sondea 1.1.1.1 al importarse para elegir la dirección de su cliente HTTP: sin salida a
+# Internet, cada proceso espera varios segundos. Con la dirección fijada no hay sondeo.
+export REFLEX_HTTP_CLIENT_BIND_ADDRESS="${REFLEX_HTTP_CLIENT_BIND_ADDRESS:-0.0.0.0}"
+
+# Estado de las sesiones de la ejecución anterior, como hace `reflex run` al arrancar.
+rm -rf .states
+
+# Sin --max-requests: reciclar el worker corta las conexiones websocket abiertas.
+exec gunicorn \
+    --worker-class uvicorn.workers.UvicornH11Worker \
+    --workers "$WORKERS" \
+    --preload \
+    --timeout 120 \
+    --bind "${BACKEND_HOST:-0.0.0.0}:${BACKEND_PORT:-8000}" \
+    --log-level "${GUNICORN_LOG_LEVEL:-warning}" \
+    "nueva_app_reflex.nueva_app_reflex:app()"
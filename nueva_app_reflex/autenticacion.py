@@ -0,0 +1,44 @@
+"""
+Autenticación de usuarios.
+Verifica contraseñas en el pool de procesos de hashing y, si el hash almacenado usa parámetros
+antiguos, lo recalcula con los actuales de forma transparente durante el inicio de sesión.
+"""
+
+from typing import Optional
+
+from nueva_app_reflex import hashing
+from nueva_app_reflex.db import asincrono
+from nueva_app_reflex.db.usuarios import actualizar_password_hash, obtener_credenciales
+
+# Hash con el que se verifica cuando el usuario no existe, para que la respuesta tarde lo mismo.
+# Se calcula en el primer uso para no pagar la KDF al importar el módulo.
+_hash_ficticio: Optional[str] = None
+
+
+async def autenticar(nombre: str, password: str) -> Optional[dict]:
+    """
+    Comprueba las credenciales de un usuario.
+
+    Args:
+        nombre: Nombre de usuario.
+        password: Contraseña en claro.
+
+    Returns:
+        Optional[dict]: Los datos públicos del usuario si las credenciales son válidas, o None.
+    """
+    credenciales = await asincrono.leer(obtener_credenciales, nombre)
+    if credenciales is None:
+        global _hash_ficticio
+        if _hash_ficticio is None:
+            _hash_ficticio = await hashing.generar_hash_async("contraseña-ficticia")
+        await hashing.verificar_async(password, _hash_ficticio)
+        return None
+
+    password_hash = credenciales.pop("password_hash")
+    if not await hashing.verificar_async(password, password_hash):
+        return None
+
+    if hashing.necesita_rehash(password_hash):
+        nuevo_hash = await hashing.generar_hash_async(password)
+        await asincrono.ejecutar(actualizar_password_hash, credenciales["id"], nuevo_hash)
+    return credenciales
@@ -1,4 +1,12 @@
 # Permite que el directorio db sea tratado como un paquete de Python.
 # Importa explícitamente los modelos y la sesión para facilitar el acceso desde otros módulos.
 from .models import Base, Usuario, Tarea
-from .database import SessionLocal, engine
+from .database import SessionLocal, SessionLectura
+from . import database
+
+
+def __getattr__(nombre: str):
+    # Los motores se crean la primera vez que se piden, no al importar el paquete.
+    if nombre in ("engine", "engine_lectura"):
+        return getattr(database, nombre)
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
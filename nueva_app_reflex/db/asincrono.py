@@ -0,0 +1,78 @@
+"""
+Capa de acceso asíncrono a la base de datos para los manejadores de eventos de Reflex.
+Las llamadas bloqueantes de SQLAlchemy se ejecutan en pools de hilos acotados, de modo que
+una consulta lenta o un commit esperando el bloqueo de SQLite no detienen el bucle de eventos
+ni al resto de clientes conectados.
+Las lecturas y las escrituras usan hilos separados: las consultas de listado nunca esperan
+detrás de un registro. El tamaño del pool de lectura se configura con DB_MAX_WORKERS; las
+escrituras pasan todas por el escritor único de `escritor.py`, que las confirma en lotes.
+El tiempo que cada operación espera a un hilo libre se mide en el histograma `pool_espera_ms`.
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+from sqlalchemy.orm import sessionmaker
+
+from nueva_app_reflex.instrumentacion import metricas
+
+from .database import SessionLectura, SessionLocal
+from .escritor import EscritorAgrupado
+
+T = TypeVar("T")
+
+DB_MAX_WORKERS = int(os.environ.get("DB_MAX_WORKERS", "8"))
+
+_executor_lectura = ThreadPoolExecutor(max_workers=DB_MAX_WORKERS, thread_name_prefix="db-lectura")
+# Un único hilo escritor: coincide con la única conexión del motor de escritura.
+_escritor = EscritorAgrupado(SessionLocal)
+
+
+def _con_sesion(
+    fabrica: sessionmaker, pool: str, encolada: float, funcion: Callable[..., T], args: tuple, kwargs: dict
+) -> T:
+    """
+    Abre una sesión, ejecuta la función y cierra la sesión en el hilo del pool.
+    """
+    metricas.observar("pool_espera_ms", (time.perf_counter() - encolada) * 1000, pool=pool)
+    db = fabrica()
+    try:
+        return funcion(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+async def ejecutar(funcion: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Ejecuta `funcion(db, *args, **kwargs)` en el escritor único, fuera del bucle de eventos.
+    La función no debe llamar a `commit()`: el escritor confirma su lote y entonces responde.
+
+    Args:
+        funcion: Función síncrona que recibe una Session como primer argumento.
+
+    Returns:
+        El valor devuelto por la función. Las excepciones se propagan al llamador.
+    """
+    return await asyncio.wrap_future(_escritor.enviar(funcion, *args, **kwargs))
+
+
+async def leer(funcion: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Igual que `ejecutar`, pero con una sesión de sólo lectura en el pool de lectura.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _executor_lectura, partial(_con_sesion, SessionLectura, "lectura", time.perf_counter(), funcion, args, kwargs)
+    )
+
+
+def cerrar() -> None:
+    """
+    Espera a que terminen las operaciones pendientes y libera los hilos de los pools.
+    """
+    _executor_lectura.shutdown(wait=True)
+    _escritor.cerrar()
@@ -0,0 +1,184 @@
+"""
+Búsqueda de texto completo sobre usuarios y tareas con tablas virtuales FTS5 de SQLite.
+Las tablas usuarios_fts y tareas_fts son índices de contenido externo (no duplican los datos) y
+se mantienen sincronizadas con usuarios y tareas mediante triggers.
+
+La última palabra escrita se busca como prefijo y las anteriores como palabras completas. Los
+resultados se ordenan por relevancia (bm25) sólo cuando hay pocas coincidencias: calcular bm25
+cuesta lo mismo por cada fila que coincide, así que para búsquedas muy amplias (por ejemplo, dos
+letras) se devuelven las coincidencias más recientes, que FTS5 obtiene sin recorrer el resto.
+"""
+
+import re
+import sqlite3
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from .models import Tarea, Usuario
+
+# Resultados máximos por búsqueda.
+LIMITE_RESULTADOS = 20
+# Coincidencias a partir de las cuales no se ordena por relevancia sino por recientes.
+UMBRAL_RANKING = 500
+# Longitud mínima del prefijo buscado: un solo carácter coincide con casi todo el índice.
+LONGITUD_MIN_PREFIJO = 2
+# Longitud máxima de los índices de prefijo de cada tabla: hasta esa longitud, las búsquedas
+# mientras se escribe usan un doclist precalculado en lugar de combinar todos los términos que
+# empiezan por el prefijo. En usuarios los términos suelen ser únicos por fila ("garcia123") y
+# cualquier prefijo largo coincide con miles de términos, así que se indexan prefijos más largos.
+LONGITUD_MAX_PREFIJO = {"usuarios_fts": 10, "tareas_fts": 6}
+
+
+def _tokenizador(tabla: str) -> str:
+    prefijos = " ".join(str(n) for n in range(LONGITUD_MIN_PREFIJO, LONGITUD_MAX_PREFIJO[tabla] + 1))
+    return f"tokenize = \"unicode61 remove_diacritics 2\", prefix = '{prefijos}'"
+
+
+_DDL_BUSQUEDA = {
+    "usuarios_fts": [
+        f"""CREATE VIRTUAL TABLE usuarios_fts USING fts5(
+            nombre, email, content = 'usuarios', content_rowid = 'id', {_tokenizador('usuarios_fts')}
+        )""",
+        """CREATE TRIGGER usuarios_fts_ai AFTER INSERT ON usuarios BEGIN
+            INSERT INTO usuarios_fts(rowid, nombre, email) VALUES (new.id, new.nombre, new.email);
+        END""",
+        """CREATE TRIGGER usuarios_fts_ad AFTER DELETE ON usuarios BEGIN
+            INSERT INTO usuarios_fts(usuarios_fts, rowid, nombre, email)
+            VALUES ('delete', old.id, old.nombre, old.email);
+        END""",
+        """CREATE TRIGGER usuarios_fts_au AFTER UPDATE OF nombre, email ON usuarios BEGIN
+            INSERT INTO usuarios_fts(usuarios_fts, rowid, nombre, email)
+            VALUES ('delete', old.id, old.nombre, old.email);
+            INSERT INTO usuarios_fts(rowid, nombre, email) VALUES (new.id, new.nombre, new.email);
+        END""",
+    ],
+    "tareas_fts": [
+        f"""CREATE VIRTUAL TABLE tareas_fts USING fts5(
+            descripcion, content = 'tareas', content_rowid = 'id', {_tokenizador('tareas_fts')}
+        )""",
+        """CREATE TRIGGER tareas_fts_ai AFTER INSERT ON tareas BEGIN
+            INSERT INTO tareas_fts(rowid, descripcion) VALUES (new.id, new.descripcion);
+        END""",
+        """CREATE TRIGGER tareas_fts_ad AFTER DELETE ON tareas BEGIN
+            INSERT INTO tareas_fts(tareas_fts, rowid, descripcion) VALUES ('delete', old.id, old.descripcion);
+        END""",
+        # Sólo al cambiar la descripción: marcar tareas como completadas no reindexa nada.
+        """CREATE TRIGGER tareas_fts_au AFTER UPDATE OF descripcion ON tareas BEGIN
+            INSERT INTO tareas_fts(tareas_fts, rowid, descripcion) VALUES ('delete', old.id, old.descripcion);
+            INSERT INTO tareas_fts(rowid, descripcion) VALUES (new.id, new.descripcion);
+        END""",
+    ],
+}
+
+
+def crear_indices_busqueda(conexion: sqlite3.Connection) -> None:
+    """
+    Crea las tablas FTS5 y sus triggers si no existen. Si una tabla se crea sobre datos ya
+    existentes, se reconstruye su índice a partir de la tabla de contenido.
+    La ejecuta la migración de la búsqueda, dentro de su transacción.
+    """
+    existentes = {
+        fila[0]
+        for fila in conexion.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE '%_fts'")
+    }
+    for tabla, sentencias in _DDL_BUSQUEDA.items():
+        if tabla in existentes:
+            continue
+        for sentencia in sentencias:
+            conexion.execute(sentencia)
+        conexion.execute(f"INSERT INTO {tabla}({tabla}) VALUES ('rebuild')")
+
+
+def _palabras(texto: str) -> List[str]:
+    return re.findall(r"\w+", texto, flags=re.UNICODE)
+
+
+def consultas_fts(texto: str) -> Optional[Tuple[str, str]]:
+    """
+    Convierte el texto del usuario en consultas FTS5 seguras (cada palabra entre comillas).
+
+    Returns:
+        Optional[Tuple[str, str]]: La consulta con la última palabra como prefijo y la misma
+        consulta con la última palabra exacta, o None si el texto no permite buscar.
+    """
+    palabras = _palabras(texto)
+    if not palabras or len(palabras[-1]) < LONGITUD_MIN_PREFIJO:
+        return None
+    completas = " ".join(f'"{p}"' for p in palabras[:-1])
+    ultima = palabras[-1]
+    return f'{completas} "{ultima}"*'.strip(), f'{completas} "{ultima}"'.strip()
+
+
+def _buscar_ids(db: Session, tabla: str, texto: str, limite: int) -> List[int]:
+    """
+    Devuelve los ids que coinciden con el texto en la tabla FTS indicada, en orden de relevancia
+    si hay como mucho UMBRAL_RANKING coincidencias y, si no, de más reciente a más antiguo.
+    """
+    consultas = consultas_fts(texto)
+    if consultas is None:
+        return []
+    prefijo, exacta = consultas
+
+    def contar(consulta: str) -> int:
+        return db.execute(
+            text(f"SELECT count(*) FROM (SELECT rowid FROM {tabla} WHERE {tabla} MATCH :c LIMIT :n)"),
+            {"c": consulta, "n": UMBRAL_RANKING + 1},
+        ).scalar()
+
+    def ids(consulta: str, orden: str) -> List[int]:
+        return list(
+            db.execute(
+                text(f"SELECT rowid FROM {tabla} WHERE {tabla} MATCH :c ORDER BY {orden} LIMIT :n"),
+                {"c": consulta, "n": limite},
+            ).scalars()
+        )
+
+    # Un prefijo más largo que los índices de prefijo obliga a FTS5 a combinar los doclists de
+    # todos sus términos. Si la palabra exacta ya es demasiado amplia para ordenar por relevancia,
+    # se sirven sus coincidencias más recientes sin expandir el prefijo.
+    if len(_palabras(texto)[-1]) > LONGITUD_MAX_PREFIJO[tabla] and contar(exacta) > UMBRAL_RANKING:
+        return ids(exacta, "rowid DESC")
+    if contar(prefijo) > UMBRAL_RANKING:
+        return ids(prefijo, "rowid DESC")
+    return ids(prefijo, "rank")
+
+
+def _en_orden(filas: List[dict], ids: List[int]) -> List[dict]:
+    posicion = {id_: i for i, id_ in enumerate(ids)}
+    return sorted(filas, key=lambda f: posicion[f["id"]])
+
+
+def buscar_usuarios(db: Session, texto: str, limite: int = LIMITE_RESULTADOS) -> List[dict]:
+    """
+    Busca usuarios por prefijo de nombre o email.
+    """
+    ids = _buscar_ids(db, "usuarios_fts", texto, limite)
+    if not ids:
+        return []
+    filas = db.execute(
+        select(Usuario.id, Usuario.nombre, Usuario.email, Usuario.es_admin).where(Usuario.id.in_(ids))
+    ).mappings()
+    return _en_orden([dict(f) for f in filas], ids)
+
+
+def buscar_tareas(db: Session, texto: str, limite: int = LIMITE_RESULTADOS) -> List[dict]:
+    """
+    Busca tareas por prefijo de la descripción, con el nombre de su usuario.
+    """
+    ids = _buscar_ids(db, "tareas_fts", texto, limite)
+    if not ids:
+        return []
+    filas = db.execute(
+        select(
+            Tarea.id,
+            Tarea.descripcion,
+            Tarea.completada,
+            Tarea.usuario_id,
+            Usuario.nombre.label("usuario"),
+        )
+        .outerjoin(Usuario, Usuario.id == Tarea.usuario_id)
+        .where(Tarea.id.in_(ids))
+    ).mappings()
+    return _en_orden([{**f, "completada": bool(f["completada"])} for f in filas], ids)
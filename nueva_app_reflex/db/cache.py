@@ -0,0 +1,102 @@
+"""
+Caché de lectura compartida por todas las sesiones de clientes del proceso.
+Cada entrada caduca tras un TTL y, al superar el tamaño máximo, se descarta la usada hace más
+tiempo (LRU). Si varios hilos piden a la vez una clave ausente, sólo uno ejecuta la consulta y el
+resto espera su resultado, de modo que muchos clientes refrescando la misma página cuestan una
+única consulta a la base de datos.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class CacheLectura:
+    """
+    Caché read-through con TTL, tamaño acotado, invalidación explícita y métricas de aciertos.
+    """
+
+    def __init__(self, nombre: str, max_entradas: int = 256, ttl: float = 30.0):
+        self.nombre = nombre
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entradas: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._cargando: Dict[Hashable, threading.Event] = {}
+        # Se incrementa en cada invalidación: un resultado cargado antes no se guarda.
+        self._generacion = 0
+        self._aciertos = 0
+        self._fallos = 0
+        self._expulsiones = 0
+        self._invalidaciones = 0
+
+    def obtener(self, clave: Hashable, cargar: Callable[[], T]) -> T:
+        """
+        Devuelve el valor cacheado para la clave o lo calcula con `cargar()` y lo guarda.
+
+        Args:
+            clave: Clave de la entrada.
+            cargar: Función que consulta la base de datos si la entrada no está o ha caducado.
+
+        Returns:
+            El valor cacheado o recién cargado.
+        """
+        while True:
+            with self._lock:
+                entrada = self._entradas.get(clave)
+                if entrada is not None and entrada[1] > time.monotonic():
+                    self._entradas.move_to_end(clave)
+                    self._aciertos += 1
+                    return entrada[0]
+                en_curso = self._cargando.get(clave)
+                if en_curso is None:
+                    en_curso = threading.Event()
+                    self._cargando[clave] = en_curso
+                    generacion = self._generacion
+                    self._fallos += 1
+                    break
+            # Otro hilo ya está cargando esta clave: se espera y se vuelve a mirar la caché.
+            en_curso.wait()
+
+        try:
+            valor = cargar()
+            with self._lock:
+                if generacion == self._generacion:
+                    self._entradas[clave] = (valor, time.monotonic() + self.ttl)
+                    self._entradas.move_to_end(clave)
+                    while len(self._entradas) > self.max_entradas:
+                        self._entradas.popitem(last=False)
+                        self._expulsiones += 1
+            return valor
+        finally:
+            with self._lock:
+                self._cargando.pop(clave, None)
+            en_curso.set()
+
+    def invalidar(self) -> None:
+        """
+        Descarta todas las entradas; se llama cuando cambian los datos cacheados.
+        """
+        with self._lock:
+            self._entradas.clear()
+            self._generacion += 1
+            self._invalidaciones += 1
+
+    def metricas(self) -> Dict[str, Any]:
+        """
+        Devuelve los contadores de aciertos, fallos, expulsiones e invalidaciones.
+        """
+        with self._lock:
+            consultas = self._aciertos + self._fallos
+            return {
+                "cache": self.nombre,
+                "entradas": len(self._entradas),
+                "aciertos": self._aciertos,
+                "fallos": self._fallos,
+                "tasa_aciertos": round(self._aciertos / consultas, 4) if consultas else 0.0,
+                "expulsiones": self._expulsiones,
+                "invalidaciones": self._invalidaciones,
+            }
@@ -1,33 +1,246 @@
 """
 Módulo de configuración de la base de datos para la aplicación Reflex.
-Utiliza SQLAlchemy con SQLite y proporciona el motor, la sesión y la creación de tablas.
+Utiliza SQLAlchemy con SQLite y proporciona los motores y las sesiones.
 La ruta de la base de datos se puede configurar con la variable de entorno DATABASE_PATH o en el archivo .env.
+
+Importar este módulo no abre la base de datos: los motores se crean la primera vez que se abre
+una sesión o se llama a `obtener_motores()`, de modo que las variables de entorno pueden fijarse
+después de importar y compilar el frontend no necesita la base. El esquema no se crea aquí sino
+con las migraciones versionadas de `nueva_app_reflex.db.migraciones`.
+
+El perfil del motor se elige con DATABASE_PROFILE:
+- "produccion" (por defecto): WAL, synchronous=NORMAL, busy_timeout, mmap y caché de páginas,
+  con un motor de escritura de una sola conexión y un pool de conexiones de sólo lectura.
+- "basico": el comportamiento original, un único motor sin pragmas adicionales.
+
+En el motor que escribe es SQLAlchemy, y no el driver sqlite3, quien abre las transacciones:
+así los SAVEPOINT de `Session.begin_nested()` funcionan y, en producción, cada transacción toma
+el bloqueo con BEGIN IMMEDIATE y espera busy_timeout si otro proceso está escribiendo, en lugar
+de fallar con "database is locked" al pasar de lectura a escritura a mitad de la transacción.
 """
 
+import logging
 import os
+import threading
 from pathlib import Path
-from dotenv import load_dotenv
-load_dotenv()
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from .models import Base
+from typing import Callable, Optional, Tuple
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from nueva_app_reflex.instrumentacion import instrumentar_motor
 
-# Obtener la ruta de la base de datos desde la variable de entorno o usar ruta relativa por defecto
+logger = logging.getLogger(__name__)
+
+# Ruta relativa por defecto si no se define DATABASE_PATH
 DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "app.db"
-DB_PATH = os.environ.get("DATABASE_PATH", str(DEFAULT_DB_PATH))
-DATABASE_URL = f"sqlite:///{DB_PATH}"
+PERFILES = ("basico", "produccion")
+# Clave de Session.info con las funciones pendientes de `al_confirmar`.
+CLAVE_AL_CONFIRMAR = "al_confirmar"
+
+
+def ruta_base_datos() -> str:
+    """
+    Ruta del archivo SQLite según DATABASE_PATH en el momento de la llamada.
+    """
+    return os.environ.get("DATABASE_PATH", str(DEFAULT_DB_PATH))
+
+
+def perfil_motor() -> str:
+    """
+    Perfil del motor según DATABASE_PROFILE en el momento de la llamada.
+    """
+    perfil = os.environ.get("DATABASE_PROFILE", "produccion")
+    if perfil not in PERFILES:
+        raise ValueError(f"DATABASE_PROFILE debe ser uno de {sorted(PERFILES)}; se recibió '{perfil}'.")
+    return perfil
+
+
+def _pragmas_produccion() -> dict:
+    """
+    Pragmas aplicados a cada conexión nueva en el perfil de producción.
+    """
+    return {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        # Valor negativo: tamaño en KiB (64 MiB) en lugar de número de páginas.
+        "cache_size": int(os.environ.get("SQLITE_CACHE_SIZE", str(-64 * 1024))),
+        "temp_store": "MEMORY",
+        "foreign_keys": "ON",
+    }
+
+
+def _registrar_pragmas(motor: Engine, pragmas: dict) -> None:
+    """
+    Ejecuta los pragmas indicados en cada conexión que abra el motor.
+    """
+    if not pragmas:
+        return
+
+    @event.listens_for(motor, "connect")
+    def _aplicar_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for nombre, valor in pragmas.items():
+                cursor.execute(f"PRAGMA {nombre}={valor}")
+        finally:
+            cursor.close()
+
+
+def _registrar_transacciones(motor: Engine, begin: str) -> None:
+    """
+    Desactiva la gestión de transacciones del driver sqlite3 y emite `begin` al empezar cada
+    transacción de SQLAlchemy (la receta de la documentación de SQLAlchemy para pysqlite).
+    """
+
+    @event.listens_for(motor, "connect")
+    def _sin_transacciones_del_driver(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(motor, "begin")
+    def _begin(conexion):
+        conexion.exec_driver_sql(begin)
+
+
+def _crear_motores(ruta: str, perfil: str) -> Tuple[Engine, Engine]:
+    """
+    Crea el motor de escritura y el de lectura (el mismo en el perfil básico).
+    """
+    if perfil == "basico":
+        # Crear el motor de la base de datos con el parámetro necesario para SQLite
+        motor = create_engine(f"sqlite:///{ruta}", connect_args={"check_same_thread": False})
+        _registrar_transacciones(motor, "BEGIN")
+        instrumentar_motor(motor, "unico")
+        return motor, motor
+
+    pragmas = _pragmas_produccion()
+    # Motor de escritura: una única conexión, de modo que las escrituras se serializan en el
+    # pool de SQLAlchemy en lugar de competir por el bloqueo de SQLite.
+    escritura = create_engine(
+        f"sqlite:///{ruta}",
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        pool_size=1,
+        max_overflow=0,
+    )
+    _registrar_pragmas(escritura, pragmas)
+    # Cada transacción del escritor pide el bloqueo de escritura desde el principio.
+    _registrar_transacciones(escritura, "BEGIN IMMEDIATE")
+
+    # Motor de lectura: conexiones de sólo lectura que, gracias a WAL, no esperan a los escritores.
+    # journal_mode no se puede cambiar desde una conexión de sólo lectura; lo fija el escritor.
+    pragmas_lectura = {k: v for k, v in pragmas.items() if k != "journal_mode"}
+    pragmas_lectura["query_only"] = "ON"
+    lectura = create_engine(
+        f"sqlite:///{Path(ruta).resolve().as_uri()}?mode=ro&uri=true",
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        # Conexiones de sólo lectura que se mantienen abiertas.
+        pool_size=int(os.environ.get("DATABASE_READ_POOL_SIZE", "8")),
+        max_overflow=0,
+    )
+    _registrar_pragmas(lectura, pragmas_lectura)
+    instrumentar_motor(escritura, "escritura")
+    instrumentar_motor(lectura, "lectura")
+    return escritura, lectura
+
+
+_motores: Optional[Tuple[Engine, Engine]] = None
+_lock = threading.Lock()
+
+
+def obtener_motores() -> Tuple[Engine, Engine]:
+    """
+    Crea los motores la primera vez que se necesitan y enlaza con ellos las sesiones.
+
+    Returns:
+        Tuple[Engine, Engine]: El motor de escritura y el de lectura.
+    """
+    global _motores
+    if _motores is None:
+        with _lock:
+            if _motores is None:
+                ruta, perfil = ruta_base_datos(), perfil_motor()
+                escritura, lectura = _crear_motores(ruta, perfil)
+                SessionLocal.configure(bind=escritura)
+                SessionLectura.configure(bind=lectura)
+                logger.info("base de datos", extra={"campos": {"ruta": ruta, "perfil": perfil}})
+                _motores = escritura, lectura
+    return _motores
+
+
+def cerrar_motores() -> None:
+    """
+    Cierra las conexiones de los motores y los olvida: la siguiente sesión vuelve a leer la
+    configuración. Lo usan los benchmarks y las herramientas que cambian de base de datos.
+    """
+    global _motores
+    with _lock:
+        if _motores is None:
+            return
+        escritura, lectura = _motores
+        escritura.dispose()
+        lectura.dispose()
+        _motores = None
+
+
+class _FabricaSesiones(sessionmaker):
+    """
+    sessionmaker que crea los motores al abrir la primera sesión.
+    """
+
+    def __call__(self, **local_kw):
+        if _motores is None:
+            obtener_motores()
+        return super().__call__(**local_kw)
 
-print(f"[DEBUG] Usando base de datos en: {DB_PATH}")
 
-# Crear el motor de la base de datos con el parámetro necesario para SQLite
-engine: Engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
-)
 # Crear la clase SessionLocal para generar sesiones de base de datos
-SessionLocal = sessionmaker(
-    autocommit=False, autoflush=False, bind=engine
-)
+SessionLocal = _FabricaSesiones(autocommit=False, autoflush=False)
+# Sesiones para consultas: usan el pool de lectura y nunca escriben
+SessionLectura = _FabricaSesiones(autocommit=False, autoflush=False)
+
+
+def al_confirmar(db: Session, funcion: Callable[[], None]) -> None:
+    """
+    Ejecuta `funcion` cuando se confirme la transacción de la sesión, y nunca si se deshace.
+    Las funciones de escritura lo usan para sus efectos fuera de la base (invalidar cachés,
+    publicar novedades): con el escritor agrupado su commit es el del lote entero.
+    """
+    db.info.setdefault(CLAVE_AL_CONFIRMAR, []).append(funcion)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _ejecutar_al_confirmar(db: Session) -> None:
+    # El evento también llega al liberar un SAVEPOINT; sólo cuenta el commit de la transacción raíz.
+    if db.in_nested_transaction():
+        return
+    for funcion in db.info.pop(CLAVE_AL_CONFIRMAR, []):
+        try:
+            funcion()
+        except Exception:
+            logger.exception("error tras el commit")
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _descartar_al_confirmar(db: Session) -> None:
+    # Deshacer un SAVEPOINT no descarta nada aquí: lo hace quien abrió el SAVEPOINT.
+    if not db.in_nested_transaction():
+        db.info.pop(CLAVE_AL_CONFIRMAR, None)
+
 
-# Crear todas las tablas definidas en los modelos si no existen
-Base.metadata.create_all(bind=engine)
+def __getattr__(nombre: str):
+    # engine, engine_lectura, DB_PATH y DB_PROFILE se resuelven al pedirlos, no al importar.
+    if nombre == "engine":
+        return obtener_motores()[0]
+    if nombre == "engine_lectura":
+        return obtener_motores()[1]
+    if nombre == "DB_PATH":
+        return ruta_base_datos()
+    if nombre == "DB_PROFILE":
+        return perfil_motor()
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
@@ -0,0 +1,149 @@
+"""
+Escritor único con commits agrupados (group commit) para SQLite.
+
+SQLite admite un solo escritor a la vez y cada commit cuesta una escritura sincronizada del WAL.
+Las escrituras de los manejadores llegan aquí a través de `asincrono.ejecutar`: un único hilo toma
+las operaciones pendientes (como máximo ESCRITURA_MAX_LOTE), las ejecuta en una sola transacción,
+cada una dentro de su propio SAVEPOINT, y confirma el lote con un único commit. Mientras un lote
+se confirma, las operaciones que llegan se acumulan para el siguiente: con más carga los lotes
+crecen y el coste del commit y del bloqueo se reparte entre más operaciones.
+
+Si una operación falla (por ejemplo, un nombre duplicado) sólo se deshace su SAVEPOINT y sólo su
+llamador recibe la excepción; el resto del lote se confirma. Si falla el commit, todas las
+operaciones del lote reciben el error. Cada resultado se entrega después del commit, de modo que
+ningún llamador ve datos sin confirmar.
+
+Por eso las funciones de escritura no llaman a `commit()`: hacen `flush()` si necesitan los ids
+generados y registran con `database.al_confirmar` lo que debe ocurrir tras el commit.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy.orm import sessionmaker
+
+from nueva_app_reflex.instrumentacion import metricas
+
+from .database import CLAVE_AL_CONFIRMAR
+
+logger = logging.getLogger(__name__)
+
+# Operaciones como máximo por transacción.
+ESCRITURA_MAX_LOTE = int(os.environ.get("ESCRITURA_MAX_LOTE", "64"))
+
+# Futuro del llamador, instante en que se encoló, función y argumentos.
+_Operacion = Tuple[Future, float, Callable[..., Any], tuple, dict]
+
+
+class EscritorAgrupado:
+    """
+    Hilo escritor que ejecuta las operaciones encoladas en lotes, con un commit por lote.
+    El hilo se arranca con la primera operación, ya dentro del worker de gunicorn (después del fork).
+    """
+
+    def __init__(self, fabrica: sessionmaker, max_lote: int = ESCRITURA_MAX_LOTE):
+        self.fabrica = fabrica
+        self.max_lote = max(1, max_lote)
+        self._cola: "queue.SimpleQueue[Optional[_Operacion]]" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._hilo: Optional[threading.Thread] = None
+
+    def enviar(self, funcion: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """
+        Encola `funcion(db, *args, **kwargs)`.
+
+        Returns:
+            Future: Se resuelve con el valor de la función, o con su excepción, tras el commit del lote.
+        """
+        futuro: Future = Future()
+        with self._lock:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle, name="db-escritura", daemon=True)
+                self._hilo.start()
+            self._cola.put((futuro, time.perf_counter(), funcion, args, kwargs))
+        return futuro
+
+    def cerrar(self) -> None:
+        """
+        Confirma las operaciones pendientes y detiene el hilo.
+        """
+        with self._lock:
+            hilo, self._hilo = self._hilo, None
+            if hilo is None:
+                return
+            self._cola.put(None)
+        hilo.join()
+
+    def _bucle(self) -> None:
+        while True:
+            operacion = self._cola.get()
+            if operacion is None:
+                return
+            lote = [operacion]
+            terminar = False
+            # Sin esperas: el lote son las operaciones que se acumularon durante el commit anterior.
+            while len(lote) < self.max_lote:
+                try:
+                    siguiente = self._cola.get_nowait()
+                except queue.Empty:
+                    break
+                if siguiente is None:
+                    terminar = True
+                    break
+                lote.append(siguiente)
+            self._confirmar(lote)
+            if terminar:
+                return
+
+    def _confirmar(self, lote: List[_Operacion]) -> None:
+        """
+        Ejecuta el lote en una transacción, cada operación en su SAVEPOINT, y entrega los resultados.
+        """
+        resultados: List[Tuple[Future, bool, Any]] = []
+        error: Optional[Exception] = None
+        db = self.fabrica()
+        try:
+            # La transacción (BEGIN IMMEDIATE) se abre antes de la primera operación: si no se
+            # obtiene el bloqueo falla el lote entero, no sólo la primera operación.
+            db.connection()
+            for futuro, encolada, funcion, args, kwargs in lote:
+                if not futuro.set_running_or_notify_cancel():
+                    continue
+                metricas.observar("pool_espera_ms", (time.perf_counter() - encolada) * 1000, pool="escritura")
+                pendientes = db.info.setdefault(CLAVE_AL_CONFIRMAR, [])
+                antes = len(pendientes)
+                try:
+                    with db.begin_nested():
+                        valor = funcion(db, *args, **kwargs)
+                except Exception as e:
+                    # Lo registrado por la operación deshecha no debe ejecutarse tras el commit.
+                    del pendientes[antes:]
+                    resultados.append((futuro, False, e))
+                else:
+                    resultados.append((futuro, True, valor))
+            inicio = time.perf_counter()
+            db.commit()
+            metricas.observar("escritura_commit_ms", (time.perf_counter() - inicio) * 1000)
+        except Exception as e:
+            error = e
+            metricas.incrementar("escritura_lotes_fallidos")
+            logger.exception("error al confirmar el lote de escrituras", extra={"campos": {"operaciones": len(lote)}})
+        finally:
+            db.close()
+
+        metricas.incrementar("escritura_lotes")
+        metricas.incrementar("escritura_operaciones", len(resultados))
+        for futuro, correcto, valor in resultados:
+            if correcto and error is None:
+                futuro.set_result(valor)
+            else:
+                futuro.set_exception(valor if not correcto else error)
+        if error is not None:
+            for futuro, *_ in lote:
+                if not futuro.done():
+                    futuro.set_exception(error)
@@ -0,0 +1,213 @@
+"""
+Migraciones versionadas del esquema de la base de datos.
+
+La versión del esquema se guarda en `PRAGMA user_version` (0 en una base nueva). Cada migración
+tiene un número y una función que recibe la conexión sqlite3; las pendientes se aplican en
+orden dentro de una única transacción BEGIN IMMEDIATE, que también actualiza user_version. Si
+varios procesos arrancan a la vez, el segundo espera al bloqueo y al entrar ya no encuentra
+migraciones pendientes. Las sentencias de la migración 1 llevan IF NOT EXISTS para adoptar las
+bases creadas antes de existir las migraciones, cuando las tablas se creaban al importar.
+
+Un cambio del esquema se añade como una migración nueva al final de MIGRACIONES; las ya
+publicadas no se modifican, porque las bases existentes no las vuelven a ejecutar.
+
+Se aplican de forma explícita:
+- en producción, antes de arrancar el backend (docker-entrypoint.sh);
+- al arrancar el backend en desarrollo, salvo que DATABASE_AUTO_MIGRATE=0: entonces el backend
+  sólo comprueba que el esquema está al día y no arranca si faltan migraciones.
+
+Uso:
+    python -m nueva_app_reflex.db.migraciones            # aplica las pendientes
+    python -m nueva_app_reflex.db.migraciones --estado   # muestra la versión y las pendientes
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from .busqueda import crear_indices_busqueda
+from .database import obtener_motores, ruta_base_datos
+
+# Nombre fijo: con `python -m` el módulo se llama __main__.
+logger = logging.getLogger("nueva_app_reflex.db.migraciones")
+
+
+class ErrorMigracion(Exception):
+    """
+    El esquema de la base de datos no coincide con las migraciones de este código.
+    """
+
+
+def _esquema_inicial(conexion: sqlite3.Connection) -> None:
+    """
+    Tablas usuarios y tareas con sus índices, tal como las creaba create_all.
+    """
+    for sentencia in (
+        """CREATE TABLE IF NOT EXISTS usuarios (
+            id INTEGER NOT NULL,
+            nombre VARCHAR NOT NULL,
+            email VARCHAR NOT NULL,
+            password_hash VARCHAR NOT NULL,
+            es_admin BOOLEAN NOT NULL,
+            PRIMARY KEY (id),
+            UNIQUE (email)
+        )""",
+        "CREATE INDEX IF NOT EXISTS ix_usuarios_id ON usuarios (id)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_usuarios_nombre ON usuarios (nombre)",
+        """CREATE TABLE IF NOT EXISTS tareas (
+            id INTEGER NOT NULL,
+            descripcion VARCHAR NOT NULL,
+            completada BOOLEAN,
+            usuario_id INTEGER,
+            PRIMARY KEY (id),
+            FOREIGN KEY(usuario_id) REFERENCES usuarios (id)
+        )""",
+        "CREATE INDEX IF NOT EXISTS ix_tareas_id ON tareas (id)",
+        "CREATE INDEX IF NOT EXISTS ix_tareas_usuario_completada ON tareas (usuario_id, completada)",
+    ):
+        conexion.execute(sentencia)
+
+
+def _indice_tareas_por_usuario(conexion: sqlite3.Connection) -> None:
+    """
+    Índice (usuario_id, id): el listado de tareas de un usuario recorre sus tareas en orden de id
+    y se detiene en el LIMIT, en lugar de leerlas y ordenarlas todas en cada página.
+    """
+    conexion.execute("CREATE INDEX IF NOT EXISTS ix_tareas_usuario_id ON tareas (usuario_id, id)")
+
+
+# (versión, descripción, función) en orden de aplicación.
+MIGRACIONES: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "tablas usuarios y tareas", _esquema_inicial),
+    (2, "búsqueda de texto completo (FTS5)", crear_indices_busqueda),
+    (3, "índice de tareas por usuario e id", _indice_tareas_por_usuario),
+]
+VERSION_ACTUAL = MIGRACIONES[-1][0]
+
+
+def _version(conexion: sqlite3.Connection) -> int:
+    return conexion.execute("PRAGMA user_version").fetchone()[0]
+
+
+def version_esquema() -> int:
+    """
+    Versión del esquema de la base configurada (0 si la base está vacía o aún no existe).
+    """
+    if not Path(ruta_base_datos()).exists():
+        return 0
+    # Con el motor de lectura: leer la versión no toma el bloqueo de escritura (BEGIN IMMEDIATE).
+    _, lectura = obtener_motores()
+    with lectura.connect() as conexion:
+        return conexion.exec_driver_sql("PRAGMA user_version").scalar_one()
+
+
+def pendientes(version: int) -> List[Tuple[int, str, Callable[[sqlite3.Connection], None]]]:
+    """
+    Migraciones posteriores a la versión indicada.
+
+    Raises:
+        ErrorMigracion: Si la base tiene una versión más nueva que la de este código.
+    """
+    if version > VERSION_ACTUAL:
+        raise ErrorMigracion(
+            f"La base de datos está en la versión {version} y este código sólo conoce hasta la "
+            f"{VERSION_ACTUAL}: se ha arrancado una versión anterior de la aplicación."
+        )
+    return [migracion for migracion in MIGRACIONES if migracion[0] > version]
+
+
+def aplicar() -> List[int]:
+    """
+    Aplica las migraciones pendientes en una única transacción.
+    Crea el directorio de la base si no existe.
+
+    Returns:
+        List[int]: Versiones aplicadas (vacía si el esquema ya estaba al día).
+    """
+    Path(ruta_base_datos()).parent.mkdir(parents=True, exist_ok=True)
+    if not pendientes(version_esquema()):
+        return []
+
+    escritura, _ = obtener_motores()
+    inicio = time.perf_counter()
+    crudo = escritura.raw_connection()
+    conexion: sqlite3.Connection = crudo.driver_connection
+    # Sin la gestión implícita de transacciones de sqlite3: las sentencias DDL de las
+    # migraciones deben quedar dentro de la transacción explícita.
+    nivel = conexion.isolation_level
+    conexion.isolation_level = None
+    try:
+        conexion.execute("BEGIN IMMEDIATE")
+        try:
+            # Se vuelve a leer la versión con el bloqueo: otro proceso pudo migrar mientras tanto.
+            aplicadas = []
+            for version, descripcion, funcion in pendientes(_version(conexion)):
+                logger.info("aplicando migración", extra={"campos": {"version": version, "descripcion": descripcion}})
+                funcion(conexion)
+                conexion.execute(f"PRAGMA user_version = {version}")
+                aplicadas.append(version)
+            conexion.execute("COMMIT")
+        except BaseException:
+            conexion.execute("ROLLBACK")
+            raise
+    finally:
+        conexion.isolation_level = nivel
+        crudo.close()
+    if aplicadas:
+        logger.info(
+            "esquema actualizado",
+            extra={"campos": {"versiones": aplicadas, "duracion_ms": round((time.perf_counter() - inicio) * 1000, 3)}},
+        )
+    return aplicadas
+
+
+def preparar_esquema() -> None:
+    """
+    Tarea de arranque del backend: aplica las migraciones pendientes o, con
+    DATABASE_AUTO_MIGRATE=0, sólo comprueba que no falta ninguna.
+
+    Raises:
+        ErrorMigracion: Si faltan migraciones y no se aplican automáticamente.
+    """
+    if os.environ.get("DATABASE_AUTO_MIGRATE", "1") != "0":
+        aplicar()
+        return
+    faltan = pendientes(version_esquema())
+    if faltan:
+        raise ErrorMigracion(
+            f"Faltan las migraciones {[version for version, _, _ in faltan]}: ejecuta "
+            "`python -m nueva_app_reflex.db.migraciones` antes de arrancar el backend."
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Punto de entrada de la línea de comandos.
+    """
+    from dotenv import load_dotenv
+
+    from nueva_app_reflex.instrumentacion import configurar_logging
+
+    load_dotenv()
+    configurar_logging()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--estado", action="store_true", help="Sólo muestra la versión y las migraciones pendientes.")
+    args = parser.parse_args(argv)
+
+    if args.estado:
+        version = version_esquema()
+        print(f"{ruta_base_datos()}: versión {version} de {VERSION_ACTUAL}.", file=sys.stderr)
+        for numero, descripcion, _ in pendientes(version):
+            print(f"  pendiente {numero}: {descripcion}", file=sys.stderr)
+        return
+    aplicadas = aplicar()
+    print(f"{len(aplicadas)} migración(es) aplicadas; esquema en la versión {VERSION_ACTUAL}.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
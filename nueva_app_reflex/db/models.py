@@ -4,7 +4,7 @@ Define las tablas Usuario y Tarea, y sus relaciones.
 """
 
 from enum import unique
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Index
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -27,8 +27,14 @@ class Tarea(Base):
     """
     Modelo de tarea por hacer.
     Cada tarea pertenece a un usuario y tiene un estado de completada.
+    El índice compuesto (usuario_id, completada) sirve los listados por estado y los contadores
+    por usuario, y (usuario_id, id) los listados de un usuario ordenados por id sin ordenar en memoria.
     """
     __tablename__ = "tareas"
+    __table_args__ = (
+        Index("ix_tareas_usuario_completada", "usuario_id", "completada"),
+        Index("ix_tareas_usuario_id", "usuario_id", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     descripcion = Column(String, nullable=False)
     completada = Column(Boolean, default=False)
@@ -0,0 +1,142 @@
+"""
+Canal de novedades para empujar a los clientes conectados sólo las filas nuevas.
+Cada fila publicada lleva un id monótono (el id de la tabla) que hace de cursor: un cliente
+pide "lo posterior a mi cursor" y recibe únicamente esas filas, de modo que el tamaño de cada
+actualización no depende del tamaño de la tabla.
+
+Las filas recientes se guardan en memoria en un búfer acotado. Si el cursor de un cliente es
+anterior a lo que conserva el búfer, `desde` devuelve None y el cliente debe consultar la base
+de datos a partir de su cursor.
+
+Un cliente avanza su cursor hasta la última fila recibida, así que una fila publicada después de
+otra con id mayor no le llegaría nunca. Por eso cada canal tiene un único publicador, que lee la
+base en orden de id (`usuarios.sondear_usuarios_nuevos`); quien escribe no publica, sólo lo
+despierta con `AvisoNovedades` al confirmar.
+"""
+
+import asyncio
+import threading
+from collections import deque
+from typing import Deque, List, Optional, Set, Tuple
+
+_Espera = Tuple[asyncio.AbstractEventLoop, asyncio.Event]
+
+
+class CanalNovedades:
+    """
+    Búfer de filas recientes ordenadas por id con espera asíncrona de novedades.
+    Se puede publicar desde cualquier hilo (por ejemplo, el hilo escritor de la base de datos).
+    """
+
+    def __init__(self, capacidad: int = 1000):
+        self._lock = threading.Lock()
+        self._recientes: Deque[dict] = deque(maxlen=capacidad)
+        self._ultimo_id = 0
+        # Mayor id descartado del búfer: los cursores anteriores ya no se pueden servir desde memoria.
+        self._cursor_minimo = 0
+        self._esperando: Set[_Espera] = set()
+
+    def publicar(self, filas: List[dict]) -> None:
+        """
+        Añade filas nuevas al búfer y despierta a los clientes que esperan novedades.
+        Las filas deben llegar en orden de id y sin huecos, como las lee de la base el único
+        publicador; las que ya se publicaron se ignoran (tras un error se puede repetir una página).
+        """
+        with self._lock:
+            for fila in sorted(filas, key=lambda f: f["id"]):
+                if fila["id"] <= self._ultimo_id:
+                    continue
+                if len(self._recientes) == self._recientes.maxlen:
+                    self._cursor_minimo = self._recientes[0]["id"]
+                self._recientes.append(fila)
+                self._ultimo_id = fila["id"]
+            esperando = list(self._esperando)
+            self._esperando.clear()
+        for loop, evento in esperando:
+            loop.call_soon_threadsafe(evento.set)
+
+    def _desde(self, cursor: int) -> Optional[List[dict]]:
+        if cursor < self._cursor_minimo:
+            return None
+        return [dict(f) for f in self._recientes if f["id"] > cursor]
+
+    def desde(self, cursor: int) -> Optional[List[dict]]:
+        """
+        Devuelve las filas con id mayor que el cursor, o None si el búfer ya no las contiene todas.
+        """
+        with self._lock:
+            return self._desde(cursor)
+
+    async def esperar(self, cursor: int, timeout: float) -> Optional[List[dict]]:
+        """
+        Espera hasta que haya filas posteriores al cursor o venza el timeout.
+
+        Returns:
+            Optional[List[dict]]: Las filas nuevas (lista vacía si venció el timeout), o None si el
+            cursor es anterior al búfer y hay que consultar la base de datos.
+        """
+        clave = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            filas = self._desde(cursor)
+            if filas != []:
+                return filas
+            self._esperando.add(clave)
+        try:
+            await asyncio.wait_for(clave[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        finally:
+            with self._lock:
+                self._esperando.discard(clave)
+        return self.desde(cursor)
+
+
+class AvisoNovedades:
+    """
+    Despierta desde cualquier hilo (el escritor, tras un commit) a la tarea asíncrona que publica
+    las novedades de un canal. Un aviso que llega mientras la tarea trabaja no se pierde: la
+    siguiente espera termina enseguida.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pendiente = False
+        self._esperando: Optional[_Espera] = None
+
+    def avisar(self) -> None:
+        """
+        Indica que hay filas nuevas confirmadas.
+        """
+        with self._lock:
+            self._pendiente = True
+            esperando = self._esperando
+        if esperando is not None:
+            loop, evento = esperando
+            loop.call_soon_threadsafe(evento.set)
+
+    async def esperar(self, timeout: Optional[float]) -> None:
+        """
+        Espera un aviso, como mucho `timeout` segundos (None: sin límite).
+        """
+        clave = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            if self._pendiente:
+                self._pendiente = False
+                return
+            self._esperando = clave
+        try:
+            await asyncio.wait_for(clave[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._esperando = None
+                # Lo confirmado hasta aquí lo verá la consulta que sigue a la espera.
+                self._pendiente = False
+
+
+# Canal de usuarios recién registrados, en este proceso o en otros (los demás workers del
+# backend, una importación masiva); lo alimenta `usuarios.sondear_usuarios_nuevos`.
+canal_usuarios = CanalNovedades()
+# Aviso de los registros confirmados por este proceso, para publicarlos sin esperar al sondeo.
+aviso_usuarios = AvisoNovedades()
@@ -1,5 +1,5 @@
 """
-Schemas Pydantic para validación de datos de usuario.
+Schemas Pydantic para validación de datos de usuario y de tareas.
 """
 from pydantic import BaseModel, constr, EmailStr
 
@@ -11,3 +11,10 @@ class UsuarioCreate(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class TareaCreate(BaseModel):
+    descripcion: constr(strip_whitespace=True, min_length=1, max_length=500)
+
+    class Config:
+        from_attributes = True
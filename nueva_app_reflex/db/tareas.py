@@ -0,0 +1,210 @@
+"""
+Consultas de tareas para la aplicación Reflex.
+Las consultas por usuario se apoyan en los índices compuestos de Tarea: (usuario_id, id) para
+los listados paginados por id y (usuario_id, completada) para los filtrados por estado. Los
+contadores se calculan con una única consulta agregada en lugar de recorrer Usuario.tareas.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, func, select, union_all, update
+from sqlalchemy.orm import Session
+
+from .models import Tarea, Usuario
+
+# Número de tareas por página en la vista de un usuario.
+TAMANO_PAGINA = 50
+# Número de usuarios por página en la vista de administración.
+TAMANO_PAGINA_ADMIN = 20
+# Tareas más recientes de cada usuario en la vista de administración; el resto, en su página.
+TAREAS_POR_USUARIO_ADMIN = 10
+
+
+def _fila_tarea(tarea: Tarea) -> dict:
+    """
+    Convierte una Tarea en el diccionario que se guarda en el State.
+    """
+    return {
+        "id": tarea.id,
+        "descripcion": tarea.descripcion,
+        "completada": bool(tarea.completada),
+    }
+
+
+def listar_tareas(
+    db: Session,
+    usuario_id: int,
+    completada: Optional[bool] = None,
+    despues_de_id: Optional[int] = None,
+    limite: int = TAMANO_PAGINA,
+) -> Tuple[List[dict], bool]:
+    """
+    Devuelve una página de tareas de un usuario ordenada por id (keyset pagination).
+
+    Args:
+        db: Sesión de base de datos.
+        usuario_id: Usuario propietario de las tareas.
+        completada: Si se indica, filtra por estado.
+        despues_de_id: Cursor: devuelve las tareas con id mayor.
+        limite: Número máximo de tareas de la página.
+
+    Returns:
+        Tuple[List[dict], bool]: Las filas de la página y si hay más tareas.
+    """
+    consulta = select(Tarea).where(Tarea.usuario_id == usuario_id)
+    if completada is not None:
+        consulta = consulta.where(Tarea.completada == completada)
+    if despues_de_id is not None:
+        consulta = consulta.where(Tarea.id > despues_de_id)
+    tareas = db.scalars(consulta.order_by(Tarea.id).limit(limite + 1)).all()
+    return [_fila_tarea(t) for t in tareas[:limite]], len(tareas) > limite
+
+
+def crear_tarea(db: Session, usuario_id: int, descripcion: str) -> Optional[dict]:
+    """
+    Crea una tarea pendiente para el usuario; la transacción la confirma el escritor agrupado.
+    Devuelve None si el usuario no existe: se comprueba aquí porque con el perfil "basico" la
+    conexión no activa PRAGMA foreign_keys y la clave foránea no lo impediría.
+    """
+    if db.get(Usuario, usuario_id) is None:
+        return None
+    tarea = Tarea(descripcion=descripcion, completada=False, usuario_id=usuario_id)
+    db.add(tarea)
+    # El flush asigna el id de la tarea.
+    db.flush()
+    return _fila_tarea(tarea)
+
+
+def alternar_tarea(db: Session, usuario_id: int, tarea_id: int) -> Optional[bool]:
+    """
+    Invierte el estado de una tarea del usuario con un único UPDATE ... RETURNING.
+
+    Returns:
+        Optional[bool]: El estado que queda en la base (que puede no ser el contrario del que
+        mostraba el cliente si otra pestaña lo cambió), o None si la tarea no existe o
+        pertenece a otro usuario.
+    """
+    completada = db.scalar(
+        update(Tarea)
+        .where(Tarea.id == tarea_id, Tarea.usuario_id == usuario_id)
+        .values(completada=~Tarea.completada)
+        .returning(Tarea.completada)
+    )
+    return None if completada is None else bool(completada)
+
+
+def completar_tareas(db: Session, usuario_id: int, tarea_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Marca como completadas las tareas pendientes del usuario (todas o sólo las indicadas).
+
+    Returns:
+        int: Número de tareas actualizadas.
+    """
+    consulta = update(Tarea).where(Tarea.usuario_id == usuario_id, Tarea.completada == False)  # noqa: E712
+    if tarea_ids is not None:
+        consulta = consulta.where(Tarea.id.in_(list(tarea_ids)))
+    resultado = db.execute(consulta.values(completada=True))
+    return resultado.rowcount
+
+
+def contar_tareas_por_usuario(db: Session, usuario_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+    """
+    Calcula los contadores de tareas pendientes y completadas de varios usuarios en una consulta.
+
+    Returns:
+        Dict[int, Dict[str, int]]: {usuario_id: {"pendientes": n, "completadas": m}}. Los usuarios
+        sin tareas aparecen con ambos contadores a cero.
+    """
+    usuario_ids = list(usuario_ids)
+    contadores = {uid: {"pendientes": 0, "completadas": 0} for uid in usuario_ids}
+    if not usuario_ids:
+        return contadores
+    filas = db.execute(
+        select(
+            Tarea.usuario_id,
+            func.count(Tarea.id),
+            func.sum(case((Tarea.completada == True, 1), else_=0)),  # noqa: E712
+        )
+        .where(Tarea.usuario_id.in_(usuario_ids))
+        .group_by(Tarea.usuario_id)
+    ).all()
+    for usuario_id, total, completadas in filas:
+        completadas = completadas or 0
+        contadores[usuario_id] = {"pendientes": total - completadas, "completadas": completadas}
+    return contadores
+
+
+def contar_tareas(db: Session, usuario_id: int) -> Dict[str, int]:
+    """
+    Devuelve los contadores de tareas pendientes y completadas de un usuario.
+    """
+    return contar_tareas_por_usuario(db, [usuario_id])[usuario_id]
+
+
+def ultimas_tareas_por_usuario(
+    db: Session, usuario_ids: Iterable[int], limite: int = TAREAS_POR_USUARIO_ADMIN
+) -> Dict[int, List[dict]]:
+    """
+    Devuelve las `limite` tareas más recientes de cada usuario, en orden de id, en una consulta.
+    Es una unión de una subconsulta con LIMIT por usuario: cada una recorre el índice
+    (usuario_id, id) hacia atrás y se detiene en el límite, de modo que el coste no depende de
+    cuántas tareas tenga el usuario (una función de ventana las numeraría todas).
+
+    Returns:
+        Dict[int, List[dict]]: {usuario_id: [tareas]}. Los usuarios sin tareas tienen una lista vacía.
+    """
+    usuario_ids = list(usuario_ids)
+    tareas: Dict[int, List[dict]] = {uid: [] for uid in usuario_ids}
+    if not usuario_ids:
+        return tareas
+    # SQLite no admite LIMIT en los miembros de un UNION: cada uno va en su propia subconsulta.
+    subconsultas = (
+        select(Tarea.id, Tarea.descripcion, Tarea.completada, Tarea.usuario_id)
+        .where(Tarea.usuario_id == uid)
+        .order_by(Tarea.id.desc())
+        .limit(limite)
+        .subquery()
+        for uid in usuario_ids
+    )
+    filas = db.execute(union_all(*(select(s) for s in subconsultas))).all()
+    for fila in sorted(filas, key=lambda f: f.id):
+        tareas[fila.usuario_id].append(_fila_tarea(fila))
+    return tareas
+
+
+def listar_usuarios_con_tareas(
+    db: Session,
+    despues_de_id: Optional[int] = None,
+    limite: int = TAMANO_PAGINA_ADMIN,
+) -> Tuple[List[dict], bool]:
+    """
+    Devuelve una página de usuarios con sus tareas más recientes y sus contadores para la vista
+    de administración. Las tareas (como máximo TAREAS_POR_USUARIO_ADMIN por usuario) se cargan
+    con una consulta para toda la página, sin N+1, y los contadores con una única consulta
+    agregada; `tareas_ocultas` indica cuántas quedan para la página del usuario.
+
+    Returns:
+        Tuple[List[dict], bool]: Las filas de la página y si hay más usuarios.
+    """
+    consulta = select(Usuario.id, Usuario.nombre).order_by(Usuario.id)
+    if despues_de_id is not None:
+        consulta = consulta.where(Usuario.id > despues_de_id)
+    usuarios = db.execute(consulta.limit(limite + 1)).all()
+    hay_mas = len(usuarios) > limite
+    usuarios = usuarios[:limite]
+    ids = [u.id for u in usuarios]
+    tareas = ultimas_tareas_por_usuario(db, ids)
+    contadores = contar_tareas_por_usuario(db, ids)
+    filas = []
+    for u in usuarios:
+        total = contadores[u.id]["pendientes"] + contadores[u.id]["completadas"]
+        filas.append(
+            {
+                "id": u.id,
+                "nombre": u.nombre,
+                "tareas": tareas[u.id],
+                "tareas_ocultas": total - len(tareas[u.id]),
+                **contadores[u.id],
+            }
+        )
+    return filas, hay_mas
@@ -0,0 +1,235 @@
+"""
+Consultas de usuarios para la aplicación Reflex.
+Implementa la paginación por conjunto de claves (keyset) sobre Usuario.id y una caché de
+lectura compartida por todas las sesiones para las páginas y el conteo total, que se invalida
+al insertar usuarios. La caché se configura con USUARIOS_CACHE_TTL y USUARIOS_CACHE_MAX.
+
+Cada proceso del backend tiene su propia caché y su propio canal de novedades. Los usuarios
+nuevos se publican leyéndolos de la base en orden de id: al confirmarse un registro de este
+proceso y, para los que insertan otros procesos, cada NOVEDADES_INTERVALO segundos.
+"""
+
+import logging
+import os
+from typing import Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from nueva_app_reflex.instrumentacion import metricas
+
+from .asincrono import leer
+from .cache import CacheLectura
+from .database import al_confirmar
+from .models import Usuario
+from .novedades import aviso_usuarios, canal_usuarios
+
+logger = logging.getLogger(__name__)
+
+# Número de usuarios por página que se envía al navegador.
+TAMANO_PAGINA = 50
+# Segundos entre consultas de usuarios insertados por otros procesos (0: sólo se publican los de
+# este proceso, al confirmarse).
+NOVEDADES_INTERVALO = float(os.environ.get("NOVEDADES_INTERVALO", "1"))
+
+# Caché de páginas y conteo de usuarios, común a todos los clientes conectados al proceso.
+cache_usuarios = CacheLectura(
+    "usuarios",
+    max_entradas=int(os.environ.get("USUARIOS_CACHE_MAX", "256")),
+    ttl=float(os.environ.get("USUARIOS_CACHE_TTL", "30")),
+)
+metricas.registrar_fuente("cache_usuarios", cache_usuarios.metricas)
+
+
+def _fila_usuario(usuario: Usuario) -> dict:
+    """
+    Convierte un Usuario en el diccionario que se guarda en el State.
+    """
+    return {
+        "id": usuario.id,
+        "nombre": usuario.nombre,
+        "email": usuario.email,
+        "es_admin": usuario.es_admin,
+    }
+
+
+def listar_usuarios_pagina(
+    db: Session,
+    despues_de_id: Optional[int] = None,
+    antes_de_id: Optional[int] = None,
+    limite: int = TAMANO_PAGINA,
+) -> Tuple[List[dict], bool]:
+    """
+    Devuelve una página de usuarios ordenada por id usando keyset pagination.
+
+    Args:
+        db: Sesión de base de datos.
+        despues_de_id: Si se indica, devuelve los usuarios con id mayor (página siguiente).
+        antes_de_id: Si se indica, devuelve los usuarios con id menor (página anterior).
+        limite: Número máximo de usuarios de la página.
+
+    Returns:
+        Tuple[List[dict], bool]: Las filas de la página en orden ascendente de id y
+        si existen más usuarios en la dirección consultada.
+    """
+    consulta = select(Usuario)
+    if antes_de_id is not None:
+        consulta = consulta.where(Usuario.id < antes_de_id).order_by(Usuario.id.desc())
+    else:
+        if despues_de_id is not None:
+            consulta = consulta.where(Usuario.id > despues_de_id)
+        consulta = consulta.order_by(Usuario.id)
+
+    # Se pide una fila de más para saber si hay otra página sin un COUNT adicional.
+    usuarios = db.scalars(consulta.limit(limite + 1)).all()
+    hay_mas = len(usuarios) > limite
+    usuarios = usuarios[:limite]
+    if antes_de_id is not None:
+        usuarios = list(reversed(usuarios))
+    return [_fila_usuario(u) for u in usuarios], hay_mas
+
+
+def crear_usuario(db: Session, nombre: str, email: str, password_hash: str, es_admin: bool = False) -> dict:
+    """
+    Inserta un usuario. No confirma la transacción: lo hace quien abrió la sesión (el escritor
+    agrupado), y al confirmarla se invalida la caché y se avisa al publicador de novedades.
+
+    Raises:
+        IntegrityError: Si el nombre o el email ya existen.
+    """
+    nuevo_usuario = Usuario(
+        nombre=nombre,
+        email=email,
+        password_hash=password_hash,
+        es_admin=es_admin,
+    )
+    db.add(nuevo_usuario)
+    # El flush asigna el id y detecta aquí los duplicados.
+    db.flush()
+    fila = _fila_usuario(nuevo_usuario)
+    al_confirmar(db, invalidar_cache_usuarios)
+    al_confirmar(db, aviso_usuarios.avisar)
+    return fila
+
+
+def buscar_existentes(db: Session, nombres: Iterable[str], emails: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+    """
+    Devuelve qué nombres y qué emails de los indicados ya están registrados.
+    """
+    nombres, emails = list(nombres), list(emails)
+    if not nombres and not emails:
+        return set(), set()
+    filas = db.execute(
+        select(Usuario.nombre, Usuario.email).where(
+            or_(Usuario.nombre.in_(nombres), Usuario.email.in_(emails))
+        )
+    ).all()
+    return {f.nombre for f in filas}, {f.email for f in filas}
+
+
+def insertar_usuarios(db: Session, filas: List[dict]) -> None:
+    """
+    Inserta un lote de usuarios con un único executemany. Como las demás funciones de escritura,
+    no confirma la transacción: lo hace quien abrió la sesión, y al confirmarla se invalida la caché.
+    Cada fila debe tener nombre, email, password_hash y es_admin.
+
+    Raises:
+        IntegrityError: Si algún nombre o email ya existe; quien abrió la sesión debe deshacerla.
+    """
+    if not filas:
+        return
+    db.execute(insert(Usuario), filas)
+    al_confirmar(db, invalidar_cache_usuarios)
+    al_confirmar(db, aviso_usuarios.avisar)
+
+
+def obtener_credenciales(db: Session, nombre: str) -> Optional[dict]:
+    """
+    Devuelve el id, los datos públicos y el hash de contraseña de un usuario, o None si no existe.
+    """
+    usuario = db.scalar(select(Usuario).where(Usuario.nombre == nombre))
+    if usuario is None:
+        return None
+    fila = _fila_usuario(usuario)
+    fila["password_hash"] = usuario.password_hash
+    return fila
+
+
+def actualizar_password_hash(db: Session, usuario_id: int, password_hash: str) -> None:
+    """
+    Sustituye el hash de contraseña de un usuario; la transacción la confirma el escritor agrupado.
+    """
+    db.execute(
+        update(Usuario).where(Usuario.id == usuario_id).values(password_hash=password_hash)
+    )
+
+
+def consultar_usuarios_pagina(
+    db: Session,
+    despues_de_id: Optional[int] = None,
+    antes_de_id: Optional[int] = None,
+    limite: int = TAMANO_PAGINA,
+) -> Tuple[List[dict], bool]:
+    """
+    Versión cacheada de `listar_usuarios_pagina` para las páginas que se muestran en el navegador.
+    Devuelve copias de las filas para que ningún State modifique las de la caché.
+    """
+    filas, hay_mas = cache_usuarios.obtener(
+        ("pagina", despues_de_id, antes_de_id, limite),
+        lambda: listar_usuarios_pagina(db, despues_de_id, antes_de_id, limite),
+    )
+    return [dict(f) for f in filas], hay_mas
+
+
+def ultimo_id_usuario(db: Session) -> int:
+    """
+    Devuelve el mayor id de usuario (0 si no hay usuarios); sirve de cursor inicial de novedades.
+    """
+    return db.scalar(select(func.max(Usuario.id))) or 0
+
+
+def contar_usuarios(db: Session) -> int:
+    """
+    Devuelve el número total de usuarios a través de la caché compartida.
+    """
+    return cache_usuarios.obtener(
+        ("conteo",), lambda: db.scalar(select(func.count(Usuario.id))) or 0
+    )
+
+
+def invalidar_cache_usuarios() -> None:
+    """
+    Descarta las páginas y el conteo cacheados; se llama tras insertar o borrar usuarios.
+    """
+    cache_usuarios.invalidar()
+
+
+async def sondear_usuarios_nuevos() -> None:
+    """
+    Tarea de fondo de cada proceso del backend y único publicador de `canal_usuarios`: lee de la
+    base, en orden de id, los usuarios posteriores a su cursor, los publica e invalida la caché.
+    Se despierta con cada registro confirmado por este proceso y, para los de otros procesos (los
+    demás workers o una importación masiva), cada NOVEDADES_INTERVALO segundos.
+
+    Publicar en el orden de la base no deja huecos: SQLite asigna los ids dentro de la única
+    transacción de escritura, de modo que se hacen visibles en orden. Si cada proceso publicase
+    sus propios registros, uno de otro proceso con id menor llegaría tarde y los clientes, cuyo
+    cursor ya lo habría superado, no lo recibirían.
+    """
+    intervalo = NOVEDADES_INTERVALO if NOVEDADES_INTERVALO > 0 else None
+    cursor: Optional[int] = None
+    while True:
+        try:
+            if cursor is None:
+                cursor = await leer(ultimo_id_usuario)
+            hay_mas = True
+            while hay_mas:
+                filas, hay_mas = await leer(listar_usuarios_pagina, despues_de_id=cursor)
+                if not filas:
+                    break
+                invalidar_cache_usuarios()
+                canal_usuarios.publicar(filas)
+                cursor = filas[-1]["id"]
+        except Exception:
+            logger.exception("error al consultar usuarios nuevos")
+        await aviso_usuarios.esperar(intervalo)
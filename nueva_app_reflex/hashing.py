@@ -0,0 +1,256 @@
+"""
+Servicio de hashing de contraseñas.
+Genera hashes con sal y versionados usando una KDF de la biblioteca estándar (scrypt o PBKDF2)
+y los calcula en un pool de procesos para no ocupar el bucle de eventos de Reflex.
+
+Formato de los hashes: `<algoritmo>$<version>$<parametros>$<sal base64>$<hash base64>`, por ejemplo
+`scrypt$v1$n=16384,r=8,p=1$...$...`. Los hashes SHA-256 sin sal de la versión anterior
+(64 caracteres hexadecimales) se siguen aceptando y se marcan para rehash.
+
+Configuración por variables de entorno:
+- PASSWORD_HASH_ALGORITHM: "scrypt" (por defecto) o "pbkdf2_sha256".
+- SCRYPT_N, SCRYPT_R, SCRYPT_P: coste de scrypt (16384, 8, 1).
+- PBKDF2_ITERATIONS: iteraciones de PBKDF2 (600000).
+- HASH_WORKERS: procesos del pool (por defecto, número de CPUs; docker-entrypoint.sh lo reparte
+  entre los workers de gunicorn).
+
+Este módulo no importa Reflex ni la base de datos, para que los procesos del pool arranquen rápido.
+"""
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import hmac
+import logging
+import multiprocessing
+import os
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+VERSION = "v1"
+LONGITUD_SAL = 16
+LONGITUD_HASH = 32
+
+ALGORITMO = os.environ.get("PASSWORD_HASH_ALGORITHM", "scrypt")
+SCRYPT_N = int(os.environ.get("SCRYPT_N", "16384"))
+SCRYPT_R = int(os.environ.get("SCRYPT_R", "8"))
+SCRYPT_P = int(os.environ.get("SCRYPT_P", "1"))
+PBKDF2_ITERACIONES = int(os.environ.get("PBKDF2_ITERATIONS", "600000"))
+HASH_WORKERS = int(os.environ.get("HASH_WORKERS", str(os.cpu_count() or 1)))
+
+
+class HasherScrypt:
+    """
+    KDF scrypt de hashlib. Parámetros: n (coste CPU/memoria), r (tamaño de bloque) y p (paralelismo).
+    """
+    nombre = "scrypt"
+
+    def parametros(self) -> Dict[str, int]:
+        return {"n": SCRYPT_N, "r": SCRYPT_R, "p": SCRYPT_P}
+
+    def derivar(self, password: str, sal: bytes, parametros: Dict[str, int]) -> bytes:
+        n, r, p = parametros["n"], parametros["r"], parametros["p"]
+        return hashlib.scrypt(
+            password.encode(),
+            salt=sal,
+            n=n,
+            r=r,
+            p=p,
+            maxmem=2 * 128 * n * r * p + 1024 * 1024,
+            dklen=LONGITUD_HASH,
+        )
+
+
+class HasherPbkdf2:
+    """
+    KDF PBKDF2-HMAC-SHA256 de hashlib. Parámetro: i (iteraciones).
+    """
+    nombre = "pbkdf2_sha256"
+
+    def parametros(self) -> Dict[str, int]:
+        return {"i": PBKDF2_ITERACIONES}
+
+    def derivar(self, password: str, sal: bytes, parametros: Dict[str, int]) -> bytes:
+        return hashlib.pbkdf2_hmac("sha256", password.encode(), sal, parametros["i"], LONGITUD_HASH)
+
+
+# Algoritmos disponibles. Para añadir uno nuevo basta con registrar aquí su hasher.
+HASHERS = {h.nombre: h for h in (HasherScrypt(), HasherPbkdf2())}
+
+if ALGORITMO not in HASHERS:
+    raise ValueError(
+        f"PASSWORD_HASH_ALGORITHM debe ser uno de {sorted(HASHERS)}; se recibió '{ALGORITMO}'."
+    )
+
+
+def _b64(datos: bytes) -> str:
+    return base64.b64encode(datos).decode().rstrip("=")
+
+
+def _desde_b64(texto: str) -> bytes:
+    return base64.b64decode(texto + "=" * (-len(texto) % 4))
+
+
+def _es_sha256_heredado(password_hash: str) -> bool:
+    return len(password_hash) == 64 and all(c in "0123456789abcdef" for c in password_hash)
+
+
+def _analizar(password_hash: str) -> Optional[tuple]:
+    """
+    Separa un hash en (hasher, parametros, sal, hash). Devuelve None si el formato no es válido,
+    también si la fila está truncada o dañada (parámetros no numéricos, base64 incorrecto).
+    """
+    partes = password_hash.split("$")
+    if len(partes) != 5 or partes[0] not in HASHERS or partes[1] != VERSION:
+        return None
+    hasher = HASHERS[partes[0]]
+    try:
+        parametros = {}
+        for par in partes[2].split(","):
+            clave, _, valor = par.partition("=")
+            parametros[clave] = int(valor)
+        sal, derivado = _desde_b64(partes[3]), _desde_b64(partes[4])
+    except (ValueError, binascii.Error):
+        return None
+    if parametros.keys() != hasher.parametros().keys() or not sal or len(derivado) != LONGITUD_HASH:
+        return None
+    return hasher, parametros, sal, derivado
+
+
+def generar_hash(password: str, algoritmo: Optional[str] = None) -> str:
+    """
+    Calcula el hash con sal de una contraseña con los parámetros configurados.
+    Operación costosa en CPU: desde el bucle de eventos, usar `generar_hash_async`.
+    """
+    hasher = HASHERS[algoritmo or ALGORITMO]
+    parametros = hasher.parametros()
+    sal = secrets.token_bytes(LONGITUD_SAL)
+    derivado = hasher.derivar(password, sal, parametros)
+    texto_parametros = ",".join(f"{k}={v}" for k, v in parametros.items())
+    return f"{hasher.nombre}${VERSION}${texto_parametros}${_b64(sal)}${_b64(derivado)}"
+
+
+def verificar(password: str, password_hash: str) -> bool:
+    """
+    Comprueba una contraseña contra un hash en cualquiera de los formatos soportados.
+    """
+    if _es_sha256_heredado(password_hash):
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), password_hash)
+    analizado = _analizar(password_hash)
+    if analizado is not None:
+        hasher, parametros, sal, esperado = analizado
+        try:
+            return hmac.compare_digest(hasher.derivar(password, sal, parametros), esperado)
+        except (ValueError, OverflowError, MemoryError):
+            # Parámetros que la KDF rechaza (por ejemplo, un n de scrypt que no es potencia de 2).
+            pass
+    # Un hash ilegible cuesta lo mismo que uno válido, para no distinguirlo por el tiempo de respuesta.
+    hasher = HASHERS[ALGORITMO]
+    hasher.derivar(password, bytes(LONGITUD_SAL), hasher.parametros())
+    return False
+
+
+def necesita_rehash(password_hash: str) -> bool:
+    """
+    Indica si el hash usa un algoritmo, versión o parámetros distintos de los configurados.
+    """
+    analizado = _analizar(password_hash)
+    if analizado is None:
+        return True
+    hasher, parametros, _, _ = analizado
+    return hasher.nombre != ALGORITMO or parametros != hasher.parametros()
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+# Errores de un pool con un proceso muerto. Mientras el pool todavía no se ha marcado como roto,
+# enviarle una tarea intenta sustituir el proceso sobre una cola ya cerrada y falla con OSError.
+_ERRORES_POOL_ROTO = (BrokenProcessPool, OSError)
+
+
+def _obtener_pool() -> ProcessPoolExecutor:
+    """
+    Crea el pool de procesos la primera vez que se necesita.
+    Se usa "spawn" para no heredar los hilos ni las conexiones del proceso de Reflex.
+    """
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=HASH_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def _descartar_pool(roto: ProcessPoolExecutor) -> None:
+    """
+    Descarta un pool roto (un proceso murió, por ejemplo por el OOM killer): ProcessPoolExecutor
+    no se recupera y rechazaría todas las tareas siguientes. El próximo uso crea uno nuevo.
+    """
+    global _pool
+    logger.warning("pool de hashing roto: se crea uno nuevo")
+    if _pool is roto:
+        _pool = None
+    procesos = list((roto._processes or {}).values())
+    roto.shutdown(wait=False, cancel_futures=True)
+    # El pool sólo termina los procesos que tenía al detectar la rotura: uno que lo sustituyó justo
+    # antes se queda bloqueado en la cola y el pool esperaría por él para siempre (también al salir).
+    for proceso in procesos:
+        proceso.kill()
+
+
+async def _en_pool(funcion: Callable[..., T], *args: Any) -> T:
+    """
+    Ejecuta la función en el pool de procesos; si el pool está roto, reintenta una vez en uno nuevo.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _obtener_pool()
+    try:
+        return await loop.run_in_executor(pool, funcion, *args)
+    except _ERRORES_POOL_ROTO:
+        _descartar_pool(pool)
+        return await loop.run_in_executor(_obtener_pool(), funcion, *args)
+
+
+async def generar_hash_async(password: str) -> str:
+    """
+    Versión de `generar_hash` que se ejecuta en el pool de procesos.
+    """
+    return await _en_pool(generar_hash, password)
+
+
+async def verificar_async(password: str, password_hash: str) -> bool:
+    """
+    Versión de `verificar` que se ejecuta en el pool de procesos.
+    """
+    return await _en_pool(verificar, password, password_hash)
+
+
+def generar_hashes(passwords: Iterable[str]) -> List[str]:
+    """
+    Calcula en paralelo, en el pool de procesos, los hashes de un lote de contraseñas.
+    Pensado para importaciones masivas fuera del bucle de eventos.
+    """
+    passwords = list(passwords)
+    trozo = max(1, len(passwords) // (HASH_WORKERS * 4))
+    pool = _obtener_pool()
+    try:
+        return list(pool.map(generar_hash, passwords, chunksize=trozo))
+    except _ERRORES_POOL_ROTO:
+        _descartar_pool(pool)
+        return list(_obtener_pool().map(generar_hash, passwords, chunksize=trozo))
+
+
+def cerrar() -> None:
+    """
+    Libera los procesos del pool de hashing.
+    """
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
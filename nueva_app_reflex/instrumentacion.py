@@ -0,0 +1,262 @@
+"""
+Instrumentación de rendimiento: logging estructurado, métricas en memoria y tiempos de SQL.
+
+- `configurar_logging()` configura el logger `nueva_app_reflex` con el nivel de LOG_LEVEL (INFO)
+  y el formato de LOG_FORMAT: "texto" (por defecto, legible en desarrollo) o "json" (una línea
+  JSON por mensaje, para producción). Los campos estructurados se pasan con
+  `extra={"campos": {...}}` y se escriben como claves propias, no dentro del mensaje.
+- `metricas` acumula histogramas de latencia con cubetas fijas y contadores, con etiquetas.
+  Son métricas del proceso: cada worker del backend tiene las suyas.
+- `instrumentar_motor(motor, nombre)` mide cada sentencia SQL con los eventos
+  before_cursor_execute/after_cursor_execute y registra como aviso las que superan
+  SQL_SLOW_QUERY_MS (100 ms por defecto).
+
+Este módulo no importa Reflex ni la base de datos, para poder usarlo desde cualquier capa.
+"""
+
+import bisect
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "texto")
+SQL_SLOW_QUERY_MS = float(os.environ.get("SQL_SLOW_QUERY_MS", "100"))
+# Longitud máxima de una sentencia SQL en el log de consultas lentas.
+LONGITUD_MAX_SENTENCIA = 500
+
+# Límites superiores de las cubetas de los histogramas, en milisegundos.
+LIMITES_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+logger = logging.getLogger("nueva_app_reflex")
+_configurado = False
+_logger_sql = logging.getLogger("nueva_app_reflex.sql")
+
+Etiquetas = Tuple[Tuple[str, str], ...]
+
+
+class FormateadorJSON(logging.Formatter):
+    """
+    Escribe cada registro como una línea JSON con la fecha, el nivel, el logger, el mensaje y
+    los campos estructurados.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        datos = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensaje": record.getMessage(),
+            **getattr(record, "campos", {}),
+        }
+        if record.exc_info:
+            datos["excepcion"] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class FormateadorTexto(logging.Formatter):
+    """
+    Formato legible con los campos estructurados al final como clave=valor.
+    """
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        texto = super().format(record)
+        campos = getattr(record, "campos", None)
+        if campos:
+            texto += " " + " ".join(f"{clave}={valor}" for clave, valor in campos.items())
+        return texto
+
+
+def configurar_logging() -> None:
+    """
+    Configura el logger de la aplicación una sola vez; las llamadas posteriores no hacen nada.
+    """
+    global _configurado
+    if _configurado:
+        return
+    if LOG_FORMAT not in ("texto", "json"):
+        raise ValueError(f"LOG_FORMAT debe ser 'texto' o 'json'; se recibió '{LOG_FORMAT}'.")
+    manejador = logging.StreamHandler(sys.stderr)
+    manejador.setFormatter(FormateadorJSON() if LOG_FORMAT == "json" else FormateadorTexto())
+    logger.addHandler(manejador)
+    logger.setLevel(LOG_LEVEL)
+    # Los mensajes no se duplican en el logger raíz que configuran Reflex o uvicorn.
+    logger.propagate = False
+    _configurado = True
+
+
+class Histograma:
+    """
+    Histograma de latencias con cubetas fijas (LIMITES_MS), suma, máximo y percentiles
+    aproximados por el límite superior de la cubeta.
+    """
+
+    def __init__(self):
+        self.cubetas = [0] * (len(LIMITES_MS) + 1)
+        self.cuenta = 0
+        self.suma_ms = 0.0
+        self.maximo_ms = 0.0
+
+    def observar(self, ms: float) -> None:
+        self.cubetas[bisect.bisect_left(LIMITES_MS, ms)] += 1
+        self.cuenta += 1
+        self.suma_ms += ms
+        self.maximo_ms = max(self.maximo_ms, ms)
+
+    def percentil(self, q: float) -> float:
+        objetivo = q * self.cuenta
+        acumulado = 0
+        for limite, cantidad in zip(LIMITES_MS, self.cubetas):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                return round(min(limite, self.maximo_ms), 3)
+        return round(self.maximo_ms, 3)
+
+    def resumen(self) -> dict:
+        return {
+            "cuenta": self.cuenta,
+            "suma_ms": round(self.suma_ms, 3),
+            "media_ms": round(self.suma_ms / self.cuenta, 3) if self.cuenta else 0.0,
+            "max_ms": round(self.maximo_ms, 3),
+            "p50_ms": self.percentil(0.50),
+            "p95_ms": self.percentil(0.95),
+            "p99_ms": self.percentil(0.99),
+            "cubetas": dict(zip([str(limite) for limite in LIMITES_MS] + ["+Inf"], self.cubetas)),
+        }
+
+
+class RegistroMetricas:
+    """
+    Histogramas y contadores del proceso, identificados por nombre y etiquetas.
+    Es seguro usarlo desde varios hilos (el bucle de eventos y los pools de la base de datos).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histogramas: Dict[Tuple[str, Etiquetas], Histograma] = {}
+        self._contadores: Dict[Tuple[str, Etiquetas], float] = {}
+        self._fuentes: Dict[str, Callable[[], dict]] = {}
+
+    def observar(self, nombre: str, ms: float, **etiquetas: str) -> None:
+        """
+        Añade una latencia en milisegundos al histograma `nombre` con esas etiquetas.
+        """
+        clave = (nombre, tuple(sorted(etiquetas.items())))
+        with self._lock:
+            histograma = self._histogramas.get(clave)
+            if histograma is None:
+                histograma = self._histogramas[clave] = Histograma()
+            histograma.observar(ms)
+
+    def incrementar(self, nombre: str, cantidad: float = 1, **etiquetas: str) -> None:
+        clave = (nombre, tuple(sorted(etiquetas.items())))
+        with self._lock:
+            self._contadores[clave] = self._contadores.get(clave, 0) + cantidad
+
+    def registrar_fuente(self, nombre: str, funcion: Callable[[], dict]) -> None:
+        """
+        Añade métricas calculadas por otro componente (por ejemplo, las de una caché) a la instantánea.
+        """
+        with self._lock:
+            self._fuentes[nombre] = funcion
+
+    def instantanea(self) -> dict:
+        """
+        Devuelve todas las métricas como un diccionario serializable a JSON.
+        """
+        with self._lock:
+            histogramas = [
+                {"nombre": nombre, "etiquetas": dict(etiquetas), **h.resumen()}
+                for (nombre, etiquetas), h in sorted(self._histogramas.items())
+            ]
+            contadores = [
+                {"nombre": nombre, "etiquetas": dict(etiquetas), "valor": valor}
+                for (nombre, etiquetas), valor in sorted(self._contadores.items())
+            ]
+            fuentes = dict(self._fuentes)
+        return {
+            "histogramas": histogramas,
+            "contadores": contadores,
+            "fuentes": {nombre: funcion() for nombre, funcion in fuentes.items()},
+        }
+
+    def reiniciar(self) -> None:
+        with self._lock:
+            self._histogramas.clear()
+            self._contadores.clear()
+
+
+metricas = RegistroMetricas()
+
+
+@contextmanager
+def cronometro(nombre: str, **etiquetas: str) -> Iterator[None]:
+    """
+    Mide el bloque y lo añade al histograma `nombre`, también si el bloque lanza una excepción.
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        metricas.observar(nombre, (time.perf_counter() - inicio) * 1000, **etiquetas)
+
+
+def _operacion(sentencia: str) -> str:
+    """
+    Primera palabra de la sentencia (SELECT, INSERT...), para agrupar sin disparar la cardinalidad.
+    """
+    partes = sentencia.lstrip().split(None, 1)
+    return partes[0].upper() if partes else "?"
+
+
+def instrumentar_motor(motor: Engine, nombre: str) -> None:
+    """
+    Mide cada sentencia ejecutada por el motor en el histograma `sql_ms` (etiquetas motor y
+    operacion) y registra las que superan SQL_SLOW_QUERY_MS. Los parámetros no se registran:
+    pueden contener hashes de contraseñas o datos personales.
+    """
+
+    @event.listens_for(motor, "before_cursor_execute")
+    def _antes(conn, cursor, sentencia, parametros, contexto, executemany):
+        conn.info.setdefault("inicios_sql", []).append(time.perf_counter())
+
+    @event.listens_for(motor, "after_cursor_execute")
+    def _despues(conn, cursor, sentencia, parametros, contexto, executemany):
+        inicios: List[float] = conn.info.get("inicios_sql") or []
+        if not inicios:
+            return
+        ms = (time.perf_counter() - inicios.pop()) * 1000
+        operacion = _operacion(sentencia)
+        metricas.observar("sql_ms", ms, motor=nombre, operacion=operacion)
+        if ms >= SQL_SLOW_QUERY_MS:
+            metricas.incrementar("sql_lentas", motor=nombre, operacion=operacion)
+            _logger_sql.warning(
+                "consulta lenta",
+                extra={
+                    "campos": {
+                        "motor": nombre,
+                        "duracion_ms": round(ms, 3),
+                        "executemany": executemany,
+                        "sentencia": " ".join(sentencia.split())[:LONGITUD_MAX_SENTENCIA],
+                    }
+                },
+            )
+
+    # Si la sentencia falla no hay after_cursor_execute: se descarta su inicio.
+    @event.listens_for(motor, "handle_error")
+    def _error(contexto):
+        inicios: Optional[List[float]] = contexto.connection.info.get("inicios_sql") if contexto.connection else None
+        if inicios:
+            inicios.pop()
+        metricas.incrementar("sql_errores", motor=nombre)
@@ -0,0 +1,284 @@
+"""
+Importación y exportación masiva de usuarios desde la línea de comandos.
+
+La importación lee un archivo CSV o JSONL en streaming, valida las filas por lotes con un
+TypeAdapter de Pydantic, calcula los hashes de contraseña en el pool de procesos e inserta cada
+lote con un único executemany dentro de su propia transacción. Los duplicados y las filas
+inválidas se informan fila a fila en lugar de abortar la importación.
+
+La exportación recorre la tabla por páginas (keyset sobre Usuario.id) y escribe cada página
+según se lee, sin cargar la tabla completa en memoria.
+
+Uso:
+    python -m nueva_app_reflex.masivo importar usuarios.csv --informe informe.jsonl
+    python -m nueva_app_reflex.masivo exportar usuarios.jsonl
+"""
+
+import argparse
+import csv
+import json
+import sys
+from contextlib import contextmanager
+from typing import IO, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.exc import IntegrityError
+
+from nueva_app_reflex import hashing
+from nueva_app_reflex.instrumentacion import configurar_logging
+from nueva_app_reflex.db import migraciones
+from nueva_app_reflex.db.database import SessionLectura, SessionLocal
+from nueva_app_reflex.db.schemas import UsuarioCreate
+from nueva_app_reflex.db.usuarios import buscar_existentes, insertar_usuarios, listar_usuarios_pagina
+
+# Filas por lote de validación e inserción, y por página de exportación.
+TAMANO_LOTE = 1000
+CAMPOS_EXPORTACION = ["id", "nombre", "email", "es_admin"]
+
+_ADAPTADOR = TypeAdapter(List[UsuarioCreate])
+
+
+@contextmanager
+def _abrir(ruta: str, modo: str) -> Iterator[IO[str]]:
+    """
+    Abre un archivo de texto, o la entrada/salida estándar si la ruta es "-".
+    """
+    if ruta == "-":
+        yield sys.stdin if "r" in modo else sys.stdout
+        return
+    with open(ruta, modo, encoding="utf-8", newline="") as f:
+        yield f
+
+
+def _formato(ruta: str, formato: Optional[str]) -> str:
+    """
+    Devuelve el formato indicado o lo deduce de la extensión del archivo (CSV por defecto).
+    """
+    if formato:
+        return formato
+    return "jsonl" if ruta.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def _leer_filas(archivo: IO[str], formato: str) -> Iterator[Tuple[int, object]]:
+    """
+    Genera (número de fila, datos) sin leer el archivo completo.
+    Las líneas JSONL mal formadas se devuelven como texto para que la validación las rechace.
+    """
+    if formato == "csv":
+        for numero, fila in enumerate(csv.DictReader(archivo), start=1):
+            # Las celdas vacías se omiten para que se apliquen los valores por defecto del schema.
+            yield numero, {k: v for k, v in fila.items() if k and v not in (None, "")}
+    else:
+        for numero, linea in enumerate(archivo, start=1):
+            if not linea.strip():
+                continue
+            try:
+                yield numero, json.loads(linea)
+            except json.JSONDecodeError:
+                yield numero, linea
+
+
+def _lotes(filas: Iterator[Tuple[int, object]], tamano: int) -> Iterator[List[Tuple[int, object]]]:
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) == tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _validar_lote(lote: List[Tuple[int, object]]) -> Tuple[List[Tuple[int, UsuarioCreate]], List[dict]]:
+    """
+    Valida un lote completo con el TypeAdapter. Si hay errores, separa las filas inválidas y
+    vuelve a validar el resto, de modo que cada error se atribuye a su fila.
+    """
+    pendientes = lote
+    errores = []
+    while pendientes:
+        try:
+            usuarios = _ADAPTADOR.validate_python([datos for _, datos in pendientes])
+            return [(numero, u) for (numero, _), u in zip(pendientes, usuarios)], errores
+        except ValidationError as e:
+            mensajes = {}
+            for error in e.errors():
+                campo = ".".join(str(parte) for parte in error["loc"][1:]) or "fila"
+                mensajes.setdefault(error["loc"][0], []).append(f"{campo}: {error['msg']}")
+            errores.extend(
+                {"fila": numero, "estado": "invalido", "detalle": "; ".join(mensajes[i])}
+                for i, (numero, _) in enumerate(pendientes)
+                if i in mensajes
+            )
+            pendientes = [p for i, p in enumerate(pendientes) if i not in mensajes]
+    return [], errores
+
+
+def _insertar_lote(validos: List[Tuple[int, UsuarioCreate]]) -> List[dict]:
+    """
+    Descarta duplicados, calcula los hashes e inserta el lote. Devuelve el resultado por fila.
+    """
+    resultados = []
+    # Comprobación con una sesión de lectura: la de escritura toma el bloqueo de escritura
+    # (BEGIN IMMEDIATE) y lo retendría, frenando al backend, mientras se calculan los hashes.
+    with SessionLectura() as lectura:
+        nombres_existentes, emails_existentes = buscar_existentes(
+            lectura, (u.nombre for _, u in validos), (u.email for _, u in validos)
+        )
+    candidatos = []
+    for numero, usuario in validos:
+        if usuario.nombre in nombres_existentes or usuario.email in emails_existentes:
+            resultados.append({
+                "fila": numero,
+                "nombre": usuario.nombre,
+                "estado": "duplicado",
+                "detalle": f"El usuario '{usuario.nombre}' o el email '{usuario.email}' ya existen.",
+            })
+            continue
+        # También se descartan los repetidos dentro del propio archivo.
+        nombres_existentes.add(usuario.nombre)
+        emails_existentes.add(usuario.email)
+        candidatos.append((numero, usuario))
+
+    hashes = hashing.generar_hashes(u.password for _, u in candidatos)
+    filas = [
+        {
+            "nombre": u.nombre,
+            "email": u.email,
+            "password_hash": password_hash,
+            "es_admin": u.es_admin,
+        }
+        for (_, u), password_hash in zip(candidatos, hashes)
+    ]
+    db = SessionLocal()
+    try:
+        insertar_usuarios(db, filas)
+        db.commit()
+        resultados.extend(
+            {"fila": numero, "nombre": u.nombre, "estado": "creado"} for numero, u in candidatos
+        )
+    except IntegrityError:
+        db.rollback()
+        # Otro proceso registró alguno de los usuarios entre la comprobación y la inserción:
+        # se reintenta fila a fila para informar exactamente cuáles chocan.
+        for (numero, u), fila in zip(candidatos, filas):
+            try:
+                insertar_usuarios(db, [fila])
+                db.commit()
+                resultados.append({"fila": numero, "nombre": u.nombre, "estado": "creado"})
+            except IntegrityError:
+                db.rollback()
+                resultados.append({
+                    "fila": numero,
+                    "nombre": u.nombre,
+                    "estado": "duplicado",
+                    "detalle": f"El usuario '{u.nombre}' o el email '{u.email}' ya existen.",
+                })
+    finally:
+        db.close()
+    return resultados
+
+
+def importar(
+    archivo: IO[str],
+    formato: str = "csv",
+    informe: Optional[IO[str]] = None,
+    tamano_lote: int = TAMANO_LOTE,
+) -> dict:
+    """
+    Importa usuarios desde un archivo CSV o JSONL.
+
+    Args:
+        archivo: Archivo de texto abierto con columnas nombre, email, password y es_admin (opcional).
+        formato: "csv" o "jsonl".
+        informe: Si se indica, se escribe en él una línea JSON con el resultado de cada fila.
+        tamano_lote: Filas por lote de validación e inserción.
+
+    Returns:
+        dict: Número de filas creadas, duplicadas e inválidas.
+    """
+    resumen = {"creado": 0, "duplicado": 0, "invalido": 0}
+    for lote in _lotes(_leer_filas(archivo, formato), tamano_lote):
+        validos, errores = _validar_lote(lote)
+        resultados = errores + (_insertar_lote(validos) if validos else [])
+        for resultado in sorted(resultados, key=lambda r: r["fila"]):
+            resumen[resultado["estado"]] += 1
+            if informe is not None:
+                informe.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+    return resumen
+
+
+def exportar(archivo: IO[str], formato: str = "csv", tamano_pagina: int = TAMANO_LOTE) -> int:
+    """
+    Exporta los usuarios (sin hashes de contraseña) página a página.
+
+    Returns:
+        int: Número de usuarios exportados.
+    """
+    escritor = None
+    if formato == "csv":
+        escritor = csv.DictWriter(archivo, fieldnames=CAMPOS_EXPORTACION)
+        escritor.writeheader()
+    total = 0
+    ultimo_id = None
+    db = SessionLectura()
+    try:
+        while True:
+            filas, hay_mas = listar_usuarios_pagina(db, despues_de_id=ultimo_id, limite=tamano_pagina)
+            for fila in filas:
+                if escritor is not None:
+                    escritor.writerow(fila)
+                else:
+                    archivo.write(json.dumps(fila, ensure_ascii=False) + "\n")
+            total += len(filas)
+            if not hay_mas:
+                return total
+            ultimo_id = filas[-1]["id"]
+            # Libera los objetos de la página anterior del mapa de identidad de la sesión.
+            db.expunge_all()
+    finally:
+        db.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Punto de entrada de la línea de comandos.
+    """
+    load_dotenv()
+    configurar_logging()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    parser_importar = subparsers.add_parser("importar", help="Importa usuarios desde CSV o JSONL.")
+    parser_importar.add_argument("archivo", help='Ruta del archivo, o "-" para la entrada estándar.')
+    parser_importar.add_argument("--formato", choices=["csv", "jsonl"])
+    parser_importar.add_argument("--informe", help="Archivo JSONL con el resultado de cada fila.")
+    parser_importar.add_argument("--lote", type=int, default=TAMANO_LOTE)
+
+    parser_exportar = subparsers.add_parser("exportar", help="Exporta usuarios a CSV o JSONL.")
+    parser_exportar.add_argument("archivo", help='Ruta del archivo, o "-" para la salida estándar.')
+    parser_exportar.add_argument("--formato", choices=["csv", "jsonl"])
+
+    args = parser.parse_args(argv)
+    formato = _formato(args.archivo, args.formato)
+    migraciones.aplicar()
+    if args.comando == "importar":
+        try:
+            with _abrir(args.archivo, "r") as archivo:
+                if args.informe:
+                    with _abrir(args.informe, "w") as informe:
+                        resumen = importar(archivo, formato, informe, args.lote)
+                else:
+                    resumen = importar(archivo, formato, tamano_lote=args.lote)
+        finally:
+            hashing.cerrar()
+        print(json.dumps(resumen), file=sys.stderr)
+    else:
+        with _abrir(args.archivo, "w") as archivo:
+            total = exportar(archivo, formato)
+        print(f"{total} usuario(s) exportados.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Monitorización del backend Reflex: tiempo de cada manejador de eventos y endpoint de métricas.
+
+- `MiddlewareTiempos` mide cada evento desde que Reflex lo recibe hasta la última actualización
+  de estado (la marcada como final) en el histograma `manejador_ms`, etiquetado con la clase y el
+  nombre del manejador. Los eventos que superan HANDLER_SLOW_MS (500 ms) se registran como aviso.
+  Los manejadores en segundo plano no se miden: siguen activos mientras el cliente está conectado.
+- `GET /metricas` devuelve los histogramas, contadores y métricas de las cachés del proceso en
+  JSON, o en el formato de texto de Prometheus con `?formato=prometheus`. Sólo responde a
+  peticiones desde la propia máquina, salvo que se defina METRICS_TOKEN: entonces exige la
+  cabecera `Authorization: Bearer <token>`.
+"""
+
+import functools
+import hmac
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import reflex as rx
+from fastapi import Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from reflex.event import Event
+from reflex.middleware import Middleware
+from reflex.state import BaseState, StateUpdate
+
+from nueva_app_reflex.instrumentacion import LIMITES_MS, metricas
+
+HANDLER_SLOW_MS = float(os.environ.get("HANDLER_SLOW_MS", "500"))
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+RUTA_METRICAS = "/metricas"
+# Prefijo de las métricas en el formato de Prometheus.
+PREFIJO_PROMETHEUS = "nueva_app_"
+# Eventos en curso que se recuerdan como máximo: si un evento falla fuera del manejador no
+# llega a la actualización final y su inicio se quedaría en memoria.
+MAX_EVENTOS_EN_CURSO = 10_000
+
+logger = logging.getLogger(__name__)
+
+_CLIENTES_LOCALES = {"127.0.0.1", "::1", "localhost"}
+
+
+@functools.lru_cache(maxsize=1024)
+def _nombre_manejador(evento: str) -> Optional[str]:
+    """
+    Traduce el nombre completo de un evento a "Clase.manejador", o None si el manejador se
+    ejecuta en segundo plano.
+    """
+    ruta, nombre = evento.rsplit(".", 1)
+    try:
+        clase = rx.State.get_class_substate(ruta)
+    except ValueError:
+        return nombre
+    manejador = clase.event_handlers.get(nombre)
+    if manejador is not None and manejador.is_background:
+        return None
+    return f"{clase.__name__}.{nombre}"
+
+
+class MiddlewareTiempos(Middleware):
+    """
+    Mide la duración de cada evento de los clientes.
+    """
+
+    def __init__(self):
+        # (token, evento) -> (inicio, manejador). Cada cliente procesa sus eventos de uno en uno.
+        self._inicios: Dict[Tuple[str, str], Tuple[float, str]] = {}
+
+    async def preprocess(self, app: rx.App, state: BaseState, event: Event) -> Optional[StateUpdate]:
+        if "." not in event.name:
+            return None
+        manejador = _nombre_manejador(event.name)
+        if manejador is not None:
+            if len(self._inicios) >= MAX_EVENTOS_EN_CURSO:
+                self._inicios.clear()
+            self._inicios[(event.token, event.name)] = (time.perf_counter(), manejador)
+        return None
+
+    async def postprocess(self, app: rx.App, state: BaseState, event: Event, update: StateUpdate) -> StateUpdate:
+        if not update.final:
+            return update
+        inicio = self._inicios.pop((event.token, event.name), None)
+        if inicio is None:
+            return update
+        ms = (time.perf_counter() - inicio[0]) * 1000
+        metricas.observar("manejador_ms", ms, manejador=inicio[1])
+        if ms >= HANDLER_SLOW_MS:
+            logger.warning("manejador lento", extra={"campos": {"manejador": inicio[1], "duracion_ms": round(ms, 3)}})
+        return update
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiquetas_prometheus(etiquetas: Dict[str, str]) -> str:
+    if not etiquetas:
+        return ""
+    return "{" + ",".join(f'{clave}="{_escapar(valor)}"' for clave, valor in etiquetas.items()) + "}"
+
+
+def a_prometheus(datos: dict) -> str:
+    """
+    Convierte una instantánea de `metricas` al formato de texto de Prometheus.
+    """
+    lineas: List[str] = []
+    tipos_emitidos = set()
+
+    def tipo(nombre: str, clase: str) -> None:
+        if nombre not in tipos_emitidos:
+            tipos_emitidos.add(nombre)
+            lineas.append(f"# TYPE {nombre} {clase}")
+
+    for h in datos["histogramas"]:
+        nombre = PREFIJO_PROMETHEUS + h["nombre"]
+        tipo(nombre, "histogram")
+        acumulado = 0
+        for limite, cantidad in zip([str(limite) for limite in LIMITES_MS] + ["+Inf"], h["cubetas"].values()):
+            acumulado += cantidad
+            etiquetas = _etiquetas_prometheus({**h["etiquetas"], "le": limite})
+            lineas.append(f"{nombre}_bucket{etiquetas} {acumulado}")
+        lineas.append(f'{nombre}_sum{_etiquetas_prometheus(h["etiquetas"])} {h["suma_ms"]}')
+        lineas.append(f'{nombre}_count{_etiquetas_prometheus(h["etiquetas"])} {h["cuenta"]}')
+    for c in datos["contadores"]:
+        nombre = f"{PREFIJO_PROMETHEUS}{c['nombre']}_total"
+        tipo(nombre, "counter")
+        lineas.append(f"{nombre}{_etiquetas_prometheus(c['etiquetas'])} {c['valor']}")
+    for fuente, valores in datos["fuentes"].items():
+        for clave, valor in valores.items():
+            if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+                nombre = f"{PREFIJO_PROMETHEUS}{fuente}_{clave}"
+                tipo(nombre, "gauge")
+                lineas.append(f"{nombre} {valor}")
+    return "\n".join(lineas) + "\n"
+
+
+def _autorizado(request: Request) -> bool:
+    if METRICS_TOKEN:
+        return hmac.compare_digest(request.headers.get("authorization", ""), f"Bearer {METRICS_TOKEN}")
+    return request.client is not None and request.client.host in _CLIENTES_LOCALES
+
+
+async def ruta_metricas(request: Request, formato: str = "json"):
+    """
+    Endpoint GET /metricas.
+    """
+    if not _autorizado(request):
+        return JSONResponse({"detalle": "No autorizado."}, status_code=403)
+    datos = metricas.instantanea()
+    if formato == "prometheus":
+        return PlainTextResponse(a_prometheus(datos), media_type="text/plain; version=0.0.4")
+    return JSONResponse(datos)
+
+
+def instalar(app: rx.App) -> None:
+    """
+    Añade la medición de manejadores y el endpoint de métricas a la aplicación.
+    """
+    app.add_middleware(MiddlewareTiempos())
+    app.api.add_api_route(RUTA_METRICAS, ruta_metricas, methods=["GET"])
@@ -7,10 +7,16 @@ import reflex as rx
 
 from rxconfig import config
 from reflex.vars import Var
-from nueva_app_reflex.state import State
+from nueva_app_reflex.instrumentacion import configurar_logging
+from nueva_app_reflex import monitorizacion
+from nueva_app_reflex.db import migraciones
+from nueva_app_reflex.db.usuarios import sondear_usuarios_nuevos
+from nueva_app_reflex.state import AdminTareasState, State, TareasState
 from nueva_app_reflex.db.schemas import UsuarioCreate
 from typing import Dict, List
 
+configurar_logging()
+
 
 def index() -> rx.Component:
     """
@@ -131,6 +137,7 @@ def consultar_usuarios() -> rx.Component:
                         f"👤 {u['nombre']} | {u['email']} | "
                         + rx.cond(u['es_admin'], "Admin", "Usuario")
                     ),
+                    rx.link("Ver tareas", href="/usuarios/" + u["id"].to_string() + "/tareas"),
                     padding_y="1",
                     border_bottom="1px solid #eee",
                 ),
@@ -142,19 +149,212 @@ def consultar_usuarios() -> rx.Component:
         None
     )
 
-    # 4. Montaje final del contenedor
+    # 4. Controles de paginación: la lista sólo contiene la ventana actual de usuarios.
+    paginacion: rx.Component = rx.cond(
+        State.usuarios_lista,
+        rx.hstack(
+            rx.button(
+                "Anterior",
+                on_click=State.pagina_anterior,
+                disabled=~State.hay_pagina_anterior,
+            ),
+            rx.text(State.usuarios_total.to_string() + " en total"),
+            rx.button(
+                "Siguiente",
+                on_click=State.pagina_siguiente,
+                disabled=~State.hay_pagina_siguiente,
+            ),
+            justify="between",
+            width="100%",
+        ),
+        None
+    )
+
+    # 5. Usuarios registrados mientras la página está abierta (llegan por el canal de novedades).
+    nuevos_component: rx.Component = rx.cond(
+        State.usuarios_nuevos,
+        rx.vstack(
+            rx.text("Nuevos usuarios", weight="bold"),
+            rx.foreach(
+                State.usuarios_nuevos,
+                lambda u: rx.text(f"🆕 {u['nombre']} | {u['email']}"),
+            ),
+            spacing="1",
+            align="start",
+            width="100%",
+        ),
+        None
+    )
+
+    # 6. Buscador: la consulta se lanza cuando el usuario deja de escribir durante 300 ms.
+    buscador: rx.Component = rx.vstack(
+        rx.debounce_input(
+            rx.input(
+                value=State.busqueda_texto,
+                on_change=State.buscar,
+                placeholder="Buscar usuarios o tareas",
+                width="100%",
+            ),
+            debounce_timeout=300,
+        ),
+        rx.foreach(
+            State.resultados_usuarios,
+            lambda u: rx.text(f"👤 {u['nombre']} | {u['email']}"),
+        ),
+        rx.foreach(
+            State.resultados_tareas,
+            lambda t: rx.link(
+                f"📝 {t['descripcion']} ({t['usuario']})",
+                href="/usuarios/" + t["usuario_id"].to_string() + "/tareas",
+            ),
+        ),
+        spacing="1",
+        align="start",
+        width="100%",
+    )
+
+    # 7. Montaje final del contenedor
     return rx.container(
         rx.heading("Consulta de Usuarios", size="7"),
+        buscador,
         rx.button("Consultar Usuarios", on_click=State.consultar_usuarios),
         rx.text(mensaje, color=color_mensaje),
-        lista_component,
+        nuevos_component,
+        rx.scroll_area(lista_component, type="auto", scrollbars="vertical", max_height="60vh"),
+        paginacion,
         margin_top="6",
         max_width="400px",
         align="center",
     )
 
 
+def tareas_usuario() -> rx.Component:
+    """
+    Página con las tareas de un usuario: listado, alta, cambio de estado y completado masivo.
+
+    Returns:
+        rx.Component: Componente con las tareas del usuario de la ruta.
+    """
+    fila_tarea = lambda t: rx.hstack(
+        rx.checkbox(
+            checked=t["completada"],
+            on_change=lambda _: TareasState.alternar_tarea(t["id"]),
+        ),
+        rx.text(
+            t["descripcion"],
+            text_decoration=rx.cond(t["completada"], "line-through", "none"),
+        ),
+        padding_y="1",
+        border_bottom="1px solid #eee",
+        width="100%",
+    )
+
+    return rx.container(
+        rx.heading("Tareas del usuario", size="7"),
+        rx.text(
+            TareasState.tareas_pendientes.to_string() + " pendiente(s) · "
+            + TareasState.tareas_completadas.to_string() + " completada(s)"
+        ),
+        rx.form(
+            rx.hstack(
+                rx.input(name="descripcion", placeholder="Nueva tarea", required=True),
+                rx.button("Añadir", type_="submit"),
+            ),
+            on_submit=TareasState.crear_tarea,
+            reset_on_submit=True,
+        ),
+        rx.cond(TareasState.mensaje_tarea, rx.text(TareasState.mensaje_tarea, color="red")),
+        rx.scroll_area(
+            rx.vstack(rx.foreach(TareasState.tareas_lista, fila_tarea), spacing="2", width="100%"),
+            type="auto",
+            scrollbars="vertical",
+            max_height="60vh",
+        ),
+        rx.hstack(
+            rx.button(
+                "Completar todas",
+                on_click=TareasState.completar_todas,
+                disabled=TareasState.tareas_pendientes == 0,
+            ),
+            rx.button(
+                "Más tareas",
+                on_click=TareasState.cargar_mas_tareas,
+                disabled=~TareasState.hay_mas_tareas,
+            ),
+        ),
+        margin_top="6",
+        max_width="400px",
+        align="center",
+    )
+
+
+def admin_tareas() -> rx.Component:
+    """
+    Página de administración con las tareas más recientes de cada usuario y sus contadores.
+
+    Returns:
+        rx.Component: Componente con una página de usuarios y sus tareas.
+    """
+    return rx.container(
+        rx.heading("Tareas por usuario", size="7"),
+        rx.cond(AdminTareasState.mensaje_admin, rx.text(AdminTareasState.mensaje_admin, color="red")),
+        rx.foreach(
+            AdminTareasState.admin_usuarios,
+            lambda u: rx.box(
+                rx.text(
+                    f"👤 {u['nombre']} | "
+                    + u["pendientes"].to_string() + " pendiente(s) | "
+                    + u["completadas"].to_string() + " completada(s)",
+                    weight="bold",
+                ),
+                rx.foreach(
+                    u["tareas"].to(List[Dict]),
+                    lambda t: rx.text(
+                        rx.cond(t["completada"], "✔ ", "○ ") + t["descripcion"].to(str)
+                    ),
+                ),
+                rx.cond(
+                    u["tareas_ocultas"].to(int) > 0,
+                    rx.link(
+                        "Ver las " + u["tareas_ocultas"].to_string() + " tarea(s) anteriores",
+                        href="/usuarios/" + u["id"].to_string() + "/tareas",
+                    ),
+                ),
+                padding_y="2",
+                border_bottom="1px solid #eee",
+            ),
+        ),
+        rx.button(
+            "Siguiente",
+            on_click=AdminTareasState.admin_pagina_siguiente,
+            disabled=~AdminTareasState.admin_hay_mas,
+        ),
+        margin_top="6",
+        max_width="600px",
+        align="center",
+    )
+
+
 app = rx.App()
+# El esquema se prepara al arrancar el backend, no al importar: compilar o exportar el frontend
+# no abre la base de datos.
+app.register_lifespan_task(migraciones.preparar_esquema)
+# Publica a los clientes de este worker los usuarios nuevos, registrados aquí o en otros procesos.
+app.register_lifespan_task(sondear_usuarios_nuevos)
+# Tiempos de los manejadores de eventos y endpoint GET /metricas.
+monitorizacion.instalar(app)
 app.add_page(index)
 app.add_page(registro_usuario, route="/registro-usuario", title="Registro de Usuario")
-app.add_page(consultar_usuarios, route="/consultar-usuarios", title="Consulta de Usuarios")
\ No newline at end of file
+app.add_page(
+    consultar_usuarios,
+    route="/consultar-usuarios",
+    title="Consulta de Usuarios",
+    on_load=State.suscribir_novedades,
+)
+app.add_page(
+    tareas_usuario,
+    route="/usuarios/[usuario_id]/tareas",
+    title="Tareas del usuario",
+    on_load=TareasState.cargar_tareas,
+)
+app.add_page(admin_tareas, route="/admin/tareas", title="Tareas por usuario", on_load=AdminTareasState.cargar_admin)
\ No newline at end of file
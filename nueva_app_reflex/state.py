@@ -1,21 +1,67 @@
+import logging
 import reflex as rx
-from typing import Optional, List
-from nueva_app_reflex.db.schemas import UsuarioCreate
-from nueva_app_reflex.db.database import SessionLocal
-from nueva_app_reflex.db.models import Usuario
+from typing import Optional, List, Set
+from nueva_app_reflex.db.schemas import TareaCreate, UsuarioCreate
+from nueva_app_reflex import hashing
+from nueva_app_reflex.db import asincrono
+from nueva_app_reflex.db.tareas import (
+    alternar_tarea,
+    completar_tareas,
+    contar_tareas,
+    crear_tarea,
+    listar_tareas,
+    listar_usuarios_con_tareas,
+)
+from nueva_app_reflex.db.busqueda import buscar_tareas, buscar_usuarios
+from nueva_app_reflex.db.novedades import canal_usuarios
+from nueva_app_reflex.db.usuarios import (
+    consultar_usuarios_pagina,
+    contar_usuarios,
+    crear_usuario,
+    listar_usuarios_pagina,
+    ultimo_id_usuario,
+)
 from sqlalchemy.exc import IntegrityError
-import hashlib
 from pydantic import ValidationError
 
+logger = logging.getLogger(__name__)
+
+# Máximo de usuarios nuevos que se muestran (y se envían) en la sección de novedades.
+MAX_USUARIOS_NUEVOS = 20
+# Segundos entre comprobaciones de que el cliente sigue conectado mientras no hay novedades.
+ESPERA_NOVEDADES = 30.0
+
+# Tokens de los clientes con una suscripción a novedades activa en este proceso.
+_suscripciones_novedades: Set[str] = set()
+
+
+def _cliente_conectado(token: str) -> bool:
+    """
+    Indica si el cliente con ese token sigue conectado por websocket a este proceso.
+    """
+    from nueva_app_reflex.nueva_app_reflex import app
+
+    return app.event_namespace is None or token in app.event_namespace.token_to_sid
+
 
 class State(rx.State):
     """
     Estado principal de la aplicación Reflex.
     """
     mensaje_usuario: Optional[str] = None
+    # Ventana actual de usuarios: sólo la página visible, nunca la tabla completa.
     usuarios_lista: List[dict] = []
+    usuarios_total: int = 0
+    hay_pagina_anterior: bool = False
+    hay_pagina_siguiente: bool = False
+    # Usuarios registrados después de abrir la página, recibidos por el canal de novedades.
+    usuarios_nuevos: List[dict] = []
+    # Búsqueda por prefijo sobre los índices FTS5 de usuarios y tareas.
+    busqueda_texto: str = ""
+    resultados_usuarios: List[dict] = []
+    resultados_tareas: List[dict] = []
 
-    def registrar_usuario(self, nombre, email, password, es_admin=False) -> None:
+    async def registrar_usuario(self, nombre, email, password, es_admin=False) -> None:
         """
         Registra un nuevo usuario en la base de datos.
         """
@@ -27,52 +73,290 @@ class State(rx.State):
                 es_admin=es_admin,
             )
         except ValidationError as e:
-            print(f"[DEBUG] Error de validación Pydantic: {e}")
+            logger.info("registro rechazado", extra={"campos": {"errores": e.error_count()}})
             self.mensaje_usuario = f"Error de validación: {e}"
             return
-        
-        db = SessionLocal()
+
         try:
-            password_hash = hashlib.sha256(usuario.password.encode()).hexdigest()
-            nuevo_usuario = Usuario(
+            password_hash = await hashing.generar_hash_async(usuario.password)
+            fila = await asincrono.ejecutar(
+                crear_usuario,
                 nombre=usuario.nombre,
                 email=usuario.email,
                 password_hash=password_hash,
                 es_admin=usuario.es_admin,
             )
-            db.add(nuevo_usuario)
-            db.commit()
-            print(f"[DEBUG] Usuario guardado: {usuario.nombre}, {usuario.email}, admin={usuario.es_admin}")
+            logger.info("usuario registrado", extra={"campos": {"usuario_id": fila["id"], "es_admin": fila["es_admin"]}})
             self.mensaje_usuario = f"Usuario '{usuario.nombre}' creado con éxito."
         except IntegrityError:
-            db.rollback()
             self.mensaje_usuario = f"El usuario '{usuario.nombre}' o el email '{usuario.email}' ya existen."
         except Exception as e:
-            db.rollback()
+            logger.exception("error al registrar usuario")
             self.mensaje_usuario = f"Error al crear usuario: {e}"
-        finally:
-            db.close()
         return self.set_mensaje_usuario(self.mensaje_usuario)
 
-    def consultar_usuarios(self) -> None:
+    async def _cargar_pagina(self, despues_de_id: Optional[int] = None, antes_de_id: Optional[int] = None) -> None:
         """
-        Consulta todos los usuarios de la base de datos.
+        Sustituye la ventana de usuarios por la página indicada por el cursor.
         """
-        db = SessionLocal()
         try:
-            usuarios = db.query(Usuario).all()
-            print(f"[DEBUG] Usuarios consultados: {usuarios}")
-            if usuarios:
-                self.usuarios_lista = [
-                    {"nombre": u.nombre, "email": u.email, "es_admin": u.es_admin}
-                    for u in usuarios
-                ]
-                self.mensaje_usuario = f"{len(usuarios)} usuario(s) encontrados."
+            filas, hay_mas = await asincrono.leer(
+                consultar_usuarios_pagina, despues_de_id=despues_de_id, antes_de_id=antes_de_id
+            )
+            self.usuarios_total = await asincrono.leer(contar_usuarios)
+            logger.debug("página de usuarios", extra={"campos": {"filas": len(filas), "despues_de_id": despues_de_id, "antes_de_id": antes_de_id}})
+            if antes_de_id is not None:
+                # Al retroceder, la página siguiente es la que se acaba de abandonar.
+                self.hay_pagina_anterior = hay_mas
+                self.hay_pagina_siguiente = True
+            else:
+                self.hay_pagina_anterior = despues_de_id is not None
+                self.hay_pagina_siguiente = hay_mas
+            if filas:
+                self.usuarios_lista = filas
+                self.mensaje_usuario = f"{self.usuarios_total} usuario(s) encontrados."
             else:
                 self.usuarios_lista = []
                 self.mensaje_usuario = "No hay usuarios registrados."
         except Exception as e:
+            logger.exception("error al consultar usuarios")
             self.usuarios_lista = []
             self.mensaje_usuario = f"Error al consultar usuarios: {e}"
+
+    async def consultar_usuarios(self) -> None:
+        """
+        Consulta la primera página de usuarios de la base de datos.
+        """
+        await self._cargar_pagina()
+
+    async def pagina_siguiente(self) -> None:
+        """
+        Avanza la ventana a los usuarios posteriores al último visible.
+        """
+        if self.usuarios_lista and self.hay_pagina_siguiente:
+            await self._cargar_pagina(despues_de_id=self.usuarios_lista[-1]["id"])
+
+    async def pagina_anterior(self) -> None:
+        """
+        Retrocede la ventana a los usuarios anteriores al primero visible.
+        """
+        if self.usuarios_lista and self.hay_pagina_anterior:
+            await self._cargar_pagina(antes_de_id=self.usuarios_lista[0]["id"])
+
+    async def buscar(self, texto: str) -> None:
+        """
+        Busca usuarios y tareas cuyo texto empiece por las palabras escritas.
+        """
+        self.busqueda_texto = texto
+        if not texto.strip():
+            self.resultados_usuarios = []
+            self.resultados_tareas = []
+            return
+        try:
+            self.resultados_usuarios = await asincrono.leer(buscar_usuarios, texto)
+            self.resultados_tareas = await asincrono.leer(buscar_tareas, texto)
+        except Exception as e:
+            logger.exception("error al buscar")
+            self.resultados_usuarios = []
+            self.resultados_tareas = []
+            self.mensaje_usuario = f"Error al buscar: {e}"
+
+    @rx.event(background=True)
+    async def suscribir_novedades(self):
+        """
+        Recibe los usuarios que se registran mientras el cliente tiene la página abierta.
+        Sólo se envían las filas nuevas (como máximo MAX_USUARIOS_NUEVOS), nunca la lista completa.
+        """
+        async with self:
+            token = self.router.session.client_token
+        if token in _suscripciones_novedades:
+            return
+        _suscripciones_novedades.add(token)
+        try:
+            cursor = await asincrono.leer(ultimo_id_usuario)
+            while _cliente_conectado(token):
+                filas = await canal_usuarios.esperar(cursor, ESPERA_NOVEDADES)
+                if filas is None:
+                    # El cursor es anterior al búfer en memoria: se consulta la base de datos.
+                    filas, _ = await asincrono.leer(
+                        listar_usuarios_pagina, despues_de_id=cursor, limite=MAX_USUARIOS_NUEVOS
+                    )
+                if not filas:
+                    continue
+                cursor = filas[-1]["id"]
+                async with self:
+                    self.usuarios_nuevos = (self.usuarios_nuevos + filas)[-MAX_USUARIOS_NUEVOS:]
+                    self.usuarios_total += len(filas)
+                    if self.usuarios_lista:
+                        # Las filas nuevas quedan detrás de la ventana actual.
+                        self.hay_pagina_siguiente = True
         finally:
-            db.close()
+            _suscripciones_novedades.discard(token)
+
+
+class TareasState(State):
+    """
+    Estado de la página de tareas de un usuario.
+    Guarda sólo la página visible de tareas y los contadores agregados del usuario.
+    """
+    tareas_usuario_id: int = 0
+    tareas_lista: List[dict] = []
+    tareas_pendientes: int = 0
+    tareas_completadas: int = 0
+    hay_mas_tareas: bool = False
+    mensaje_tarea: Optional[str] = None
+
+    async def _refrescar_contadores(self) -> None:
+        """
+        Recalcula los contadores de pendientes y completadas con una consulta agregada.
+        """
+        contadores = await asincrono.leer(contar_tareas, self.tareas_usuario_id)
+        self.tareas_pendientes = contadores["pendientes"]
+        self.tareas_completadas = contadores["completadas"]
+
+    async def cargar_tareas(self) -> None:
+        """
+        Carga la primera página de tareas del usuario indicado en la ruta.
+        """
+        try:
+            self.tareas_usuario_id = int(self.router.page.params.get("usuario_id", 0))
+        except (TypeError, ValueError):
+            self.tareas_usuario_id = 0
+        if self.tareas_usuario_id <= 0:
+            # Parámetro de ruta ausente o no numérico: no se consulta ni se crea nada para el id 0.
+            self.tareas_lista = []
+            self.hay_mas_tareas = False
+            self.tareas_pendientes = 0
+            self.tareas_completadas = 0
+            self.mensaje_tarea = "El usuario no existe."
+            return
+        try:
+            self.tareas_lista, self.hay_mas_tareas = await asincrono.leer(
+                listar_tareas, self.tareas_usuario_id
+            )
+            await self._refrescar_contadores()
+            self.mensaje_tarea = None
+        except Exception as e:
+            logger.exception("error al consultar tareas", extra={"campos": {"usuario_id": self.tareas_usuario_id}})
+            self.tareas_lista = []
+            self.mensaje_tarea = f"Error al consultar tareas: {e}"
+
+    async def cargar_mas_tareas(self) -> None:
+        """
+        Sustituye la ventana por la página de tareas siguiente a la última visible.
+        """
+        if not (self.tareas_lista and self.hay_mas_tareas):
+            return
+        try:
+            self.tareas_lista, self.hay_mas_tareas = await asincrono.leer(
+                listar_tareas, self.tareas_usuario_id, despues_de_id=self.tareas_lista[-1]["id"]
+            )
+            self.mensaje_tarea = None
+        except Exception as e:
+            logger.exception("error al consultar tareas", extra={"campos": {"usuario_id": self.tareas_usuario_id}})
+            self.mensaje_tarea = f"Error al consultar tareas: {e}"
+
+    async def crear_tarea(self, fields: dict) -> None:
+        """
+        Crea una tarea pendiente para el usuario de la página.
+        """
+        try:
+            tarea = TareaCreate(descripcion=fields.get("descripcion", ""))
+        except ValidationError as e:
+            self.mensaje_tarea = f"Error de validación: {e}"
+            return
+        if self.tareas_usuario_id <= 0:
+            self.mensaje_tarea = "El usuario no existe."
+            return
+        try:
+            nueva = await asincrono.ejecutar(crear_tarea, self.tareas_usuario_id, tarea.descripcion)
+        except IntegrityError:
+            nueva = None
+        except Exception as e:
+            logger.exception("error al crear tarea", extra={"campos": {"usuario_id": self.tareas_usuario_id}})
+            self.mensaje_tarea = f"Error al crear tarea: {e}"
+            return
+        if nueva is None:
+            self.mensaje_tarea = "El usuario no existe."
+            return
+        # La tarea nueva tiene el id más alto: sólo es visible si la ventana llega al final.
+        if not self.hay_mas_tareas:
+            self.tareas_lista.append(nueva)
+        self.tareas_pendientes += 1
+        self.mensaje_tarea = None
+
+    async def alternar_tarea(self, tarea_id: int) -> None:
+        """
+        Marca una tarea como completada o pendiente.
+        """
+        try:
+            completada = await asincrono.ejecutar(alternar_tarea, self.tareas_usuario_id, tarea_id)
+        except Exception as e:
+            logger.exception("error al actualizar tarea", extra={"campos": {"tarea_id": tarea_id}})
+            self.mensaje_tarea = f"Error al actualizar tarea: {e}"
+            return
+        if completada is None:
+            self.mensaje_tarea = "La tarea no existe."
+            return
+        # Se muestra el estado de la base, no el contrario del que se veía en esta pestaña.
+        for tarea in self.tareas_lista:
+            if tarea["id"] == tarea_id:
+                tarea["completada"] = completada
+        try:
+            await self._refrescar_contadores()
+            self.mensaje_tarea = None
+        except Exception as e:
+            logger.exception("error al contar tareas", extra={"campos": {"usuario_id": self.tareas_usuario_id}})
+            self.mensaje_tarea = f"Error al contar tareas: {e}"
+
+    async def completar_todas(self) -> None:
+        """
+        Marca como completadas todas las tareas pendientes del usuario con un único UPDATE.
+        """
+        try:
+            actualizadas = await asincrono.ejecutar(completar_tareas, self.tareas_usuario_id)
+        except Exception as e:
+            logger.exception("error al completar tareas", extra={"campos": {"usuario_id": self.tareas_usuario_id}})
+            self.mensaje_tarea = f"Error al completar tareas: {e}"
+            return
+        self.tareas_lista = [{**t, "completada": True} for t in self.tareas_lista]
+        self.tareas_pendientes = 0
+        self.tareas_completadas += actualizadas
+        self.mensaje_tarea = None
+
+
+class AdminTareasState(State):
+    """
+    Estado de la vista de administración de tareas: una página de usuarios con sus tareas.
+    """
+    admin_usuarios: List[dict] = []
+    admin_hay_mas: bool = False
+    mensaje_admin: Optional[str] = None
+
+    async def cargar_admin(self) -> None:
+        """
+        Carga la primera página de usuarios con sus tareas y contadores.
+        """
+        try:
+            self.admin_usuarios, self.admin_hay_mas = await asincrono.leer(listar_usuarios_con_tareas)
+            self.mensaje_admin = None
+        except Exception as e:
+            logger.exception("error al consultar tareas por usuario")
+            self.admin_usuarios = []
+            self.admin_hay_mas = False
+            self.mensaje_admin = f"Error al consultar tareas: {e}"
+
+    async def admin_pagina_siguiente(self) -> None:
+        """
+        Avanza a la página de usuarios siguiente.
+        """
+        if not (self.admin_usuarios and self.admin_hay_mas):
+            return
+        try:
+            self.admin_usuarios, self.admin_hay_mas = await asincrono.leer(
+                listar_usuarios_con_tareas, despues_de_id=self.admin_usuarios[-1]["id"]
+            )
+            self.mensaje_admin = None
+        except Exception as e:
+            logger.exception("error al consultar tareas por usuario")
+            self.mensaje_admin = f"Error al consultar tareas: {e}"
@@ -1,5 +1,14 @@
+import os
+
 import reflex as rx
+from dotenv import load_dotenv
+
+# Variables del archivo .env (DATABASE_PATH, LOG_FORMAT...) para todos los comandos de Reflex.
+load_dotenv()
 
 config = rx.Config(
     app_name="nueva_app_reflex",
-)
\ No newline at end of file
+    # Con REDIS_URL el estado de las sesiones se guarda en Redis y lo comparten todos los workers
+    # del backend (BACKEND_WORKERS > 1); sin ella se guarda en disco, sólo válido con un worker.
+    redis_url=os.environ.get("REDIS_URL") or None,
+)
@@ -0,0 +1,44 @@
+"""
+Fixtures comunes de las pruebas: una base SQLite temporal y migrada para cada prueba.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+RAIZ_PROYECTO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ_PROYECTO))
+# Hashes baratos y un pool pequeño: se leen al importar `hashing`, también en los procesos del pool.
+os.environ.setdefault("SCRYPT_N", "1024")
+os.environ.setdefault("HASH_WORKERS", "2")
+
+from nueva_app_reflex import hashing  # noqa: E402
+from nueva_app_reflex.db import database, migraciones  # noqa: E402
+from nueva_app_reflex.db.usuarios import invalidar_cache_usuarios  # noqa: E402
+
+
+@pytest.fixture
+def ruta_db(tmp_path, monkeypatch) -> str:
+    """
+    Apunta DATABASE_PATH a una base nueva con el esquema al día y la cierra al terminar.
+    """
+    ruta = str(tmp_path / "app.db")
+    database.cerrar_motores()
+    monkeypatch.setenv("DATABASE_PATH", ruta)
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(filter(None, [str(RAIZ_PROYECTO), os.environ.get("PYTHONPATH")])))
+    migraciones.aplicar()
+    invalidar_cache_usuarios()
+    yield ruta
+    database.cerrar_motores()
+
+
+@pytest.fixture
+def pool():
+    """
+    Pool de hashing nuevo para la prueba, que se cierra al terminar.
+    """
+    hashing.cerrar()
+    yield
+    hashing.cerrar()
@@ -0,0 +1,127 @@
+"""
+Búsqueda de texto completo: sincronización de los índices FTS5 por triggers, reconstrucción al
+migrar una base con datos y consultas seguras a partir del texto del usuario.
+"""
+
+import sqlite3
+
+import pytest
+
+from nueva_app_reflex.db import busqueda, database, migraciones
+from nueva_app_reflex.db.database import SessionLectura
+
+
+def _ejecutar(ruta: str, *sentencias: str) -> None:
+    with sqlite3.connect(ruta) as conexion:
+        for sentencia in sentencias:
+            conexion.execute(sentencia)
+
+
+def _usuarios(texto: str) -> list:
+    with SessionLectura() as db:
+        return [u["nombre"] for u in busqueda.buscar_usuarios(db, texto)]
+
+
+def _tareas(texto: str) -> list:
+    with SessionLectura() as db:
+        return [t["descripcion"] for t in busqueda.buscar_tareas(db, texto)]
+
+
+def _indices_integros(ruta: str) -> None:
+    # FTS5 compara el índice con la tabla de contenido y falla si no coinciden.
+    _ejecutar(
+        ruta,
+        "INSERT INTO usuarios_fts(usuarios_fts, rank) VALUES ('integrity-check', 1)",
+        "INSERT INTO tareas_fts(tareas_fts, rank) VALUES ('integrity-check', 1)",
+    )
+
+
+def test_triggers_mantienen_el_indice(ruta_db):
+    _ejecutar(
+        ruta_db,
+        "INSERT INTO usuarios (nombre, email, password_hash, es_admin) VALUES ('garcia', 'garcia@ejemplo.com', 'x', 0)",
+        "INSERT INTO tareas (descripcion, completada, usuario_id) VALUES ('regar las plantas', 0, 1)",
+    )
+    assert _usuarios("garc") == ["garcia"]
+    assert _tareas("plan") == ["regar las plantas"]
+
+    _ejecutar(
+        ruta_db,
+        "UPDATE usuarios SET nombre = 'lopez', email = 'lopez@correo.es' WHERE id = 1",
+        "UPDATE tareas SET descripcion = 'comprar pan' WHERE id = 1",
+    )
+    assert _usuarios("garcia") == [] and _usuarios("ejemplo") == []
+    assert _usuarios("lopez") == ["lopez"] and _usuarios("correo") == ["lopez"]
+    assert _tareas("plantas") == [] and _tareas("pan") == ["comprar pan"]
+
+    # Cambiar otras columnas no reindexa y no deja el índice desincronizado.
+    _ejecutar(ruta_db, "UPDATE tareas SET completada = 1 WHERE id = 1", "UPDATE usuarios SET es_admin = 1")
+    assert _tareas("pan") == ["comprar pan"]
+    _indices_integros(ruta_db)
+
+    _ejecutar(ruta_db, "DELETE FROM tareas", "DELETE FROM usuarios")
+    assert _usuarios("lopez") == [] and _tareas("pan") == []
+    _indices_integros(ruta_db)
+
+
+def test_migracion_reconstruye_el_indice_de_filas_existentes(tmp_path, monkeypatch):
+    ruta = str(tmp_path / "app.db")
+    database.cerrar_motores()
+    monkeypatch.setenv("DATABASE_PATH", ruta)
+    # Base en la versión 1, con datos anteriores a la búsqueda.
+    with sqlite3.connect(ruta) as conexion:
+        migraciones._esquema_inicial(conexion)
+        conexion.execute("PRAGMA user_version = 1")
+        conexion.executemany(
+            "INSERT INTO usuarios (nombre, email, password_hash, es_admin) VALUES (?, ?, 'x', 0)",
+            [("ana", "ana@ejemplo.com"), ("marta", "marta@ejemplo.com")],
+        )
+        conexion.execute("INSERT INTO tareas (descripcion, completada, usuario_id) VALUES ('pasear al perro', 0, 2)")
+    try:
+        assert migraciones.aplicar() == [2, 3]
+        assert _usuarios("mar") == ["marta"]
+        assert sorted(_usuarios("ejemplo")) == ["ana", "marta"]
+        assert _tareas("perro") == ["pasear al perro"]
+        _indices_integros(ruta)
+    finally:
+        database.cerrar_motores()
+
+
+@pytest.mark.parametrize(
+    "texto, esperado",
+    [
+        ("ana", ('"ana"*', '"ana"')),
+        ('ana "pe', ('"ana" "pe"*', '"ana" "pe"')),
+        ("ana OR marta", ('"ana" "OR" "marta"*', '"ana" "OR" "marta"')),
+        ("an* -marta", ('"an" "marta"*', '"an" "marta"')),
+        ("NEAR(ana marta)", ('"NEAR" "ana" "marta"*', '"NEAR" "ana" "marta"')),
+        ("a", None),
+        ('"* -', None),
+        ('"* - OR', ('"OR"*', '"OR"')),
+        ("", None),
+    ],
+)
+def test_consultas_fts_neutralizan_la_sintaxis(texto, esperado):
+    assert busqueda.consultas_fts(texto) == esperado
+
+
+@pytest.mark.parametrize(
+    "texto, esperado",
+    [
+        ('"', []),
+        ('ana"', ["ana"]),
+        ("ana*", ["ana"]),
+        ("-ana", ["ana"]),
+        ("ana OR marta", []),
+        ("ana - marta", []),
+        ("ana AND NOT marta", []),
+    ],
+)
+def test_sintaxis_fts_del_usuario_no_falla_ni_amplia_la_busqueda(ruta_db, texto, esperado):
+    _ejecutar(
+        ruta_db,
+        "INSERT INTO usuarios (nombre, email, password_hash, es_admin) VALUES ('ana', 'ana@ejemplo.com', 'x', 0)",
+        "INSERT INTO usuarios (nombre, email, password_hash, es_admin) VALUES ('marta', 'marta@ejemplo.com', 'x', 0)",
+    )
+    # Los operadores se buscan como palabras: un OR no añade a marta y un "-" no excluye a ana.
+    assert _usuarios(texto) == esperado
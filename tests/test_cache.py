@@ -0,0 +1,127 @@
+"""
+Caché de lectura: caducidad, expulsión LRU, una sola carga por clave e invalidación durante una carga.
+"""
+
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from nueva_app_reflex.db import cache
+from nueva_app_reflex.db.cache import CacheLectura
+
+
+@pytest.fixture
+def reloj(monkeypatch) -> types.SimpleNamespace:
+    """
+    Reloj manual para la caché: `reloj.ahora` es lo que devuelve time.monotonic().
+    """
+    reloj = types.SimpleNamespace(ahora=1000.0)
+    monkeypatch.setattr(cache, "time", types.SimpleNamespace(monotonic=lambda: reloj.ahora))
+    return reloj
+
+
+def _contador():
+    llamadas = []
+
+    def cargar(valor):
+        def funcion():
+            llamadas.append(valor)
+            return valor
+        return funcion
+
+    return llamadas, cargar
+
+
+def test_caduca_tras_el_ttl(reloj):
+    c = CacheLectura("prueba", ttl=30.0)
+    llamadas, cargar = _contador()
+    assert c.obtener("k", cargar(1)) == 1
+    reloj.ahora += 29.9
+    assert c.obtener("k", cargar(2)) == 1
+    reloj.ahora += 0.1
+    assert c.obtener("k", cargar(2)) == 2
+    assert llamadas == [1, 2]
+    metricas = c.metricas()
+    assert (metricas["aciertos"], metricas["fallos"], metricas["entradas"]) == (1, 2, 1)
+
+
+def test_expulsa_la_menos_usada(reloj):
+    c = CacheLectura("prueba", max_entradas=2)
+    llamadas, cargar = _contador()
+    c.obtener("a", cargar("a"))
+    c.obtener("b", cargar("b"))
+    # Leer "a" la convierte en la más reciente: al entrar "c" sale "b".
+    c.obtener("a", cargar("a"))
+    c.obtener("c", cargar("c"))
+    c.obtener("a", cargar("a"))
+    c.obtener("b", cargar("b"))
+    assert llamadas == ["a", "b", "c", "b"]
+    assert c.metricas()["expulsiones"] == 2
+    assert c.metricas()["entradas"] == 2
+
+
+def test_una_sola_carga_para_fallos_concurrentes():
+    c = CacheLectura("prueba")
+    liberar = threading.Event()
+    llamadas = []
+
+    def cargar():
+        llamadas.append(1)
+        # Todos los hilos piden la clave mientras la primera carga sigue en curso.
+        liberar.wait(5)
+        return "valor"
+
+    with ThreadPoolExecutor(max_workers=8) as hilos:
+        futuros = [hilos.submit(c.obtener, "k", cargar) for _ in range(8)]
+        for _ in range(500):
+            if c.metricas()["fallos"] == 1 and len(c._cargando) == 1:
+                break
+            time.sleep(0.01)
+        liberar.set()
+        assert [f.result(timeout=5) for f in futuros] == ["valor"] * 8
+    assert llamadas == [1]
+    assert c.metricas()["fallos"] == 1
+
+
+def test_si_la_carga_falla_otro_hilo_la_reintenta():
+    c = CacheLectura("prueba")
+    empezada, liberar = threading.Event(), threading.Event()
+
+    def fallar():
+        empezada.set()
+        liberar.wait(5)
+        raise RuntimeError("base no disponible")
+
+    with ThreadPoolExecutor(max_workers=2) as hilos:
+        primero = hilos.submit(c.obtener, "k", fallar)
+        assert empezada.wait(5)
+        segundo = hilos.submit(c.obtener, "k", lambda: "valor")
+        liberar.set()
+        with pytest.raises(RuntimeError):
+            primero.result(timeout=5)
+        assert segundo.result(timeout=5) == "valor"
+    assert c.obtener("k", lambda: "otro") == "valor"
+
+
+def test_invalidar_durante_una_carga_descarta_su_resultado():
+    c = CacheLectura("prueba")
+    empezada, liberar = threading.Event(), threading.Event()
+
+    def cargar_antiguo():
+        empezada.set()
+        liberar.wait(5)
+        return "antes de escribir"
+
+    with ThreadPoolExecutor(max_workers=1) as hilos:
+        carga = hilos.submit(c.obtener, "k", cargar_antiguo)
+        assert empezada.wait(5)
+        # Una escritura se confirma mientras la consulta anterior sigue en curso.
+        c.invalidar()
+        liberar.set()
+        # Quien la pidió recibe su resultado, pero no se guarda para los siguientes.
+        assert carga.result(timeout=5) == "antes de escribir"
+    assert c.obtener("k", lambda: "después de escribir") == "después de escribir"
+    assert c.metricas()["invalidaciones"] == 1
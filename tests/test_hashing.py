@@ -0,0 +1,137 @@
+"""
+Hashes de contraseñas: formatos admitidos, hashes dañados, pool de procesos y rehash al iniciar sesión.
+"""
+
+import asyncio
+import hashlib
+
+import pytest
+
+from nueva_app_reflex import hashing
+
+
+def test_pool_roto_se_sustituye(pool):
+    async def escenario():
+        await hashing.generar_hash_async("calentamiento")
+        # Un proceso del pool muere (OOM killer, SIGKILL): ProcessPoolExecutor queda roto.
+        for proceso in list(hashing._pool._processes.values()):
+            proceso.kill()
+            proceso.join()
+        nuevo = await hashing.generar_hash_async("secreto123")
+        assert await hashing.verificar_async("secreto123", nuevo)
+
+    asyncio.run(escenario())
+
+
+def test_pool_roto_se_sustituye_en_lotes(pool):
+    hashing.generar_hashes(["a"])
+    for proceso in list(hashing._pool._processes.values()):
+        proceso.kill()
+        proceso.join()
+    hashes = hashing.generar_hashes(["a", "b"])
+    assert [hashing.verificar(p, h) for p, h in zip("ab", hashes)] == [True, True]
+
+
+def test_generar_y_verificar():
+    password_hash = hashing.generar_hash("secreto123")
+    assert password_hash.startswith("scrypt$v1$n=1024,r=8,p=1$")
+    assert hashing.verificar("secreto123", password_hash)
+    assert not hashing.verificar("otra", password_hash)
+    assert not hashing.necesita_rehash(password_hash)
+    # Cada hash lleva su propia sal.
+    assert hashing.generar_hash("secreto123") != password_hash
+
+
+def test_pbkdf2():
+    password_hash = hashing.generar_hash("secreto123", algoritmo="pbkdf2_sha256")
+    assert hashing.verificar("secreto123", password_hash)
+    assert not hashing.verificar("otra", password_hash)
+    # El algoritmo configurado es scrypt: hay que recalcularlo.
+    assert hashing.necesita_rehash(password_hash)
+
+
+def test_sha256_heredado():
+    heredado = hashlib.sha256(b"secreto123").hexdigest()
+    assert hashing.verificar("secreto123", heredado)
+    assert not hashing.verificar("otra", heredado)
+    assert hashing.necesita_rehash(heredado)
+
+
+def test_parametros_distintos_necesitan_rehash(monkeypatch):
+    monkeypatch.setattr(hashing, "SCRYPT_N", 512)
+    antiguo = hashing.generar_hash("secreto123")
+    monkeypatch.undo()
+    assert hashing.verificar("secreto123", antiguo)
+    assert hashing.necesita_rehash(antiguo)
+
+
+def _danados() -> list:
+    valido = hashing.generar_hash("secreto123")
+    algoritmo, version, parametros, sal, derivado = valido.split("$")
+    return [
+        "",
+        "basura",
+        valido[:-20],
+        valido[: len(valido) // 2],
+        f"{algoritmo}${version}$n=x,r=8,p=1${sal}${derivado}",
+        f"{algoritmo}${version}$n=1024,r=8${sal}${derivado}",
+        f"{algoritmo}${version}$n=1000,r=8,p=1${sal}${derivado}",
+        f"{algoritmo}${version}${parametros}$a${derivado}",
+        f"{algoritmo}${version}${parametros}${sal}$",
+        f"{algoritmo}$v0${parametros}${sal}${derivado}",
+        f"md5${version}${parametros}${sal}${derivado}",
+    ]
+
+
+@pytest.mark.parametrize("danado", _danados())
+def test_hash_danado_falla_sin_excepcion(danado):
+    assert hashing.verificar("secreto123", danado) is False
+    assert hashing.necesita_rehash(danado) is True
+
+
+def _hash_en_base(nombre: str) -> str:
+    from nueva_app_reflex.db.database import SessionLectura
+    from nueva_app_reflex.db.usuarios import obtener_credenciales
+
+    with SessionLectura() as db:
+        return obtener_credenciales(db, nombre)["password_hash"]
+
+
+def _registrar(nombre: str, password_hash: str) -> None:
+    from nueva_app_reflex.db import asincrono
+    from nueva_app_reflex.db.usuarios import crear_usuario
+
+    asyncio.run(asincrono.ejecutar(crear_usuario, nombre, f"{nombre}@ejemplo.com", password_hash))
+
+
+def test_autenticar_recalcula_hash_antiguo(ruta_db, pool, monkeypatch):
+    from nueva_app_reflex.autenticacion import autenticar
+
+    monkeypatch.setattr(hashing, "SCRYPT_N", 512)
+    antiguo = hashing.generar_hash("secreto123")
+    monkeypatch.undo()
+    _registrar("ana", antiguo)
+
+    assert asyncio.run(autenticar("ana", "otra")) is None
+    assert _hash_en_base("ana") == antiguo
+
+    usuario = asyncio.run(autenticar("ana", "secreto123"))
+    assert usuario["nombre"] == "ana" and "password_hash" not in usuario
+    nuevo = _hash_en_base("ana")
+    assert nuevo != antiguo and not hashing.necesita_rehash(nuevo)
+    assert hashing.verificar("secreto123", nuevo)
+    # Con el hash al día, iniciar sesión ya no lo reescribe.
+    assert asyncio.run(autenticar("ana", "secreto123"))["nombre"] == "ana"
+    assert _hash_en_base("ana") == nuevo
+
+
+def test_autenticar_sha256_heredado_y_hash_danado(ruta_db, pool):
+    from nueva_app_reflex.autenticacion import autenticar
+
+    _registrar("luis", hashlib.sha256(b"secreto123").hexdigest())
+    _registrar("marta", hashing.generar_hash("secreto123")[:-10])
+
+    assert asyncio.run(autenticar("luis", "secreto123"))["nombre"] == "luis"
+    assert _hash_en_base("luis").startswith("scrypt$v1$n=1024,")
+    assert asyncio.run(autenticar("marta", "secreto123")) is None
+    assert asyncio.run(autenticar("nadie", "secreto123")) is None
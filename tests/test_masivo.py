@@ -0,0 +1,137 @@
+"""
+Importación y exportación masiva: resultado por fila, duplicados, filas inválidas y formatos.
+"""
+
+import csv
+import io
+import json
+import sqlite3
+
+import pytest
+
+from nueva_app_reflex import masivo
+
+CABECERA = "nombre,email,password,es_admin\n"
+
+
+def _importar(texto: str, formato: str = "csv", tamano_lote: int = masivo.TAMANO_LOTE):
+    informe = io.StringIO()
+    resumen = masivo.importar(io.StringIO(texto), formato, informe, tamano_lote)
+    return resumen, [json.loads(linea) for linea in informe.getvalue().splitlines()]
+
+
+def _estados(informe) -> dict:
+    return {r["fila"]: r["estado"] for r in informe}
+
+
+def _nombres_en_base(ruta_db: str) -> list:
+    with sqlite3.connect(ruta_db) as conexion:
+        return [f[0] for f in conexion.execute("SELECT nombre FROM usuarios ORDER BY id")]
+
+
+def test_duplicados_en_base_y_en_el_archivo(ruta_db, pool):
+    _importar(CABECERA + "ana,ana@ejemplo.com,secreto123,false\n")
+    resumen, informe = _importar(
+        CABECERA
+        + "ana,otra@ejemplo.com,secreto123,false\n"  # nombre ya en la base
+        + "luis,luis@ejemplo.com,secreto123,true\n"
+        + "marta,luis@ejemplo.com,secreto123,false\n"  # email repetido en el archivo
+        + "pablo,pablo@ejemplo.com,secreto123,\n"
+    )
+    assert resumen == {"creado": 2, "duplicado": 2, "invalido": 0}
+    assert _estados(informe) == {1: "duplicado", 2: "creado", 3: "duplicado", 4: "creado"}
+    assert _nombres_en_base(ruta_db) == ["ana", "luis", "pablo"]
+
+
+def test_filas_invalidas_se_atribuyen_a_su_fila(ruta_db, pool):
+    resumen, informe = _importar(
+        CABECERA
+        + "ana,ana@ejemplo.com,secreto123,false\n"
+        + "luis,no-es-un-email,secreto123,false\n"
+        + "marta,marta@ejemplo.com,secreto123,false\n"
+        + "pa,pablo@ejemplo.com,corta,false\n"
+        + "sofia,sofia@ejemplo.com,secreto123,quizas\n"
+        + "lucia,lucia@ejemplo.com,secreto123,false\n",
+        tamano_lote=10,
+    )
+    assert resumen == {"creado": 3, "duplicado": 0, "invalido": 3}
+    invalidas = {r["fila"]: r["detalle"] for r in informe if r["estado"] == "invalido"}
+    assert sorted(invalidas) == [2, 4, 5]
+    assert invalidas[2].startswith("email:")
+    assert "nombre:" in invalidas[4] and "password:" in invalidas[4]
+    assert invalidas[5].startswith("es_admin:")
+    assert _nombres_en_base(ruta_db) == ["ana", "marta", "lucia"]
+
+
+def test_conflicto_tras_la_comprobacion_solo_afecta_a_esa_fila(ruta_db, pool, monkeypatch):
+    buscar_existentes = masivo.buscar_existentes
+
+    def buscar_y_adelantarse(*args):
+        existentes = buscar_existentes(*args)
+        # Otro proceso registra "luis" después de la comprobación de duplicados.
+        with sqlite3.connect(ruta_db) as conexion:
+            conexion.execute(
+                "INSERT INTO usuarios (nombre, email, password_hash, es_admin) VALUES ('luis', 'l@otro.com', 'x', 0)"
+            )
+        return existentes
+
+    monkeypatch.setattr(masivo, "buscar_existentes", buscar_y_adelantarse)
+    resumen, informe = _importar(
+        CABECERA
+        + "ana,ana@ejemplo.com,secreto123,false\n"
+        + "luis,luis@ejemplo.com,secreto123,false\n"
+        + "marta,marta@ejemplo.com,secreto123,false\n"
+    )
+    assert resumen == {"creado": 2, "duplicado": 1, "invalido": 0}
+    assert _estados(informe) == {1: "creado", 2: "duplicado", 3: "creado"}
+    assert sorted(_nombres_en_base(ruta_db)) == ["ana", "luis", "marta"]
+
+
+def test_jsonl_con_una_linea_mal_formada(ruta_db, pool):
+    resumen, informe = _importar(
+        '{"nombre": "ana", "email": "ana@ejemplo.com", "password": "secreto123"}\n'
+        '{"nombre": "luis", "email": \n'
+        "\n"
+        '{"nombre": "marta", "email": "marta@ejemplo.com", "password": "secreto123", "es_admin": true}\n',
+        formato="jsonl",
+    )
+    assert resumen == {"creado": 2, "duplicado": 0, "invalido": 1}
+    # Las líneas vacías no cuentan como filas, pero sí para numerarlas.
+    assert _estados(informe) == {1: "creado", 2: "invalido", 4: "creado"}
+
+
+@pytest.mark.parametrize("formato", ["csv", "jsonl"])
+def test_exportar_e_importar(ruta_db, pool, formato):
+    _importar(
+        CABECERA
+        + "ana,ana@ejemplo.com,secreto123,false\n"
+        + "luis,luis@ejemplo.com,secreto123,true\n"
+        + "marta,marta@ejemplo.com,secreto123,false\n"
+    )
+    salida = io.StringIO()
+    # Páginas de 2: la exportación recorre más de una página.
+    assert masivo.exportar(salida, formato, tamano_pagina=2) == 3
+
+    if formato == "csv":
+        exportados = list(csv.DictReader(io.StringIO(salida.getvalue())))
+        assert [(f["id"], f["nombre"], f["es_admin"]) for f in exportados] == [
+            ("1", "ana", "False"), ("2", "luis", "True"), ("3", "marta", "False"),
+        ]
+    else:
+        exportados = [json.loads(linea) for linea in salida.getvalue().splitlines()]
+        assert exportados == [
+            {"id": 1, "nombre": "ana", "email": "ana@ejemplo.com", "es_admin": False},
+            {"id": 2, "nombre": "luis", "email": "luis@ejemplo.com", "es_admin": True},
+            {"id": 3, "nombre": "marta", "email": "marta@ejemplo.com", "es_admin": False},
+        ]
+    assert all("password_hash" not in fila for fila in exportados)
+
+    # El archivo exportado, con contraseñas, se vuelve a leer con el importador: todo duplicado.
+    if formato == "csv":
+        texto = CABECERA + "".join(
+            f"{f['nombre']},{f['email']},secreto123,{f['es_admin']}\n" for f in exportados
+        )
+    else:
+        texto = "".join(json.dumps({**f, "password": "secreto123"}) + "\n" for f in exportados)
+    resumen, _ = _importar(texto, formato)
+    assert resumen == {"creado": 0, "duplicado": 3, "invalido": 0}
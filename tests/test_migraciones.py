@@ -0,0 +1,113 @@
+"""
+Migraciones versionadas: esquema resultante, adopción de bases anteriores y arranque sin migrar.
+"""
+
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, inspect
+
+from nueva_app_reflex.db import database, migraciones
+from nueva_app_reflex.db.models import Base
+
+
+@pytest.fixture
+def ruta_vacia(tmp_path, monkeypatch) -> str:
+    """
+    Apunta DATABASE_PATH a una base que todavía no existe, sin migrar.
+    """
+    ruta = str(tmp_path / "datos" / "app.db")
+    database.cerrar_motores()
+    monkeypatch.setenv("DATABASE_PATH", ruta)
+    yield ruta
+    database.cerrar_motores()
+
+
+def _esquema(ruta: str) -> dict:
+    """
+    Columnas, índices, claves únicas y foráneas de las tablas del modelo, tal como las lee SQLAlchemy.
+    """
+    motor = create_engine(f"sqlite:///{ruta}")
+    try:
+        inspector = inspect(motor)
+        return {
+            tabla: {
+                "columnas": [
+                    (c["name"], str(c["type"]), c["nullable"], c.get("primary_key"))
+                    for c in inspector.get_columns(tabla)
+                ],
+                "indices": sorted(
+                    (i["name"], tuple(i["column_names"]), bool(i["unique"])) for i in inspector.get_indexes(tabla)
+                ),
+                "unicas": sorted(tuple(u["column_names"]) for u in inspector.get_unique_constraints(tabla)),
+                "foraneas": [
+                    (tuple(f["constrained_columns"]), f["referred_table"], tuple(f["referred_columns"]))
+                    for f in inspector.get_foreign_keys(tabla)
+                ],
+            }
+            for tabla in Base.metadata.tables
+        }
+    finally:
+        motor.dispose()
+
+
+def _version(ruta: str) -> int:
+    with sqlite3.connect(ruta) as conexion:
+        return conexion.execute("PRAGMA user_version").fetchone()[0]
+
+
+def test_base_nueva_coincide_con_los_modelos(ruta_vacia, tmp_path):
+    assert migraciones.aplicar() == [version for version, _, _ in migraciones.MIGRACIONES]
+    assert _version(ruta_vacia) == migraciones.VERSION_ACTUAL
+    # Una segunda ejecución no encuentra nada pendiente.
+    assert migraciones.aplicar() == []
+
+    referencia = str(tmp_path / "referencia.db")
+    motor = create_engine(f"sqlite:///{referencia}")
+    Base.metadata.create_all(motor)
+    motor.dispose()
+    assert _esquema(ruta_vacia) == _esquema(referencia)
+
+
+def test_adopta_una_base_creada_con_create_all(ruta_vacia, tmp_path):
+    # Base anterior a las migraciones: tablas de create_all, con datos y user_version 0.
+    (tmp_path / "datos").mkdir()
+    motor = create_engine(f"sqlite:///{ruta_vacia}")
+    Base.metadata.create_all(motor)
+    motor.dispose()
+    with sqlite3.connect(ruta_vacia) as conexion:
+        conexion.execute(
+            "INSERT INTO usuarios (nombre, email, password_hash, es_admin) "
+            "VALUES ('ana', 'ana@ejemplo.com', 'x', 0)"
+        )
+        conexion.execute("INSERT INTO tareas (descripcion, completada, usuario_id) VALUES ('regar plantas', 0, 1)")
+    assert _version(ruta_vacia) == 0
+    esquema_anterior = _esquema(ruta_vacia)
+
+    assert migraciones.aplicar() == [1, 2, 3]
+    assert _version(ruta_vacia) == migraciones.VERSION_ACTUAL
+    assert _esquema(ruta_vacia) == esquema_anterior
+    with sqlite3.connect(ruta_vacia) as conexion:
+        assert conexion.execute("SELECT nombre FROM usuarios").fetchall() == [("ana",)]
+        # Los índices de búsqueda se llenan con las filas que ya existían.
+        assert conexion.execute("SELECT rowid FROM tareas_fts WHERE tareas_fts MATCH 'plantas'").fetchall() == [(1,)]
+
+
+def test_sin_migracion_automatica_no_arranca_con_migraciones_pendientes(ruta_vacia, monkeypatch):
+    monkeypatch.setenv("DATABASE_AUTO_MIGRATE", "0")
+    with pytest.raises(migraciones.ErrorMigracion, match=r"\[1, 2, 3\]"):
+        migraciones.preparar_esquema()
+    # Sólo comprueba: no crea la base ni aplica nada.
+    assert migraciones.version_esquema() == 0
+
+    migraciones.aplicar()
+    migraciones.preparar_esquema()
+
+
+def test_base_mas_nueva_que_el_codigo(ruta_vacia):
+    migraciones.aplicar()
+    with sqlite3.connect(ruta_vacia) as conexion:
+        conexion.execute(f"PRAGMA user_version = {migraciones.VERSION_ACTUAL + 1}")
+    database.cerrar_motores()
+    with pytest.raises(migraciones.ErrorMigracion):
+        migraciones.aplicar()
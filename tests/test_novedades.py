@@ -0,0 +1,141 @@
+"""
+Escritor agrupado y canal de novedades de usuarios con varios procesos escribiendo en la misma base.
+"""
+
+import asyncio
+import subprocess
+import sys
+from typing import Callable, List
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from nueva_app_reflex.db import asincrono, usuarios
+from nueva_app_reflex.db.novedades import AvisoNovedades, CanalNovedades
+
+from .conftest import RAIZ_PROYECTO
+
+# Otro proceso del backend: registra usuarios a través de su propio escritor agrupado.
+OTRO_WORKER = """
+import asyncio, sys
+from nueva_app_reflex.db import asincrono
+from nueva_app_reflex.db.usuarios import crear_usuario
+
+async def registrar(prefijo, cantidad):
+    await asyncio.gather(*(
+        asincrono.ejecutar(crear_usuario, f"{prefijo}{i}", f"{prefijo}{i}@ejemplo.com", "x")
+        for i in range(cantidad)
+    ))
+
+asyncio.run(registrar(sys.argv[1], int(sys.argv[2])))
+asincrono.cerrar()
+"""
+
+
+def _lanzar_otro_worker(prefijo: str, cantidad: int) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-c", OTRO_WORKER, prefijo, str(cantidad)], cwd=RAIZ_PROYECTO)
+
+
+def _ids(canal: CanalNovedades) -> List[int]:
+    return [fila["id"] for fila in canal.desde(0)]
+
+
+async def _hasta(condicion: Callable[[], bool], timeout: float = 10.0) -> None:
+    for _ in range(int(timeout / 0.01)):
+        if condicion():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("no se cumplió la condición a tiempo")
+
+
+@pytest.fixture
+def canal(monkeypatch) -> CanalNovedades:
+    """
+    Canal y aviso de usuarios nuevos propios de la prueba.
+    """
+    canal = CanalNovedades()
+    monkeypatch.setattr(usuarios, "canal_usuarios", canal)
+    monkeypatch.setattr(usuarios, "aviso_usuarios", AvisoNovedades())
+    return canal
+
+
+async def _con_sondeo(escenario) -> None:
+    """
+    Ejecuta el escenario con la tarea de sondeo en marcha y ya esperando su primer aviso.
+    """
+    sondeo = asyncio.create_task(usuarios.sondear_usuarios_nuevos())
+    try:
+        await _hasta(lambda: usuarios.aviso_usuarios._esperando is not None)
+        await escenario()
+    finally:
+        sondeo.cancel()
+        await asyncio.gather(sondeo, return_exceptions=True)
+
+
+def test_usuario_de_otro_proceso_no_se_pierde(ruta_db, canal, monkeypatch):
+    # Sin sondeo periódico: sólo el registro local despierta al publicador.
+    monkeypatch.setattr(usuarios, "NOVEDADES_INTERVALO", 60.0)
+
+    async def escenario():
+        # Otro worker confirma el id 1 y este confirma el id 2 antes del siguiente sondeo.
+        assert _lanzar_otro_worker("externo", 1).wait() == 0
+        local = await asincrono.ejecutar(usuarios.crear_usuario, "local", "local@ejemplo.com", "x")
+        assert local["id"] == 2
+        # Un cliente suscrito antes de ambos registros recibe los dos, en orden.
+        await _hasta(lambda: len(_ids(canal)) == 2)
+        assert [f["nombre"] for f in await canal.esperar(0, timeout=1)] == ["externo0", "local"]
+
+    asyncio.run(_con_sondeo(escenario))
+
+
+def test_sondeo_publica_los_registros_de_otro_proceso(ruta_db, canal, monkeypatch):
+    monkeypatch.setattr(usuarios, "NOVEDADES_INTERVALO", 0.05)
+
+    async def escenario():
+        assert _lanzar_otro_worker("externo", 3).wait() == 0
+        await _hasta(lambda: len(_ids(canal)) == 3)
+
+    asyncio.run(_con_sondeo(escenario))
+    assert _ids(canal) == [1, 2, 3]
+
+
+def test_dos_procesos_escribiendo_a_la_vez(ruta_db, canal, monkeypatch):
+    monkeypatch.setattr(usuarios, "NOVEDADES_INTERVALO", 0.05)
+    por_proceso = 100
+
+    async def escenario():
+        otro = _lanzar_otro_worker("externo", por_proceso)
+        await asyncio.gather(*(
+            asincrono.ejecutar(usuarios.crear_usuario, f"local{i}", f"local{i}@ejemplo.com", "x")
+            for i in range(por_proceso)
+        ))
+        assert await asyncio.to_thread(otro.wait) == 0
+        await _hasta(lambda: len(_ids(canal)) == 2 * por_proceso)
+
+    asyncio.run(_con_sondeo(escenario))
+    # Todos los usuarios de ambos procesos, en orden de id y sin huecos.
+    assert _ids(canal) == list(range(1, 2 * por_proceso + 1))
+
+
+def test_lote_con_un_duplicado_confirma_el_resto(ruta_db, canal):
+    nombres = [f"usuario{i}" for i in range(20)] + ["usuario3"]
+
+    async def escenario():
+        # Se llena la caché antes de escribir: el commit del lote debe invalidarla.
+        assert await asincrono.leer(usuarios.contar_usuarios) == 0
+        resultados = await asyncio.gather(
+            *(
+                asincrono.ejecutar(usuarios.crear_usuario, nombre, f"{nombre}_{i}@ejemplo.com", "x")
+                for i, nombre in enumerate(nombres)
+            ),
+            return_exceptions=True,
+        )
+        errores = [r for r in resultados if isinstance(r, Exception)]
+        assert len(errores) == 1 and isinstance(errores[0], IntegrityError)
+        assert sorted(r["id"] for r in resultados if isinstance(r, dict)) == list(range(1, 21))
+        assert await asincrono.leer(usuarios.contar_usuarios) == 20
+        # Se publican las filas confirmadas y ninguna del SAVEPOINT deshecho.
+        await _hasta(lambda: len(_ids(canal)) == 20)
+
+    asyncio.run(_con_sondeo(escenario))
+    assert _ids(canal) == list(range(1, 21))
@@ -0,0 +1,121 @@
+"""
+Consultas de tareas: listados por usuario, cambios de estado, contadores y vista de administración.
+"""
+
+import sqlite3
+
+import pytest
+
+from nueva_app_reflex.db import database, tareas
+from nueva_app_reflex.db.database import SessionLocal
+
+
+@pytest.fixture
+def db(ruta_db):
+    """
+    Sesión de escritura sobre una base con tres usuarios: ana (id 1), luis (id 2) y marta (id 3).
+    """
+    with sqlite3.connect(ruta_db) as conexion:
+        conexion.executemany(
+            "INSERT INTO usuarios (nombre, email, password_hash, es_admin) VALUES (?, ?, 'x', 0)",
+            [(n, f"{n}@ejemplo.com") for n in ("ana", "luis", "marta")],
+        )
+    sesion = SessionLocal()
+    yield sesion
+    sesion.close()
+
+
+def _crear(db, usuario_id: int, cantidad: int) -> list:
+    ids = [tareas.crear_tarea(db, usuario_id, f"tarea {i}")["id"] for i in range(cantidad)]
+    db.commit()
+    return ids
+
+
+def test_alternar_devuelve_el_estado_de_la_base(db):
+    (tarea_id,) = _crear(db, 1, 1)
+    assert tareas.alternar_tarea(db, 1, tarea_id) is True
+    db.commit()
+    # Otra pestaña la vuelve a marcar como pendiente: esta pestaña la sigue viendo completada.
+    assert tareas.alternar_tarea(db, 1, tarea_id) is False
+    db.commit()
+    assert tareas.alternar_tarea(db, 1, tarea_id) is True
+    # Una tarea de otro usuario, o que no existe, no se toca.
+    assert tareas.alternar_tarea(db, 2, tarea_id) is None
+    assert tareas.alternar_tarea(db, 1, 999) is None
+
+
+@pytest.mark.parametrize("perfil", ["produccion", "basico"])
+def test_crear_tarea_de_usuario_inexistente(ruta_db, monkeypatch, perfil):
+    # Con "basico" no hay PRAGMA foreign_keys: la comprobación no puede depender de la clave foránea.
+    database.cerrar_motores()
+    monkeypatch.setenv("DATABASE_PROFILE", perfil)
+    db = SessionLocal()
+    try:
+        assert tareas.crear_tarea(db, 99, "huérfana") is None
+        assert tareas.crear_tarea(db, 0, "huérfana") is None
+        db.commit()
+    finally:
+        db.close()
+    with sqlite3.connect(ruta_db) as conexion:
+        assert conexion.execute("SELECT COUNT(*) FROM tareas").fetchone() == (0,)
+
+
+def test_ultimas_tareas_por_usuario(db):
+    # Tareas intercaladas de ana y luis; marta no tiene ninguna.
+    ids = {1: [], 2: []}
+    for i in range(6):
+        for usuario_id in (1, 2):
+            ids[usuario_id] += _crear(db, usuario_id, 1)
+    ultimas = tareas.ultimas_tareas_por_usuario(db, [1, 2, 3], limite=4)
+    # Las más recientes de cada usuario, en orden de id, sin mezclar las del otro.
+    assert [t["id"] for t in ultimas[1]] == ids[1][-4:]
+    assert [t["id"] for t in ultimas[2]] == ids[2][-4:]
+    assert ultimas[3] == []
+    assert tareas.ultimas_tareas_por_usuario(db, []) == {}
+
+
+def test_contadores_de_usuarios_sin_tareas(db):
+    ids = _crear(db, 1, 3)
+    tareas.completar_tareas(db, 1, ids[:1])
+    db.commit()
+    assert tareas.contar_tareas_por_usuario(db, [1, 2, 3]) == {
+        1: {"pendientes": 2, "completadas": 1},
+        2: {"pendientes": 0, "completadas": 0},
+        3: {"pendientes": 0, "completadas": 0},
+    }
+    assert tareas.contar_tareas(db, 2) == {"pendientes": 0, "completadas": 0}
+    assert tareas.contar_tareas_por_usuario(db, []) == {}
+
+
+def test_completar_tareas_con_y_sin_ids(db):
+    ana = _crear(db, 1, 4)
+    luis = _crear(db, 2, 2)
+    # Sólo las indicadas y del propio usuario: la de luis no se toca.
+    assert tareas.completar_tareas(db, 1, [ana[0], ana[1], luis[0]]) == 2
+    # Las ya completadas no se cuentan otra vez.
+    assert tareas.completar_tareas(db, 1, [ana[0]]) == 0
+    assert tareas.completar_tareas(db, 1, []) == 0
+    # Sin ids: todas las pendientes del usuario.
+    assert tareas.completar_tareas(db, 1) == 2
+    db.commit()
+    assert tareas.contar_tareas(db, 1) == {"pendientes": 0, "completadas": 4}
+    assert tareas.contar_tareas(db, 2) == {"pendientes": 2, "completadas": 0}
+
+
+def test_vista_de_administracion(db):
+    tope = tareas.TAREAS_POR_USUARIO_ADMIN
+    ana = _crear(db, 1, tope + 2)
+    _crear(db, 2, 2)
+    tareas.completar_tareas(db, 1, ana[-1:])
+    db.commit()
+    filas, hay_mas = tareas.listar_usuarios_con_tareas(db, limite=2)
+    assert hay_mas and [f["nombre"] for f in filas] == ["ana", "luis"]
+    # ana tiene más tareas que el tope: se muestran las últimas y se avisa de las otras 2.
+    assert [t["id"] for t in filas[0]["tareas"]] == ana[-tope:]
+    assert (filas[0]["tareas_ocultas"], filas[0]["pendientes"], filas[0]["completadas"]) == (2, tope + 1, 1)
+    assert (len(filas[1]["tareas"]), filas[1]["tareas_ocultas"]) == (2, 0)
+    filas, hay_mas = tareas.listar_usuarios_con_tareas(db, despues_de_id=2, limite=2)
+    assert not hay_mas
+    assert filas == [
+        {"id": 3, "nombre": "marta", "tareas": [], "tareas_ocultas": 0, "pendientes": 0, "completadas": 0}
+    ]